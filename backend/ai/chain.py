@@ -0,0 +1,135 @@
+# backend/ai/chain.py
+import time, logging, threading
+from typing import Any, Callable, List, Tuple
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Ordered LLM fallback chain (primary model, then a cheaper one) built from
+# settings.AI_PROVIDER / AI_MODEL_CHAIN. Each link has its own per-call
+# deadline and circuit breaker; the deterministic extractor in ai.provider is
+# the last resort when every link fails or is open. Breaker state is per
+# process, so each gunicorn worker trips independently.
+
+
+class AllProvidersFailed(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open after `failures` errors,
+    open -> half-open after `reset_after` seconds, where a single probe call
+    decides between closed and open again."""
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failures: int = 3, reset_after: float = 30.0, probe_timeout: float = 120.0):
+        self.name = name
+        self.max_failures = max(1, failures)
+        self.reset_after = reset_after
+        self.probe_timeout = probe_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self.opened_at >= self.reset_after:
+                self.state, self.probe_at = self.HALF_OPEN, now   # this caller is the probe
+                logger.info("breaker %s half-open, probing", self.name)
+                return True
+            if self.state == self.HALF_OPEN and now - self.probe_at >= self.probe_timeout:
+                # the probe never reported back; let another caller probe
+                self.probe_at = now
+                logger.warning("breaker %s probe lost after %.0fs, probing again", self.name, self.probe_timeout)
+                return True
+            return False   # open, or a probe is already in flight
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("breaker %s closed", self.name)
+            self.state, self.failures = self.CLOSED, 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.max_failures:
+                if self.state != self.OPEN:
+                    logger.warning("breaker %s open after %d failure(s)", self.name, self.failures)
+                self.state, self.opened_at = self.OPEN, time.monotonic()
+
+    def record_abort(self) -> None:
+        """The call was abandoned by our side (e.g. the client left a stream):
+        neither a success nor a failure. A probe is released, so the next
+        allow() can probe again right away."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state, self.opened_at = self.OPEN, time.monotonic() - self.reset_after
+
+
+class LLMProvider:
+    def __init__(self, name: str, model: str, timeout: float, breaker: CircuitBreaker):
+        self.name = name
+        self.model = model
+        self.timeout = timeout
+        self.breaker = breaker
+
+    def __repr__(self):
+        return f"<LLMProvider {self.name} model={self.model} timeout={self.timeout}s {self.breaker.state}>"
+
+
+_chain: List[LLMProvider] = None
+_chain_lock = threading.Lock()
+
+def _build_chain() -> List[LLMProvider]:
+    if settings.AI_PROVIDER != "openai" or not settings.AI_API_KEY:
+        return []
+    timeouts = list(settings.AI_TIMEOUTS) or [8.0]
+    chain = []
+    for i, model in enumerate(settings.AI_MODEL_CHAIN):
+        timeout = float(timeouts[min(i, len(timeouts) - 1)])
+        name = f"openai:{model}"
+        breaker = CircuitBreaker(name, settings.AI_BREAKER_FAILURES, settings.AI_BREAKER_RESET_SECONDS,
+                                 getattr(settings, "AI_BREAKER_PROBE_SECONDS", 120.0))
+        chain.append(LLMProvider(name, model, timeout, breaker))
+    return chain
+
+def get_chain() -> List[LLMProvider]:
+    global _chain
+    if _chain is None:
+        with _chain_lock:
+            if _chain is None:
+                _chain = _build_chain()
+    return _chain
+
+def reset_chain() -> None:
+    """Drop the cached chain (and breaker state); rebuilt from settings on next use."""
+    global _chain
+    with _chain_lock:
+        _chain = None
+
+def call_with_fallback(fn: Callable[[LLMProvider], Any]) -> Tuple[Any, LLMProvider]:
+    """Call `fn(provider)` down the chain until one succeeds.
+
+    Providers whose breaker is open are skipped without a call. Raises
+    AllProvidersFailed when the chain is empty or every link failed/skipped.
+    """
+    errors = []
+    for p in get_chain():
+        if not p.breaker.allow():
+            errors.append(f"{p.name}: open")
+            continue
+        try:
+            result = fn(p)
+        except Exception as e:
+            p.breaker.record_failure()
+            errors.append(f"{p.name}: {e.__class__.__name__}")
+            continue
+        p.breaker.record_success()
+        return result, p
+    raise AllProvidersFailed("; ".join(errors) or "no LLM provider configured")
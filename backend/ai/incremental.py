@@ -0,0 +1,209 @@
+# backend/ai/incremental.py
+import os, hashlib, logging, time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from django.conf import settings
+from . import chain
+from . import provider
+from utils.timing import span
+
+logger = logging.getLogger(__name__)
+
+# Incremental re-extraction for edits of JobPosting.jd_raw. The JD is cut into
+# sections at header lines ("Requirements", "Benefits:", ...). Long runs
+# without headers are cut further at content-defined points (after a line
+# whose hash hits 0 mod JD_SECTION_CUT), so inserting a line only disturbs
+# the chunk it lands in. Each section is fingerprinted, together with the
+# section header governing it, since "Preferred" vs "Requirements" changes
+# what its lines mean to _scan_lines.
+#
+# JobPosting.jd_sections keeps, per section of the last extracted text, its
+# fingerprint and the skills/must_haves/nice_to_haves it contributed:
+#   {"v": 1, "sections": [{"fp": ..., "skills": [...], ...}], "rest": {...}}
+# On an edit, sections whose fingerprint is unchanged keep their items, and
+# removed sections drop theirs. Only the new or changed ones go through the
+# line scanner, and, when the heuristics are unsure about them, through the
+# LLM with just their text. Scalar fields (title, company, ...) are kept;
+# empty ones are filled from the heuristics. The LLM is asked for them only
+# when the first section changed.
+#
+# Jobs extracted before this existed have no index. It is rebuilt from the
+# old text and the stored jd_struct by attributing each item to the section
+# it came from: the one sharing most of its words. Items that match no
+# section (paraphrased by the LLM) go to "rest" and are kept as they are.
+# Sections left with no items (the job was saved with an empty or stale
+# jd_struct) are run through the line scanner like changed ones.
+
+VERSION = 1
+LIST_FIELDS = ("skills", "must_haves", "nice_to_haves")
+SCALAR_FIELDS = ("title", "company", "location", "seniority", "summary")
+
+
+class _Section:
+    __slots__ = ("header", "lines", "fp")
+
+    def __init__(self, header: str, lines: List[str]):
+        self.header = header   # the _SECTION_HEADER in effect before the first line ("" if none)
+        self.lines = lines
+        digest = hashlib.sha1("\n".join([header.lower(), *lines]).encode("utf-8"))
+        self.fp = digest.hexdigest()[:16]
+
+    def scan_lines(self) -> List[str]:
+        """The lines as _scan_lines must see them: behind their governing header."""
+        if self.header and not provider._SECTION_HEADER.match(self.lines[0]):
+            return [self.header, *self.lines]
+        return self.lines
+
+    def text(self) -> str:
+        return "\n".join(self.scan_lines())
+
+
+def _is_header(line: str) -> bool:
+    return bool(provider._SECTION_HEADER.match(line) or provider._ANY_HEADER.match(line)
+                or provider._DROP_HEADER.match(line) or provider._ABOUT_HEADER.match(line))
+
+
+def _cut_after(line: str, every: int) -> bool:
+    return int(hashlib.sha1(line.encode("utf-8")).hexdigest()[:8], 16) % every == 0
+
+
+def split_sections(text: str) -> List[_Section]:
+    every = max(1, int(getattr(settings, "JD_SECTION_CUT", 8)))
+    sections: List[_Section] = []
+    header, start_header, lines = "", "", []
+    for ln in provider._split_lines(text):
+        if lines and _is_header(ln):
+            sections.append(_Section(start_header, lines))
+            start_header, lines = header, []
+        lines.append(ln)
+        if provider._SECTION_HEADER.match(ln):
+            header = ln
+        elif _cut_after(ln, every):
+            sections.append(_Section(start_header, lines))
+            start_header, lines = header, []
+    if lines:
+        sections.append(_Section(start_header, lines))
+    return sections
+
+
+def _scan(section: _Section) -> Dict[str, Any]:
+    must, nice, skills, _ = provider._scan_lines(section.scan_lines())
+    return {"fp": section.fp, "skills": sorted(skills, key=str.lower), "must_haves": must, "nice_to_haves": nice}
+
+
+def _words(text: str) -> set:
+    return set(provider._WORD.findall(provider._fold(text)))
+
+
+def _attribute(sections: List[_Section], entries: List[Dict[str, Any]], items: Dict[str, List[str]],
+               rest: Optional[Dict[str, List[str]]]) -> None:
+    """Add each item to the entry of the section sharing most of its words
+    (at least half of them). A skill goes to every section that contains it,
+    so it outlives any one of them. Misses go to `rest`, or to the first
+    entry when rest is None."""
+    texts = [_words(s.text()) for s in sections]
+    for field in LIST_FIELDS:
+        for item in items.get(field) or []:
+            words = _words(str(item))
+            if not words:
+                continue
+            scores = [len(words & t) / len(words) for t in texts]
+            if field == "skills" and any(s == 1.0 for s in scores):
+                hits = [i for i, s in enumerate(scores) if s == 1.0]
+            else:
+                best = max(range(len(scores)), key=scores.__getitem__, default=None)
+                hits = [best] if best is not None and scores[best] >= 0.5 else []
+            for i in hits:
+                entries[i][field].append(item)
+            if not hits:
+                (rest if rest is not None else entries[0])[field].append(item)
+
+
+def index(text: str, jd_struct: Dict[str, Any], sections: Optional[List[_Section]] = None) -> Dict[str, Any]:
+    """Section index for `text` whose extraction is `jd_struct` (see jd_sections)."""
+    sections = split_sections(text) if sections is None else sections
+    entries = [{"fp": s.fp, **{f: [] for f in LIST_FIELDS}} for s in sections]
+    rest: Dict[str, List[str]] = {f: [] for f in LIST_FIELDS}
+    _attribute(sections, entries, jd_struct or {}, rest)
+    return {"v": VERSION, "sections": entries, "rest": rest}
+
+
+def _matches(stored: Any, sections: List[_Section]) -> bool:
+    return (isinstance(stored, dict) and stored.get("v") == VERSION
+            and [e.get("fp") for e in stored.get("sections") or []] == [s.fp for s in sections])
+
+
+def reextract(old_text: str, new_text: str, jd_struct: Dict[str, Any], stored: Any,
+              llm_gate: Optional[Callable[[], bool]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Re-extract `new_text` given the extraction of `old_text`. Returns the
+    new jd_struct and the section index to store next to it."""
+    t0 = time.perf_counter()
+    old_sections = split_sections(old_text)
+    if not _matches(stored, old_sections):
+        stored = index(old_text, jd_struct, old_sections)
+        # an empty or stale jd_struct leaves sections with nothing attributed; scan those
+        for section, entry in zip(old_sections, stored["sections"]):
+            if not any(entry[f] for f in LIST_FIELDS):
+                entry.update(_scan(section))
+    known = {}
+    for entry in stored["sections"]:
+        known.setdefault(entry["fp"], entry)
+
+    sections = split_sections(new_text)
+    changed = [i for i, s in enumerate(sections) if s.fp not in known]
+    with span("heuristic"):
+        entries = [{**known[s.fp]} if s.fp in known else _scan(s) for s in sections]
+        changed_text = "\n".join(sections[i].text() for i in changed)
+        base, conf = provider._deterministic_extract_scored(changed_text)
+
+    strict_only = str(os.environ.get("AI_STRICT_ONLY", "0")).lower() in ("1", "true", "yes")
+    mode, fields = ("off", list(provider.DEFAULT_JD)) if strict_only else provider._llm_plan(conf)
+    # scalars mostly come from the top of a JD; don't re-ask for them over a changed requirement
+    fields = [f for f in fields if f in LIST_FIELDS or changed[0] == 0] if changed else []
+    if not any(not _is_header(ln) for i in changed for ln in sections[i].lines):
+        fields = []   # only headers changed: nothing for the LLM to read
+    outcome = "skipped"
+    if fields and llm_gate is not None and not llm_gate():
+        fields, outcome = [], "throttled"
+    ai: Dict[str, Any] = {}
+    if fields:
+        try:
+            with span("llm"):
+                ai, link = chain.call_with_fallback(
+                    lambda p: provider._openai_extract_strict(changed_text, fields, model=p.model, timeout=p.timeout))
+            outcome = f"ok:{link.model}"
+        except chain.AllProvidersFailed as e:
+            outcome = f"failed ({e})"
+        except Exception as e:
+            outcome = f"failed: {e.__class__.__name__}"
+    redo = [f for f in LIST_FIELDS if f in fields and ai.get(f)]
+    if redo:
+        for i in changed:
+            for f in redo:
+                entries[i][f] = []
+        _attribute([sections[i] for i in changed], [entries[i] for i in changed], {f: ai[f] for f in redo}, None)
+
+    data = {**provider.DEFAULT_JD, **(jd_struct or {})}
+    for f in LIST_FIELDS:
+        data[f] = [x for e in entries for x in e[f]] + list(stored["rest"].get(f) or [])
+    if not any(data[f] for f in LIST_FIELDS):
+        data.update({f: base[f] for f in LIST_FIELDS})
+    for f in SCALAR_FIELDS:
+        if f in fields and ai.get(f):
+            data[f] = ai[f]
+    old_summary = provider._WS.sub(" ", old_text or "").strip()[:600]
+    if not data["summary"] or data["summary"] == old_summary:
+        data["summary"] = provider._WS.sub(" ", new_text or "").strip()[:600]
+    data["title"] = data["title"] or provider._guess_title(new_text or "")
+    data["company"] = data["company"] or provider._guess_company(new_text or "")
+    if not data["location"] and provider._REMOTE_CUE.search(new_text or ""):
+        data["location"] = "Remote"
+    if not data["seniority"] and provider._INTERN_CUE.search(new_text or ""):
+        data["seniority"] = provider.SENIORITY_INTERN
+
+    logger.info(
+        "reextract_jd gate mode=%s sections=%d changed=%d removed=%d llm=%s fields=%s chars=%d/%d ms=%.1f",
+        mode, len(sections), len(changed), len(set(known) - {s.fp for s in sections}), outcome,
+        ",".join(fields) or "-", len(changed_text), len(new_text or ""), (time.perf_counter() - t0) * 1000,
+    )
+    new_index = {"v": VERSION, "sections": entries, "rest": stored["rest"]}
+    return provider._ensure_shape(data), new_index
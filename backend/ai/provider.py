@@ -1,13 +1,23 @@
 # backend/ai/provider.py
-import os, re, json
-from typing import Dict, Any, List, Tuple
+import os, re, json, time, logging, hashlib, tempfile
+from typing import Dict, Any, List, Tuple, Iterator, Optional, Callable
 from django.conf import settings
+from . import chain
+from utils.timing import span
+from utils import llm_usage
 
 try:
     from openai import OpenAI
 except Exception:
     OpenAI = None
 
+try:
+    import tiktoken
+except Exception:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
 # default empty shape so the frontend always has fields
 DEFAULT_JD: Dict[str, Any] = {
     "title": "", "company": "", "location": "", "seniority": "",
@@ -72,9 +82,10 @@ _SKILL_WORDS = [
     "aws","gcp","azure","docker","kubernetes","git","linux","ci/cd","terraform",
 ]
 
-_REQ_CUES = re.compile(r"\b(must|required|minimum|min\.?|at least|need to have|we require|currently pursuing)\b", re.I)
-_PREF_CUES = re.compile(r"\b(preferred|nice to have|bonus|plus|strongly preferred)\b", re.I)
 _REMOTE_CUE = re.compile(r"\bremote\b", re.I)
+_WS = re.compile(r"\s+")
+_TRAILING_PUNCT = re.compile(r"\s+[()\[\]{},;:]+$")
+_INTERN_CUE = re.compile(r"\bintern|co-?op|student\b", re.I)
 
 def _ensure_shape(d: Dict[str, Any]) -> Dict[str, Any]:
     out = DEFAULT_JD.copy()
@@ -87,8 +98,8 @@ def _ensure_shape(d: Dict[str, Any]) -> Dict[str, Any]:
         norm = []
         seen = set()
         for x in (v or []):
-            s = re.sub(r"\s+[()\[\]{},;:]+$","", str(x or "").strip())
-            s = re.sub(r"\s+"," ", s)
+            s = _TRAILING_PUNCT.sub("", str(x or "").strip())
+            s = _WS.sub(" ", s)
             if not s: continue
             if s.lower() in seen: continue
             seen.add(s.lower())
@@ -108,151 +119,356 @@ def _ensure_shape(d: Dict[str, Any]) -> Dict[str, Any]:
 
 def _split_lines(text: str) -> List[str]:
     raw_lines = [ln.strip(" \t•-*–—") for ln in (text or "").splitlines()]
-    return [re.sub(r"\s+", " ", ln).strip() for ln in raw_lines if ln.strip()]
-
-def _detect_sections(lines: List[str]) -> List[Tuple[str, List[str]]]:
-    sections: List[Tuple[str, List[str]]] = []
-    current_name, current_lines = "", []
-    for ln in lines:
-        if re.match(r"^(requirements?|qualifications?|what you[’']ll do|responsibilities|preferred|bonus|nice to have)s?\:?$", ln, re.I):
-            if current_lines:
-                sections.append((current_name, current_lines))
-                current_lines = []
-            current_name = ln.lower()
-        else:
-            current_lines.append(ln)
-    if current_lines:
-        sections.append((current_name, current_lines))
-    return sections
-
-def _collect_skills_from_line(line: str) -> List[str]:
-    found = set()
-    for w in _SKILL_WORDS:
-        if re.search(rf"(?<![\w-]){re.escape(w)}(?![\w-])", line, re.I):
-            found.add(w.title() if w.isalpha() else w)
-    for m in re.findall(r"\b(AWS|GCP|Azure|SQL|GraphQL|REST|React(?: Native)?|Next\.js|Node\.js)\b", line, re.I):
-        found.add(m if m.isupper() else m.title())
-    return list(found)
-
-def _classify_line(section_name: str, line: str) -> str:
-    if re.search(r"preferred|bonus|nice to have", section_name or "", re.I) or _PREF_CUES.search(line):
-        return "nice"
-    if _REQ_CUES.search(line) or re.search(r"\b(experience|proficiency|knowledge)\b", line, re.I):
-        return "must"
-    return ""
-
-def _is_requirement_line(line: str) -> bool:
-    """Filter out headers, instructions, and non-requirement content."""
-    line = line.strip()
-    # Skip headers and section markers
-    if re.match(r"^(qualifications?|requirements?|additional information|in your application|application questions?|submit|email|process)s?\:?\s*$", line, re.I):
-        return False
-    # Skip instruction lines
-    if re.search(r"\b(include|answer|submit|email|forward|process|application)\b", line, re.I) and len(line) < 100:
-        return False
-    # Skip very short lines that are likely headers
-    if len(line) < 20 and re.search(r"\:$", line):
-        return False
-    # Must be a substantial requirement statement
-    return len(line) > 30 and not line.startswith(("http", "www."))
+    # str.split() and re's \s agree on what whitespace is
+    return [" ".join(ln.split()) for ln in raw_lines if ln.strip()]
+
+# --- single-pass line scanner ---------------------------------------------
+# Cues and skills are matched on word tokens instead of one regex per cue or
+# skill: \b boundaries are exactly the edges of \w+ runs, and the skill
+# lookarounds (?<![\w-])/(?![\w-]) are the edges of [\w-]+ runs. Phrases that
+# span several tokens keep a precompiled pattern, gated by a cheap token or
+# substring check.
+_WORD = re.compile(r"\w+")
+_RUN = re.compile(r"[\w-]+")
+# the only non-ASCII characters re.I matches against ASCII letters
+_CASE_FOLD = str.maketrans({"İ": "i", "ı": "i", "K": "k", "ſ": "s"})
+
+_SECTION_HEADER = re.compile(r"^(requirements?|qualifications?|what you[’']ll do|responsibilities|preferred|bonus|nice to have)s?\:?$", re.I)
+_PREF_SECTION = re.compile(r"preferred|bonus|nice to have", re.I)
+_CUE_WORDS = (
+    ("req", frozenset({"must", "required", "minimum", "min"})),
+    ("pref", frozenset({"preferred", "bonus", "plus"})),
+    ("exp", frozenset({"experience", "proficiency", "knowledge"})),
+    ("instr", frozenset({"include", "answer", "submit", "email", "forward", "process", "application"})),
+    ("you", frozenset({"you", "have", "are", "take", "enjoy", "love", "passion", "commitment"})),
+)
+_CUE_PHRASES = re.compile(r"\b(?:(?P<req>at least|need to have|we require|currently pursuing)|(?P<pref>nice to have|strongly preferred))\b", re.I)
+_CUE_PHRASE_GATE = frozenset({"least", "need", "require", "pursuing", "nice", "strongly"})
+_MUST_CUES = {"req", "exp", "you"}
+
+_SKILL_TOKENS = {w: (w.title() if w.isalpha() else w) for w in _SKILL_WORDS if _RUN.fullmatch(w)}
+_SKILL_PHRASES = [
+    (w, re.compile(rf"(?<![\w-]){re.escape(w)}(?![\w-])", re.I), w)
+    for w in _SKILL_WORDS if not _RUN.fullmatch(w)
+]
+_ALIAS_TOKENS = frozenset({"aws", "gcp", "azure", "sql", "graphql", "rest"})
+_ALIAS_PHRASES = re.compile(r"\b(React(?: Native)?|Next\.js|Node\.js)\b", re.I)
+
+def _fold(s: str) -> str:
+    return s.translate(_CASE_FOLD).lower()
+
+def _collect_skills(text: str) -> set:
+    low = _fold(text)
+    found = {_SKILL_TOKENS[t] for t in set(_RUN.findall(low)) if t in _SKILL_TOKENS}
+    for w, pat, label in _SKILL_PHRASES:
+        if w in low and pat.search(text):
+            found.add(label)
+    for tok in set(_WORD.findall(text)):
+        if _fold(tok) in _ALIAS_TOKENS:
+            found.add(tok if tok.isupper() else tok.title())
+    if "react" in low or "next.js" in low or "node.js" in low:
+        for m in _ALIAS_PHRASES.findall(text):
+            found.add(m if m.isupper() else m.title())
+    return found
+
+def _line_cues(line: str, low: str) -> set:
+    words = set(_WORD.findall(low))
+    cues = {name for name, vocab in _CUE_WORDS if not words.isdisjoint(vocab)}
+    if not words.isdisjoint(_CUE_PHRASE_GATE):
+        cues.update(m.lastgroup for m in _CUE_PHRASES.finditer(line))
+    return cues
+
+def _scan_lines(lines: List[str]) -> Tuple[List[str], List[str], set, List[str]]:
+    """One pass over the JD lines: section headers, cue classification and
+    requirement filtering; skills come from a single tokenization of the body.
+    Also returns the (lowercased) section headers seen."""
+    must: List[str] = []
+    nice: List[str] = []
+    body: List[str] = []
+    headers: List[str] = []
+    pref_section = False
+    # lines hold no line breaks, so the folded text splits back 1:1
+    for ln, low in zip(lines, _fold("\n".join(lines)).split("\n")):
+        if _SECTION_HEADER.match(ln):
+            pref_section = bool(_PREF_SECTION.search(ln))
+            headers.append(ln.lower())
+            continue
+        body.append(ln)
+        # requirement statements are substantial, not links and not short instructions
+        if len(ln) <= 30 or ln.startswith(("http", "www.")):
+            continue
+        cues = _line_cues(ln, low)
+        if "instr" in cues and len(ln) < 100:
+            continue
+        if pref_section or "pref" in cues:
+            nice.append(ln)
+        elif cues & _MUST_CUES:
+            must.append(ln)
+    return must, nice, _collect_skills("\n".join(body)), headers
 
-def _normalize_unique(items: List[str]) -> List[str]:
+def _normalize_unique(items: List[str], limit: int = None, exclude: set = frozenset()) -> List[str]:
     norm, seen = [], set()
     for x in items:
-        s = re.sub(r"\s+[()\[\]{},;:]+$", "", str(x or "").strip())
-        s = re.sub(r"\s+", " ", s)
+        s = _TRAILING_PUNCT.sub("", str(x or "").strip())
+        s = _WS.sub(" ", s)
         k = s.lower()
         if not s or k in seen:
             continue
         seen.add(k)
+        if k in exclude:
+            continue
         norm.append(s)
+        if len(norm) == limit:
+            break
     return norm
 
+_INTERN_TITLE = re.compile(r"\bintern|co-?op\b")
+_FRONTEND = re.compile(r"front\s*end|react")
+_BACKEND = re.compile(r"back\s*end|api|node|django|flask|fastapi")
+_MOBILE = re.compile(r"mobile|react native")
+_FULLSTACK = re.compile(r"full[- ]?stack")
+_INTERN_TITLES = [
+    (_FRONTEND, "Frontend Engineering Intern"),
+    (_BACKEND, "Backend Engineering Intern"),
+    (_MOBILE, "Mobile Engineering Intern"),
+    (_FULLSTACK, "Full Stack Engineering Intern"),
+]
+_TITLES = [
+    (_FULLSTACK, "Full Stack Engineer"),
+    (_FRONTEND, "Frontend Engineer"),
+    (_BACKEND, "Backend Engineer"),
+    (re.compile(r"data\s+engineer|spark|hadoop"), "Data Engineer"),
+    (re.compile(r"software\s+engineer|developer"), "Software Engineer"),
+]
+
 def _guess_title(text: str) -> str:
     t = text.lower()
-    if re.search(r"\bintern|co-?op\b", t):
-        if re.search(r"front\s*end|react", t):
-            return "Frontend Engineering Intern"
-        if re.search(r"back\s*end|api|node|django|flask|fastapi", t):
-            return "Backend Engineering Intern"
-        if re.search(r"mobile|react native", t):
-            return "Mobile Engineering Intern"
-        if re.search(r"full[- ]?stack", t):
-            return "Full Stack Engineering Intern"
-        return "Software Engineering Intern"
-    if re.search(r"full[- ]?stack", t):
-        return "Full Stack Engineer"
-    if re.search(r"front\s*end|react", t):
-        return "Frontend Engineer"
-    if re.search(r"back\s*end|api|node|django|flask|fastapi", t):
-        return "Backend Engineer"
-    if re.search(r"data\s+engineer|spark|hadoop", t):
-        return "Data Engineer"
-    if re.search(r"software\s+engineer|developer", t):
-        return "Software Engineer"
-    return ""
+    if _INTERN_TITLE.search(t):
+        return next((title for pat, title in _INTERN_TITLES if pat.search(t)), "Software Engineering Intern")
+    return next((title for pat, title in _TITLES if pat.search(t)), "")
+
+_DOMAIN = re.compile(r"\b([a-z0-9-]+\.(?:ai|com|io|co|org|net))\b", re.I)
+_AT_COMPANY = re.compile(r"\b(?:at|join)\s+([A-Z][A-Za-z0-9&'\-]+)\b")
 
 def _guess_company(text: str) -> str:
     # Try to capture a bare domain if present
-    m = re.search(r"\b([a-z0-9-]+\.(?:ai|com|io|co|org|net))\b", text, re.I)
+    m = _DOMAIN.search(text)
     if m:
         return m.group(1)
     # Look for patterns like 'at Acme' or 'join Acme'
-    m = re.search(r"\b(?:at|join)\s+([A-Z][A-Za-z0-9&'\-]+)\b", text)
+    m = _AT_COMPANY.search(text)
     if m:
         return m.group(1)
     return ""
 
 def _deterministic_extract(text: str) -> Dict[str, Any]:
+    return _deterministic_extract_scored(text)[0]
+
+def _deterministic_extract_scored(text: str) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Heuristic extraction plus a 0..1 confidence per field (see _confidence)."""
     t = str(text or "")
     out = DEFAULT_JD.copy()
     # seniority heuristic
-    out["seniority"] = SENIORITY_INTERN if re.search(r"\bintern|co-?op|student\b", t, re.I) else ""
+    out["seniority"] = SENIORITY_INTERN if _INTERN_CUE.search(t) else ""
     out["location"] = "Remote" if _REMOTE_CUE.search(t) else ""
     out["title"] = _guess_title(t)
     out["company"] = _guess_company(text)
-    # section-aware split
+    # section-aware scan
     lines = _split_lines(t)
-    sections = _detect_sections(lines)
-
-    must, nice, skills = _scan_blocks(sections if sections else [("", lines)])
+    must, nice, skills, headers = _scan_lines(lines)
 
     # if we have bullets but no cues, treat short bullet lines as must
+    fallback_must = False
     if not must and any(len(ln) < 140 for ln in lines):
+        fallback_must = True
         for ln in lines:
             if len(ln) <= 140:
                 must.append(ln)
 
     # normalize lists
-    out["must_haves"] = _normalize_unique(must)[:12]
-    out["nice_to_haves"] = [s for s in _normalize_unique(nice) if s.lower() not in {m.lower() for m in out["must_haves"]}][:12]
-    out["skills"] = [s for s in sorted({*skills}, key=lambda x: x.lower()) if s.lower() not in {m.lower() for m in out["must_haves"]}][:20]
+    out["must_haves"] = _normalize_unique(must, limit=12)
+    must_keys = {m.lower() for m in out["must_haves"]}
+    out["nice_to_haves"] = _normalize_unique(nice, limit=12, exclude=must_keys)
+    out["skills"] = [s for s in sorted(skills, key=lambda x: x.lower()) if s.lower() not in must_keys][:20]
     # fallback summary
-    out["summary"] = (re.sub(r"\s+", " ", t).strip())[:600]
-    return out
-
-def _scan_blocks(blocks: List[Tuple[str, List[str]]]) -> Tuple[List[str], List[str], set]:
-    must: List[str] = []
-    nice: List[str] = []
-    skills: set = set()
-    for name, block in blocks:
-        for ln in block:
-            for s in _collect_skills_from_line(ln):
-                skills.add(s)
-            cls = _classify_line(name, ln)
-            if cls == "nice" and _is_requirement_line(ln):
-                nice.append(ln)
-            elif cls == "must" and _is_requirement_line(ln):
-                must.append(ln)
-            # If no explicit classification but looks like a requirement, treat as must-have
-            elif not cls and _is_requirement_line(ln) and re.search(r"\b(you|have|are|take|enjoy|love|passion|commitment)\b", ln, re.I):
-                must.append(ln)
-    return must, nice, skills
-
-def _openai_extract_strict(text: str) -> Dict[str, Any]:
+    out["summary"] = (_WS.sub(" ", t).strip())[:600]
+    return out, _confidence(t, out, headers, fallback_must)
+
+def _confidence(text: str, out: Dict[str, Any], headers: List[str], fallback_must: bool) -> Dict[str, float]:
+    """How much to trust each heuristic field: high when it came from an explicit
+    signal (stated title, section header, domain), low when it was a guess or a
+    blind fallback."""
+    req_section = any(not _PREF_SECTION.search(h) and not h.startswith(("what you", "responsibilit")) for h in headers)
+    pref_section = any(_PREF_SECTION.search(h) for h in headers)
+    conf = {
+        "title": 0.0 if not out["title"] else (0.9 if out["title"].lower() in text.lower() else 0.5),
+        # a domain ("acme.ai") is explicit; "at/join X" is a guess
+        "company": 0.8 if "." in out["company"] else (0.5 if out["company"] else 0.0),
+        "location": 0.8 if out["location"] else 0.3,
+        "seniority": 0.9 if out["seniority"] else 0.3,
+        "skills": min(0.9, 0.3 + 0.15 * len(out["skills"])),
+        "summary": 0.8 if len(out["summary"]) < 600 else 0.4,
+    }
+    if fallback_must or not out["must_haves"]:
+        conf["must_haves"] = 0.2
+    else:
+        conf["must_haves"] = 0.9 if req_section else 0.6
+    if out["nice_to_haves"]:
+        conf["nice_to_haves"] = 0.9 if pref_section else 0.7
+    else:
+        # a sectioned JD without a preferred block most likely has none
+        conf["nice_to_haves"] = 0.7 if req_section else 0.4
+    return {k: round(v, 2) for k, v in conf.items()}
+
+# --- prompt compaction ------------------------------------------------------
+# Blocks the extraction rules tell the model to ignore anyway are dropped
+# before the OpenAI call; "about us" keeps its first line since it usually
+# names the company. What is left is trimmed to AI_INPUT_TOKEN_BUDGET,
+# requirement lines first.
+_ABOUT_HEADER = re.compile(r"^(about (us|the (company|team))|who we are|our (story|mission|company))\:?$", re.I)
+_DROP_HEADER = re.compile(
+    r"^(benefits?|perks( (and|&) benefits)?|what we offer|why (join us|work (here|with us))|our (culture|values)"
+    r"|compensation( (and|&) benefits)?|equal (employment )?opportunity|eeo( statement)?|diversity( (and|&) inclusion)?"
+    r"|how to apply|to apply|application process|in your application|application questions?|additional information)\:?$",
+    re.I,
+)
+_ANY_HEADER = re.compile(r"^[^.!?]{2,60}\:$")
+_BOILERPLATE = re.compile(
+    r"equal (employment )?opportunity|without regard to|reasonable accommodation|e-verify"
+    r"|celebrate diversity|protected (veteran|characteristic)|click (here|apply)|apply now",
+    re.I,
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_LONG_LINE = 400
+_ENCODERS: Dict[str, Any] = {}
+_TIKTOKEN_BLOB = "https://openaipublic.blob.core.windows.net/encodings/{}.tiktoken"
+
+def _tiktoken_cached(name: str) -> bool:
+    """Whether tiktoken has encoding `name` in its cache dir. Loading one
+    that isn't there downloads it, which must not happen inside a request;
+    the build step fetches them into TIKTOKEN_CACHE_DIR (see render.yaml)."""
+    cache_dir = os.environ.get("TIKTOKEN_CACHE_DIR", os.environ.get(
+        "DATA_GYM_CACHE_DIR", os.path.join(tempfile.gettempdir(), "data-gym-cache")))
+    if not cache_dir:   # "" turns tiktoken's cache off: every load downloads
+        return False
+    key = hashlib.sha1(_TIKTOKEN_BLOB.format(name).encode()).hexdigest()
+    return os.path.exists(os.path.join(cache_dir, key))
+
+def count_tokens(text: str, model: str = None) -> int:
+    """Prompt tokens for `text`: tiktoken when it is installed and has its
+    encoding locally, otherwise the usual ~4 characters per token estimate."""
+    model = model or os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
+    if model not in _ENCODERS:
+        enc = None
+        if tiktoken:
+            try:
+                name = tiktoken.encoding_name_for_model(model)
+            except Exception:
+                name = "cl100k_base"
+            if _tiktoken_cached(name):
+                try:
+                    enc = tiktoken.get_encoding(name)
+                except Exception:
+                    enc = None
+            else:
+                logger.info("tiktoken encoding %s is not cached locally; estimating tokens from length", name)
+        _ENCODERS[model] = enc
+    enc = _ENCODERS[model]
+    if enc is not None:
+        return len(enc.encode(text or "", disallowed_special=()))
+    return (len(text or "") + 3) // 4
+
+def _compact_for_llm(text: str, budget: int) -> str:
+    units: List[str] = []
+    for ln in _split_lines(text):
+        # flattened pages arrive as one huge line; work sentence by sentence
+        units.extend(_SENTENCE_END.split(ln) if len(ln) > _LONG_LINE else [ln])
+
+    kept: List[Tuple[int, str]] = []   # (priority, line); 0 is kept first
+    mode, section_pri = "keep", 1
+    for ln in units:
+        if _DROP_HEADER.match(ln):
+            mode = "drop"
+            continue
+        if _ABOUT_HEADER.match(ln):
+            mode = "about"
+            continue
+        if _SECTION_HEADER.match(ln) or _ANY_HEADER.match(ln):
+            mode = "keep"
+            duties = ln.lower().startswith(("what you", "responsibilit"))
+            section_pri = 2 if duties else (0 if _SECTION_HEADER.match(ln) else 1)
+            kept.append((section_pri, ln))
+            continue
+        if mode == "drop":
+            continue
+        if mode == "about":
+            mode = "drop"
+            ln = _SENTENCE_END.split(ln)[0]
+        if _BOILERPLATE.search(ln):
+            ln = " ".join(s for s in _SENTENCE_END.split(ln) if not _BOILERPLATE.search(s))
+            if not ln:
+                continue
+        pri = section_pri
+        if len(kept) < 3 or _line_cues(ln, _fold(ln)) & {"req", "pref", "exp"}:
+            pri = 0
+        kept.append((pri, ln))
+
+    out = "\n".join(ln for _, ln in kept)
+    if budget <= 0 or count_tokens(out) <= budget:
+        return out
+    chosen, used = set(), 0
+    for pri in (0, 1, 2):
+        for i, (p, ln) in enumerate(kept):
+            if p != pri:
+                continue
+            n = count_tokens(ln) + 1
+            if used + n > budget:
+                continue
+            chosen.add(i)
+            used += n
+    return "\n".join(ln for i, (_, ln) in enumerate(kept) if i in chosen)
+
+def _tools_for(fields: List[str] = None) -> List[Dict[str, Any]]:
+    """TOOLS, optionally narrowed to `fields` so the model only fills those."""
+    if not fields:
+        return TOOLS
+    fn = TOOLS[0]["function"]
+    params = fn["parameters"]
+    keep = [k for k in params["required"] if k in fields]
+    return [{"type": "function", "function": {**fn, "parameters": {
+        **params,
+        "properties": {k: params["properties"][k] for k in keep},
+        "required": keep,
+    }}}]
+
+def _openai_client(timeout: float = None):
+    # AI_BASE_URL points the client at a compatible server (e.g. bench/fake_openai.py).
+    # With a deadline, SDK retries are off: the fallback chain is the retry.
+    kwargs = {"timeout": timeout, "max_retries": 0} if timeout else {}
+    return OpenAI(api_key=settings.AI_API_KEY, base_url=getattr(settings, "AI_BASE_URL", "") or None, **kwargs)
+
+def _record_usage(operation: str, model: str, t0: float, usage=None, messages: List[Dict[str, str]] = None,
+                  output: str = "", error: str = "", first_token_ms: float = None) -> None:
+    """Ledger entry for one completion (utils.llm_usage). Without a `usage`
+    from the provider, tokens are counted locally and flagged estimated."""
+    counts, estimated = llm_usage.usage_counts(usage), False
+    if usage is None and (output or not error):   # an aborted stream still used its tokens
+        estimated = True
+        counts["prompt_tokens"] = sum(count_tokens(m.get("content") or "", model) for m in messages or [])
+        counts["completion_tokens"] = count_tokens(output, model)
+    llm_usage.record(operation, model, (time.perf_counter() - t0) * 1000, estimated=estimated,
+                     first_token_ms=first_token_ms, error=error, **counts)
+
+def _openai_extract_strict(text: str, fields: List[str] = None, model: str = None, timeout: float = None) -> Dict[str, Any]:
     if not (settings.AI_PROVIDER == "openai" and settings.AI_API_KEY and OpenAI):
         raise RuntimeError("OpenAI not configured")
-    client = OpenAI(api_key=settings.AI_API_KEY)
+    client = _openai_client(timeout)
+
+    budget = int(os.environ.get("AI_INPUT_TOKEN_BUDGET", "1500"))
+    prompt_text = _compact_for_llm(text, budget)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("prompt compaction: %d -> %d tokens (budget %d)",
+                     count_tokens(text), count_tokens(prompt_text), budget)
 
     messages = [
         {"role":"system","content": SYSTEM_MSG},
@@ -260,18 +476,25 @@ def _openai_extract_strict(text: str) -> Dict[str, Any]:
             "Extract the fields from this job description. Infer a realistic job title based on responsibilities and technologies when an explicit title is not provided.\n"
             "Focus on explicit requirement cues for must_haves vs preferred cues for nice_to_haves.\n"
             "If a section header like 'Requirements', 'Qualifications', 'Preferred', 'Bonus' appears, use it to guide classification.\n\n"
-            f"Job Description:\n{text}"
+            f"Job Description:\n{prompt_text}"
         )}
     ]
 
-    resp = client.chat.completions.create(
-        model=os.environ.get("OPENAI_MODEL","gpt-4o-mini"),
-        messages=messages,
-        tools=TOOLS,
-        tool_choice={"type":"function","function":{"name":"set_jd"}},
-        temperature=float(os.environ.get("AI_TEMPERATURE","0.0")),
-        max_tokens=int(os.environ.get("AI_MAX_TOKENS","700")),
-    )
+    model = model or os.environ.get("OPENAI_MODEL","gpt-4o-mini")
+    t0 = time.perf_counter()
+    try:
+        resp = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            tools=_tools_for(fields),
+            tool_choice={"type":"function","function":{"name":"set_jd"}},
+            temperature=float(os.environ.get("AI_TEMPERATURE","0.0")),
+            max_tokens=int(os.environ.get("AI_MAX_TOKENS","700")),
+        )
+    except Exception as e:
+        _record_usage("extract", model, t0, error=e.__class__.__name__)
+        raise
+    _record_usage("extract", model, t0, getattr(resp, "usage", None), messages)
 
     msg = resp.choices[0].message
     if not getattr(msg, "tool_calls", None):
@@ -288,27 +511,72 @@ def _openai_extract_strict(text: str) -> Dict[str, Any]:
     data = json.loads(args_str)
     return _ensure_shape(data)
 
-def _merge_ai_over_base(base: Dict[str, Any], ai: Dict[str, Any]) -> Dict[str, Any]:
+def _merge_ai_over_base(base: Dict[str, Any], ai: Dict[str, Any], fields: List[str] = None) -> Dict[str, Any]:
     data = base.copy()
     for k in ("skills","must_haves","nice_to_haves"):
-        if ai.get(k):
+        if ai.get(k) and (fields is None or k in fields):
             data[k] = ai[k]
     for k in ("title","company","location","seniority","summary"):
-        data[k] = ai.get(k) or data.get(k) or ""
+        if fields is None or k in fields:
+            data[k] = ai.get(k) or data.get(k) or ""
     return data
 
-def extract_jd(text: str) -> Dict[str, Any]:
-    """Public API used by the view. AI-first; optional heuristic fallback."""
+# LLM gating: "off" always calls the LLM, "all" calls it for the whole JD when a
+# gated field is uncertain, "fields" asks it only for the uncertain fields.
+_GATE_MODES = ("off", "all", "fields")
+_DEFAULT_GATED = "title,skills,must_haves,nice_to_haves"
+
+def _llm_plan(conf: Dict[str, float]) -> Tuple[str, List[str]]:
+    """Return (mode, fields to request); fields is empty when the LLM can be skipped."""
+    mode = os.environ.get("AI_LLM_GATE", "fields").lower()
+    if mode not in _GATE_MODES:
+        mode = "fields"
+    if mode == "off":
+        return mode, list(DEFAULT_JD)
+    threshold = float(os.environ.get("AI_CONFIDENCE_THRESHOLD", "0.7"))
+    gated = [f.strip() for f in os.environ.get("AI_GATE_FIELDS", _DEFAULT_GATED).split(",") if f.strip()]
+    if all(conf.get(f, 0.0) >= threshold for f in gated):
+        return mode, []
+    if mode == "all":
+        return mode, list(DEFAULT_JD)
+    return mode, [f for f in DEFAULT_JD if conf.get(f, 0.0) < threshold]
+
+def extract_jd(text: str, llm_gate: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+    """Public API used by the view. AI-first; optional heuristic fallback.
+
+    `llm_gate`, when given, is asked right before an LLM call; returning False
+    keeps the deterministic result (used to degrade throttled callers).
+    """
     strict_only = str(os.environ.get("AI_STRICT_ONLY","0")).lower() in ("1","true","yes")
     try:
-        base = _deterministic_extract(text)
+        t0 = time.perf_counter()
+        with span("heuristic"):
+            base, conf = _deterministic_extract_scored(text)
         data = base
-        # try AI and merge if available
-        try:
-            ai = _openai_extract_strict(text)
-            data = _merge_ai_over_base(base, ai)
-        except Exception:
-            pass
+        mode, fields = ("off", list(DEFAULT_JD)) if strict_only else _llm_plan(conf)
+        heur_ms = (time.perf_counter() - t0) * 1000
+        # try AI and merge if available, but only when the heuristics are unsure
+        llm_ms, outcome = 0.0, "skipped"
+        if fields and llm_gate is not None and not llm_gate():
+            fields, outcome = [], "throttled"
+        if fields:
+            t1 = time.perf_counter()
+            full = len(fields) == len(DEFAULT_JD)
+            try:
+                with span("llm"):
+                    ai, link = chain.call_with_fallback(
+                        lambda p: _openai_extract_strict(text, None if full else fields, model=p.model, timeout=p.timeout))
+                data = _merge_ai_over_base(base, ai, None if full else fields)
+                outcome = f"ok:{link.model}"
+            except chain.AllProvidersFailed as e:
+                outcome = f"failed ({e})"
+            except Exception as e:
+                outcome = f"failed: {e.__class__.__name__}"
+            llm_ms = (time.perf_counter() - t1) * 1000
+        logger.info(
+            "extract_jd gate mode=%s llm=%s fields=%s min_conf=%.2f heuristic_ms=%.1f llm_ms=%.1f chars=%d conf=%s",
+            mode, outcome, ",".join(fields) or "-", min(conf.values()), heur_ms, llm_ms, len(text or ""), conf,
+        )
         if not (data.get("skills") or data.get("must_haves") or data.get("nice_to_haves")):
             data = base
         return data
@@ -317,12 +585,33 @@ def extract_jd(text: str) -> Dict[str, Any]:
         if strict_only:
             # Pure AI mode: return empty shape with summary so UI isn't blank.
             d = DEFAULT_JD.copy()
-            d["seniority"] = SENIORITY_INTERN if re.search(r"\bintern|co-?op|student\b", text, re.I) else ""
-            d["summary"] = (re.sub(r"\s+"," ", text).strip())[:600]
+            d["seniority"] = SENIORITY_INTERN if _INTERN_CUE.search(text) else ""
+            d["summary"] = (_WS.sub(" ", text).strip())[:600]
             return d
         # Deterministic fallback to extract requirements and skills
         return _deterministic_extract(text)
 
+def extract_jd_from_posting(posting: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a schema.org JobPosting (see utils.jsonld) into the JD shape without the LLM.
+
+    Title/company/location come straight from the structured fields; only the
+    description goes through the deterministic extractor.
+    """
+    description = str(posting.get("description") or "")
+    with span("heuristic"):
+        data = _deterministic_extract(description)
+    data["title"] = posting.get("title") or data["title"]
+    data["company"] = posting.get("company") or data["company"]
+    if posting.get("remote"):
+        data["location"] = "Remote"
+    else:
+        data["location"] = posting.get("location") or data["location"]
+    if re.search(r"\bintern", str(posting.get("employment_type") or ""), re.I):
+        data["seniority"] = SENIORITY_INTERN
+    skills = [*(posting.get("skills") or []), *data["skills"]]
+    data["skills"] = sorted(_normalize_unique(skills), key=lambda x: x.lower())
+    return _ensure_shape(data)
+
 def suggest_resume_patches(jd_struct: Dict[str, Any], resume_text: str) -> Dict[str, Any]:
     """Generate resume improvement suggestions based on job requirements."""
     if not jd_struct or not resume_text:
@@ -414,3 +703,101 @@ Best regards,
 [Your Name]"""
     
     return cover_letter
+
+
+# --- LLM document generation -----------------------------------------------
+DOC_SYSTEM_MSG = (
+    "You write job application material in Markdown. Use only facts from the candidate's resume; "
+    "never invent employers, dates, degrees or numbers. Match the job's must-haves and skills where the resume supports them."
+)
+DOC_INSTRUCTIONS = {
+    "bullets": "Write 4-6 tailored resume bullets, one per line, each starting with '• '. No heading or preamble.",
+    "coverletter": (
+        "Write a concise cover letter (under 300 words) addressed 'Dear Hiring Manager,' and signed "
+        "'Best regards,\n[Your Name]'. No subject line."
+    ),
+}
+DOC_TEMPLATES = {"bullets": generate_bullets, "coverletter": generate_cover_letter}
+
+def _doc_messages(kind: str, jd_struct: Dict[str, Any], resume_text: str) -> List[Dict[str, str]]:
+    jd = {k: jd_struct.get(k) for k in ("title", "company", "location", "seniority", "skills", "must_haves", "nice_to_haves")}
+    budget = int(os.environ.get("AI_INPUT_TOKEN_BUDGET", "1500"))
+    return [
+        {"role": "system", "content": DOC_SYSTEM_MSG},
+        {"role": "user", "content": (
+            f"{DOC_INSTRUCTIONS[kind]}\n\n"
+            f"Job (JSON):\n{json.dumps(jd, ensure_ascii=False)}\n\n"
+            f"Resume:\n{_compact_for_llm(resume_text or '', budget)}"
+        )},
+    ]
+
+def stream_document(kind: str, jd_struct: Dict[str, Any], resume_text: str,
+                    llm_gate: Optional[Callable[[], bool]] = None) -> Iterator[str]:
+    """Yield a generated document as text chunks.
+
+    Walks the provider chain like extract_jd; a link that fails before any
+    text arrives falls through to the next. Without a usable link, when
+    `llm_gate` returns False, or when a completion succeeds with no text,
+    yields the template version in one chunk. A failure after text has been
+    streamed is re-raised.
+    """
+    kind = kind if kind in DOC_TEMPLATES else "bullets"
+    template = DOC_TEMPLATES[kind]
+    jd_struct = jd_struct or {}
+    if not (OpenAI and jd_struct) or (llm_gate is not None and not llm_gate()):
+        yield template(jd_struct, resume_text)
+        return
+
+    messages = _doc_messages(kind, jd_struct, resume_text)
+    started = False
+    for link in chain.get_chain():
+        if not link.breaker.allow():
+            continue
+        started, recorded = False, False
+        parts, usage, first_ms = [], None, None
+        t0 = time.perf_counter()
+        try:
+            stream = _openai_client(link.timeout).chat.completions.create(
+                model=link.model,
+                messages=messages,
+                temperature=float(os.environ.get("AI_DOC_TEMPERATURE", "0.4")),
+                max_tokens=int(os.environ.get("AI_DOC_MAX_TOKENS", "700")),
+                stream=True,
+                # the last chunk then carries the token usage
+                extra_body={"stream_options": {"include_usage": True}},
+            )
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if not started:
+                        first_ms = (time.perf_counter() - t0) * 1000
+                        logger.info("stream_document kind=%s model=%s first_token_ms=%.0f", kind, link.model, first_ms)
+                    started = True
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            recorded = True
+            _record_usage(f"doc:{kind}", link.model, t0, error=e.__class__.__name__, first_token_ms=first_ms)
+            link.breaker.record_failure()
+            if started:
+                raise
+            logger.warning("stream_document kind=%s model=%s failed", kind, link.model, exc_info=True)
+            continue
+        else:
+            recorded = True
+            _record_usage(f"doc:{kind}", link.model, t0, usage, messages, "".join(parts), first_token_ms=first_ms)
+            link.breaker.record_success()
+            if not started:
+                # a paid answer, just empty: don't pay the next link for another one
+                logger.warning("stream_document kind=%s model=%s returned no text; using the template", kind, link.model)
+            break
+        finally:
+            if not recorded:
+                # GeneratorExit: the client went away mid-stream. That says
+                # nothing about the provider, but a probe must not stay in flight.
+                _record_usage(f"doc:{kind}", link.model, t0, usage, messages, "".join(parts),
+                              error="aborted", first_token_ms=first_ms)
+                link.breaker.record_abort()
+    if not started:
+        yield template(jd_struct, resume_text)
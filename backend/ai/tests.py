@@ -0,0 +1,304 @@
+# backend/ai/tests.py
+import os, tempfile
+from types import SimpleNamespace as NS
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from . import chain, provider
+
+JD_STRUCT = {"title": "Backend Engineer", "company": "Acme", "skills": ["Python"], "must_haves": ["Python"]}
+RESUME = "Built payment APIs in Python and PostgreSQL."
+JD = """Backend Engineer at acme.io
+We build payment APIs.
+Requirements:
+- 3+ years Python experience required
+- Must know PostgreSQL and Redis well enough to tune
+Preferred:
+- Kubernetes experience is a plus for this role
+"""
+
+
+def _chunks(*texts):
+    return [NS(usage=None, choices=[NS(delta=NS(content=t))]) for t in texts]
+
+
+class FakeOpenAI:
+    """Stands in for _openai_client(): `replies` maps a model to the chunks
+    its stream yields, or to an exception raised before (or, after a list of
+    chunks, during) the stream."""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.calls = []
+        self.chat = NS(completions=NS(create=self.create))
+
+    def create(self, model, **kwargs):
+        self.calls.append(model)
+        reply = self.replies[model]
+        if isinstance(reply, Exception):
+            raise reply
+
+        def stream():
+            for item in reply:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        return stream()
+
+
+class LLMGateTests(SimpleTestCase):
+    SURE = {f: 0.9 for f in provider.DEFAULT_JD}
+
+    def plan(self, conf, **env):
+        with mock.patch.dict(os.environ, env):
+            return provider._llm_plan(conf)
+
+    def test_confident_heuristics_skip_the_llm(self):
+        self.assertEqual(self.plan({**self.SURE, "location": 0.3}), ("fields", []))   # location isn't gated
+
+    def test_fields_mode_asks_only_for_the_uncertain_fields(self):
+        conf = {**self.SURE, "skills": 0.5, "location": 0.3}
+        self.assertEqual(self.plan(conf), ("fields", ["location", "skills"]))
+
+    def test_all_mode_asks_for_everything(self):
+        conf = {**self.SURE, "skills": 0.5}
+        self.assertEqual(self.plan(conf, AI_LLM_GATE="all"), ("all", list(provider.DEFAULT_JD)))
+
+    def test_off_mode_always_calls(self):
+        self.assertEqual(self.plan(self.SURE, AI_LLM_GATE="off"), ("off", list(provider.DEFAULT_JD)))
+
+    def test_threshold_and_gated_fields_are_configurable(self):
+        conf = {**self.SURE, "title": 0.8}
+        self.assertEqual(self.plan(conf, AI_CONFIDENCE_THRESHOLD="0.85")[1], ["title"])
+        self.assertEqual(self.plan(conf, AI_CONFIDENCE_THRESHOLD="0.85", AI_GATE_FIELDS="skills"), ("fields", []))
+        self.assertEqual(self.plan(conf, AI_LLM_GATE="bogus")[0], "fields")
+
+
+@override_settings(AI_PROVIDER="openai", AI_API_KEY="test", AI_MODEL_CHAIN=["primary"], AI_TIMEOUTS=[5.0],
+                   LLM_USAGE_ENABLED=False)
+class ExtractGatingTests(SimpleTestCase):
+    def setUp(self):
+        chain.reset_chain()
+        self.addCleanup(chain.reset_chain)
+
+    def extract(self, text, **kwargs):
+        with mock.patch.object(provider, "_openai_extract_strict", return_value={"location": "Berlin"}) as llm:
+            return provider.extract_jd(text, **kwargs), llm
+
+    def test_clear_jd_is_answered_without_the_llm(self):
+        data, llm = self.extract(JD)
+        llm.assert_not_called()
+        self.assertEqual(data["title"], "Backend Engineer")
+        self.assertIn("3+ years Python experience required", data["must_haves"])
+
+    def test_unsure_fields_are_requested_and_merged(self):
+        with mock.patch.object(provider, "_deterministic_extract_scored",
+                               return_value=({**provider.DEFAULT_JD, "title": "Engineer", "skills": ["Python"]},
+                                             {**LLMGateTests.SURE, "location": 0.3, "skills": 0.2})):
+            data, llm = self.extract(JD)
+        self.assertEqual(llm.call_args.args[1], ["location", "skills"])
+        self.assertEqual((data["title"], data["location"]), ("Engineer", "Berlin"))
+
+    def test_closed_gate_keeps_the_heuristics(self):
+        with mock.patch.object(provider, "_deterministic_extract_scored",
+                               return_value=(dict(provider.DEFAULT_JD), {**LLMGateTests.SURE, "skills": 0.2})):
+            data, llm = self.extract(JD, llm_gate=lambda: False)
+        llm.assert_not_called()
+        self.assertEqual(data["location"], "")
+
+
+class CompactionTests(SimpleTestCase):
+    JD = ("Backend Engineer at Acme\n"
+          "About us:\nAcme builds payment rails for small shops. We were founded in 2015. We have five offices.\n"
+          "Responsibilities:\n"
+          + "".join(f"- Own service number {i} and keep it healthy in production every day\n" for i in range(40))
+          + "Requirements:\n- 5+ years of Python experience required\n- Strong PostgreSQL skills required\n"
+          "Benefits:\n- Free lunch\n- Unlimited PTO\n"
+          "How to apply:\nSend your CV to jobs@acme.example\n")
+
+    def test_boilerplate_is_dropped(self):
+        out = provider._compact_for_llm(self.JD, 0)
+        self.assertIn("Acme builds payment rails for small shops.", out)
+        for gone in ("founded in 2015", "Free lunch", "Unlimited PTO", "jobs@acme.example"):
+            self.assertNotIn(gone, out)
+
+    def test_budget_is_kept_and_requirements_come_first(self):
+        for budget in (60, 120, 300):
+            out = provider._compact_for_llm(self.JD, budget)
+            self.assertLessEqual(provider.count_tokens(out), budget)
+            self.assertIn("5+ years of Python experience required", out)
+            self.assertIn("Strong PostgreSQL skills required", out)
+        out = provider._compact_for_llm(self.JD, 120)
+        self.assertIn("service number 0 ", out)
+        self.assertNotIn("service number 39", out)
+        self.assertLess(out.index("service number 0 "), out.index("Requirements:"))   # original order
+
+    def test_flattened_page_is_cut_by_sentence(self):
+        flat = " ".join(f"Sentence {i} says the team ships payment software daily." for i in range(200))
+        flat += " Python experience is required."
+        out = provider._compact_for_llm(flat, 80)
+        self.assertLessEqual(provider.count_tokens(out), 80)
+        self.assertIn("Python experience is required.", out)
+
+    @override_settings(AI_PROVIDER="openai", AI_API_KEY="test", LLM_USAGE_ENABLED=False)
+    def test_prompt_sent_to_the_llm_is_compacted(self):
+        call = NS(function=NS(arguments='{"title": "Backend Engineer"}'))
+        client = mock.Mock()
+        client.chat.completions.create.return_value = NS(
+            usage=None, choices=[NS(message=NS(tool_calls=[call], content=None))])
+        with mock.patch.object(provider, "_openai_client", return_value=client), \
+                mock.patch.dict(os.environ, {"AI_INPUT_TOKEN_BUDGET": "100"}):
+            provider._openai_extract_strict(self.JD, model="gpt-4o-mini")
+        prompt = client.chat.completions.create.call_args.kwargs["messages"][-1]["content"]
+        jd_part = prompt.split("Job Description:\n", 1)[1]
+        self.assertLessEqual(provider.count_tokens(jd_part), 100)
+        self.assertIn("5+ years of Python experience required", jd_part)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(chain.time, "monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = chain.CircuitBreaker("test", failures=2, reset_after=30.0, probe_timeout=120.0)
+
+    def trip(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertFalse(self.breaker.allow())
+
+    def test_single_probe_after_reset(self):
+        self.trip()
+        self.now += 30
+        self.assertTrue(self.breaker.allow())    # the probe
+        self.assertFalse(self.breaker.allow())   # in flight: nobody else
+        self.breaker.record_success()
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_probe_reopens(self):
+        self.trip()
+        self.now += 30
+        self.breaker.allow()
+        self.breaker.record_failure()
+        self.assertFalse(self.breaker.allow())
+        self.now += 30
+        self.assertTrue(self.breaker.allow())
+
+    def test_lost_probe_times_out(self):
+        self.trip()
+        self.now += 30
+        self.breaker.allow()
+        self.now += 119
+        self.assertFalse(self.breaker.allow())
+        self.now += 1
+        self.assertTrue(self.breaker.allow())
+
+    def test_abort_releases_the_probe(self):
+        self.trip()
+        self.now += 30
+        self.breaker.allow()
+        self.breaker.record_abort()
+        self.assertTrue(self.breaker.allow())
+
+
+@override_settings(AI_PROVIDER="openai", AI_API_KEY="test", AI_MODEL_CHAIN=["primary"], AI_TIMEOUTS=[5.0],
+                   AI_BREAKER_FAILURES=1, AI_BREAKER_RESET_SECONDS=0.0, LLM_USAGE_ENABLED=False)
+class StreamProbeTests(SimpleTestCase):
+    def setUp(self):
+        chain.reset_chain()
+        self.addCleanup(chain.reset_chain)
+        self.breaker = chain.get_chain()[0].breaker
+        self.breaker.record_failure()   # open; with no reset delay the next caller probes
+
+    def test_abandoned_stream_releases_the_probe(self):
+        client = FakeOpenAI({"primary": _chunks("Dear ", "team, ", "thanks")})
+        with mock.patch.object(provider, "_openai_client", return_value=client):
+            stream = provider.stream_document("coverletter", JD_STRUCT, RESUME)
+            self.assertEqual(next(stream), "Dear ")
+            self.assertEqual(self.breaker.state, chain.CircuitBreaker.HALF_OPEN)
+            stream.close()   # the client went away
+        self.assertNotEqual(self.breaker.state, chain.CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+
+    def test_completed_probe_closes_the_breaker(self):
+        client = FakeOpenAI({"primary": _chunks("Dear ", "team")})
+        with mock.patch.object(provider, "_openai_client", return_value=client):
+            self.assertEqual("".join(provider.stream_document("coverletter", JD_STRUCT, RESUME)), "Dear team")
+        self.assertEqual(self.breaker.state, chain.CircuitBreaker.CLOSED)
+
+
+class TokenCountTests(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(provider._ENCODERS.clear)
+        provider._ENCODERS.clear()
+
+    def test_missing_encoding_is_estimated_not_downloaded(self):
+        if provider.tiktoken is None:
+            self.skipTest("tiktoken is not installed")
+        with tempfile.TemporaryDirectory() as empty, \
+                mock.patch.dict(os.environ, {"TIKTOKEN_CACHE_DIR": empty}), \
+                mock.patch.object(provider.tiktoken, "get_encoding") as get_encoding:
+            self.assertEqual(provider.count_tokens("x" * 400, model="gpt-4o-mini"), 100)
+        get_encoding.assert_not_called()
+
+    def test_cached_encoding_is_used(self):
+        if provider.tiktoken is None:
+            self.skipTest("tiktoken is not installed")
+        enc = mock.Mock()
+        enc.encode.return_value = [1, 2, 3]
+        with mock.patch.object(provider, "_tiktoken_cached", return_value=True), \
+                mock.patch.object(provider.tiktoken, "get_encoding", return_value=enc) as get_encoding:
+            self.assertEqual(provider.count_tokens("three tokens here", model="gpt-4o-mini"), 3)
+            self.assertEqual(provider.count_tokens("again", model="gpt-4o-mini"), 3)
+        get_encoding.assert_called_once_with("o200k_base")
+
+
+@override_settings(AI_PROVIDER="openai", AI_API_KEY="test", AI_MODEL_CHAIN=["primary", "backup"], AI_TIMEOUTS=[5.0],
+                   AI_BREAKER_FAILURES=1, AI_BREAKER_RESET_SECONDS=30.0, LLM_USAGE_ENABLED=False)
+class StreamDocumentTests(SimpleTestCase):
+    def setUp(self):
+        chain.reset_chain()
+        self.addCleanup(chain.reset_chain)
+
+    def stream(self, replies):
+        self.client = FakeOpenAI(replies)
+        with mock.patch.object(provider, "_openai_client", return_value=self.client):
+            return "".join(provider.stream_document("coverletter", JD_STRUCT, RESUME))
+
+    def template(self):
+        return provider.DOC_TEMPLATES["coverletter"](JD_STRUCT, RESUME)
+
+    def test_falls_through_to_the_next_link_before_any_text(self):
+        out = self.stream({"primary": TimeoutError("slow"), "backup": _chunks("Dear ", "team")})
+        self.assertEqual(out, "Dear team")
+        self.assertEqual(self.client.calls, ["primary", "backup"])
+        self.assertEqual(chain.get_chain()[0].breaker.state, chain.CircuitBreaker.OPEN)
+
+    def test_every_link_failing_gives_the_template(self):
+        out = self.stream({"primary": TimeoutError("slow"), "backup": ConnectionError("down")})
+        self.assertEqual(out, self.template())
+
+    def test_empty_completion_goes_straight_to_the_template(self):
+        out = self.stream({"primary": _chunks("", None), "backup": _chunks("paid twice")})
+        self.assertEqual(out, self.template())
+        self.assertEqual(self.client.calls, ["primary"])
+        self.assertEqual(chain.get_chain()[0].breaker.state, chain.CircuitBreaker.CLOSED)
+
+    def test_failure_after_text_is_raised(self):
+        with self.assertRaises(ConnectionError):
+            self.stream({"primary": [*_chunks("Dear "), ConnectionError("reset")], "backup": _chunks("x")})
+        self.assertEqual(self.client.calls, ["primary"])
+
+    def test_gate_closed_gives_the_template_without_a_call(self):
+        self.client = FakeOpenAI({})
+        with mock.patch.object(provider, "_openai_client", return_value=self.client):
+            out = "".join(provider.stream_document("coverletter", JD_STRUCT, RESUME, llm_gate=lambda: False))
+        self.assertEqual(out, self.template())
+        self.assertEqual(self.client.calls, [])
@@ -32,6 +32,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "utils.timing.TimingMiddleware",   # outermost, so Server-Timing covers the whole stack
+    "utils.compression.CompressionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -39,6 +41,9 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "utils.profiling.ProfilingMiddleware",
+    "utils.db_routing.ReplicaRoutingMiddleware",   # only active with DATABASE_REPLICA_URLS
+    "utils.llm_usage.LLMUsageMiddleware",   # user/endpoint for the LLM usage ledger
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -64,14 +69,23 @@ TEMPLATES = [
 WSGI_APPLICATION = "applymate.wsgi.application"
 
 # ---- Database: SQLite locally, Supabase Postgres in prod ----
-if os.getenv("DATABASE_URL"):
+# Connection reuse is set per alias: DATABASE_CONN_MAX_AGE for the primary,
+# DATABASE_REPLICA_CONN_MAX_AGE for replicas (seconds; 0 = new connection per
+# request). Keep it below pgBouncer's server_idle_timeout when pooling there.
+DATABASE_CONN_MAX_AGE = int(os.getenv("DATABASE_CONN_MAX_AGE", "600"))
+DATABASE_REPLICA_CONN_MAX_AGE = int(os.getenv("DATABASE_REPLICA_CONN_MAX_AGE", str(DATABASE_CONN_MAX_AGE)))
+DATABASE_SSL_REQUIRE = os.getenv("DATABASE_SSL_REQUIRE", "1") == "1"   # 0 for local Postgres containers
+
+
+def _db_from_url(url, conn_max_age):
     import dj_database_url
+    return dj_database_url.parse(url, conn_max_age=conn_max_age, conn_health_checks=conn_max_age > 0,
+                                 ssl_require=DATABASE_SSL_REQUIRE and url.startswith("postgres"))
+
+
+if os.getenv("DATABASE_URL"):
     DATABASES = {
-        "default": dj_database_url.parse(
-            os.environ["DATABASE_URL"],
-            conn_max_age=600,     # works well with pgBouncer
-            ssl_require=True
-        )
+        "default": _db_from_url(os.environ["DATABASE_URL"], DATABASE_CONN_MAX_AGE),   # works well with pgBouncer
     }
 else:
     DATABASES = {
@@ -81,6 +95,20 @@ else:
         }
     }
 
+# Read replicas: comma-separated URLs, become aliases replica1, replica2, ...
+# Safe (GET/HEAD/OPTIONS) requests read from them, except for a user who wrote
+# within REPLICA_STICKY_SECONDS (see utils/db_routing.py). Locally, two SQLite
+# files work: DATABASE_REPLICA_URLS=sqlite:////abs/path/replica.sqlite3
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+DATABASE_REPLICAS = []
+for _i, _url in enumerate(DATABASE_REPLICA_URLS, 1):
+    DATABASES[f"replica{_i}"] = _db_from_url(_url, DATABASE_REPLICA_CONN_MAX_AGE)
+    DATABASES[f"replica{_i}"]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(f"replica{_i}")
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ["utils.db_routing.ReplicaRouter"]
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "10"))   # read-your-writes window after a write
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -124,8 +152,134 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # orjson-backed JSON (falls back to the stdlib when orjson isn't installed)
+    "DEFAULT_RENDERER_CLASSES": [
+        "utils.fast_json.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "utils.fast_json.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # proxies in front of the app; the client IP is read that many hops back in
+    # X-Forwarded-For. 0 uses REMOTE_ADDR: a client-sent header is never trusted
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
 }
 
 # AI Provider
-AI_PROVIDER = os.getenv("AI_PROVIDER", "openai")
+AI_PROVIDER = os.getenv("AI_PROVIDER", "openai")   # "openai", or "heuristic" to never call an LLM
 AI_API_KEY = os.getenv("AI_API_KEY", "")
+AI_BASE_URL = os.getenv("AI_BASE_URL", "")   # OpenAI-compatible server; empty = api.openai.com
+# fallback chain, tried in order before the heuristics, e.g. "gpt-4o,gpt-4o-mini"
+AI_MODEL_CHAIN = [m.strip() for m in os.getenv("AI_MODEL_CHAIN", os.getenv("OPENAI_MODEL", "gpt-4o-mini")).split(",") if m.strip()]
+AI_TIMEOUTS = [float(t) for t in os.getenv("AI_TIMEOUTS", "8,5").split(",") if t.strip()]   # seconds, per chain link
+AI_BREAKER_FAILURES = int(os.getenv("AI_BREAKER_FAILURES", "3"))
+AI_BREAKER_RESET_SECONDS = float(os.getenv("AI_BREAKER_RESET_SECONDS", "30"))
+AI_BREAKER_PROBE_SECONDS = float(os.getenv("AI_BREAKER_PROBE_SECONDS", "120"))   # a probe silent this long is given up
+
+# ---- Logging ----
+# ai.* logs the LLM gating decisions (confidence, fields requested, latency)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "ai": {"handlers": ["console"], "level": os.getenv("AI_LOG_LEVEL", "INFO")},
+    },
+}
+
+# ATS board APIs used for URL extraction (override to point at a local stub)
+ATS_API_BASES = {
+    "greenhouse": os.getenv("ATS_GREENHOUSE_API", "https://boards-api.greenhouse.io"),
+    "lever": os.getenv("ATS_LEVER_API", "https://api.lever.co"),
+    "ashby": os.getenv("ATS_ASHBY_API", "https://api.ashbyhq.com"),
+    "workday": os.getenv("ATS_WORKDAY_API", ""),   # empty: the tenant's own myworkdayjobs.com host
+}
+
+# ---- Request timing / metrics ----
+TIMING_ENABLED = os.getenv("TIMING_ENABLED", "1") == "1"   # Server-Timing header + /metrics histograms
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")   # /metrics requires "Authorization: Bearer <token>"; unset: staff or DEBUG only
+
+# ---- On-demand profiling (staff: "X-Profile: 1" header or ?_profile=1) ----
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "1") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))   # share of all requests to profile, e.g. 0.001
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))   # newest profiles kept in the database
+
+# ---- Resume PDF parsing (utils/resume_parse.py) ----
+RESUME_PDF_MAX_PAGES = int(os.getenv("RESUME_PDF_MAX_PAGES", "10"))
+RESUME_PDF_TIMEOUT = float(os.getenv("RESUME_PDF_TIMEOUT", "8"))   # seconds per document, all fallbacks included
+# 0 = parse in the request thread (deadline checked between pages only). N > 0 starts a pool of N
+# spawned processes per web worker, each a full interpreter with pdfminer: opt in where memory allows
+RESUME_PDF_WORKERS = int(os.getenv("RESUME_PDF_WORKERS", "0"))
+
+# ---- Cache ----
+# per-process memory by default; set CACHE_URL=redis://host:6379/0 to share it between workers
+CACHE_URL = os.getenv("CACHE_URL", "")
+if CACHE_URL.startswith(("redis://", "rediss://")):
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CACHE_URL}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "applymate"}}
+FIT_CACHE_TTL = int(os.getenv("FIT_CACHE_TTL", "86400"))   # seconds a fit_score result is kept; 0 disables the cache
+
+# ---- jobs/extract/ cost budgets (utils/cost_throttle.py) ----
+# cost units per caller and window; over budget the LLM is skipped, past
+# EXTRACT_HARD_LIMIT x budget the caller gets a 429. Units: EXTRACT_COSTS.
+EXTRACT_BUDGET_WINDOW = int(os.getenv("EXTRACT_BUDGET_WINDOW", "3600"))   # seconds
+EXTRACT_BUDGET_IP = int(os.getenv("EXTRACT_BUDGET_IP", "300"))   # anonymous callers, per client IP
+EXTRACT_BUDGET_USER = int(os.getenv("EXTRACT_BUDGET_USER", "1000"))   # callers sending a valid JWT
+EXTRACT_HARD_LIMIT = float(os.getenv("EXTRACT_HARD_LIMIT", "3"))
+EXTRACT_COSTS = {"base": 1, "kchar": 1, "fetch": 5, "llm": 20}   # per call, per started 1k chars, per fetch/LLM call
+
+# ---- Response compression (utils/compression.py) ----
+COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "1") == "1"
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))   # smaller bodies go out as-is
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))   # 0-11; >5 gets slow for dynamic responses
+
+# ---- Compressed text columns (utils/compressed_text.py) ----
+COMPRESSED_TEXT_CODEC = os.getenv("COMPRESSED_TEXT_CODEC", "zlib")   # "zstd" needs the zstandard package (reads too); zlib always works
+COMPRESSED_TEXT_MIN_BYTES = int(os.getenv("COMPRESSED_TEXT_MIN_BYTES", "256"))   # shorter values are stored as plain utf-8
+
+# ---- Delta sync (GET /api/changes/?since=<cursor>, jobs/sync.py) ----
+SYNC_OVERLAP_SECONDS = float(os.getenv("SYNC_OVERLAP_SECONDS", "5"))   # re-send rows this close to the cursor
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("TOMBSTONE_RETENTION_DAYS", "30"))   # older cursors get a full snapshot
+
+# ---- Bulk writes (/api/jobs/bulk/, /api/apps/bulk/, jobs/bulk.py) ----
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "500"))   # items per request; each batch is one transaction
+
+# ---- NDJSON export/import (/api/export/, /api/import/, jobs/portability.py) ----
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "500"))   # rows fetched per query round trip
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))   # rows per bulk_create
+
+# ---- Email and deadline reminders (manage.py send_reminders, jobs/reminders.py) ----
+# EMAIL_BACKEND takes a shorthand or a dotted path; "file" writes each message under EMAIL_FILE_PATH
+_EMAIL_BACKENDS = {
+    "console": "django.core.mail.backends.console.EmailBackend",
+    "file": "django.core.mail.backends.filebased.EmailBackend",
+    "smtp": "django.core.mail.backends.smtp.EmailBackend",
+    "locmem": "django.core.mail.backends.locmem.EmailBackend",
+}
+EMAIL_BACKEND = _EMAIL_BACKENDS.get(os.getenv("EMAIL_BACKEND", "console"), os.getenv("EMAIL_BACKEND", "console"))
+EMAIL_FILE_PATH = os.getenv("EMAIL_FILE_PATH", str(BASE_DIR / "sent_mail"))
+EMAIL_HOST = os.getenv("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", "587"))
+EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "1") == "1"
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "ApplyMate <reminders@applymate.local>")
+REMINDER_LEAD_DAYS = int(os.getenv("REMINDER_LEAD_DAYS", "1"))   # remind this many days ahead of next_action_due
+REMINDER_LOOKBACK_DAYS = int(os.getenv("REMINDER_LOOKBACK_DAYS", "14"))   # overdue items older than this are dropped
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "200"))   # users per query / send_messages() batch
+
+# ---- LLM usage ledger (core.LLMUsage, utils/llm_usage.py) ----
+LLM_USAGE_ENABLED = os.getenv("LLM_USAGE_ENABLED", "1") == "1"
+LLM_USAGE_ASYNC = os.getenv("LLM_USAGE_ASYNC", "1") == "1"   # 0 writes each call inline (debugging)
+LLM_USAGE_BATCH_SIZE = int(os.getenv("LLM_USAGE_BATCH_SIZE", "100"))   # rows per bulk_create
+LLM_USAGE_FLUSH_SECONDS = float(os.getenv("LLM_USAGE_FLUSH_SECONDS", "5"))   # max delay before buffered rows are written
+LLM_USAGE_RETENTION_DAYS = int(os.getenv("LLM_USAGE_RETENTION_DAYS", "90"))   # raw rows older than this are pruned by rollup_llm_usage
+LLM_DAILY_TOKEN_QUOTA = int(os.getenv("LLM_DAILY_TOKEN_QUOTA", "0"))   # per signed-in user per day; 0 = no quota, over it the templates answer
+LLM_QUOTA_CACHE_SECONDS = int(os.getenv("LLM_QUOTA_CACHE_SECONDS", "30"))
+
+# ---- Incremental re-extraction (ai/incremental.py) ----
+JD_SECTION_CUT = int(os.getenv("JD_SECTION_CUT", "8"))   # header-less runs are cut about every N lines (content-defined)
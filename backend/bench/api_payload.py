@@ -0,0 +1,159 @@
+# backend/bench/api_payload.py
+"""Cost of shipping a large job list: serialization, JSON encoding and compression.
+
+    cd backend
+    python -m bench.api_payload              # 1,000 jobs, median of 20 runs
+    python -m bench.api_payload --jobs 5000 --json bench/results/payload.json
+
+Builds an in-memory GET /api/jobs/ payload (JobPostingSerializer over jobs
+whose jd_raw/jd_struct come from bench/corpus/extract.jsonl), then times
+DRF's stdlib JSONRenderer/JSONParser against utils.fast_json and reports the
+bytes on the wire for identity, gzip and brotli as CompressionMiddleware
+would send them. With a (throwaway test) database it also times
+JobPostingSerializer(qs, many=True) against the values_list()-based
+JobPostingListSerializer, per row and query included, and checks that both
+render to the same bytes; --no-db skips that part.
+"""
+import io, os, sys, json, gzip, time, argparse, statistics
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "applymate.settings")
+import django
+django.setup()
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from jobs.models import Company, JobPosting
+from jobs.serializers import JobPostingSerializer, JobPostingListSerializer
+from utils import fast_json, compression
+
+HERE = Path(__file__).resolve().parent
+CORPUS = HERE / "corpus" / "extract.jsonl"
+
+
+def make_jobs(n: int) -> List[JobPosting]:
+    docs = [json.loads(ln) for ln in CORPUS.read_text(encoding="utf-8").splitlines() if ln.strip()]
+    companies = [Company(id=i + 1, name=f"Company {i}", website=f"https://c{i}.example.com") for i in range(50)]
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    jobs = []
+    for i in range(n):
+        d = docs[i % len(docs)]
+        exp = d["expected"]
+        jobs.append(JobPosting(
+            id=i + 1, company=companies[i % len(companies)], title=exp.get("title") or f"Engineer {i}",
+            location=exp.get("location") or "Remote", seniority=exp.get("seniority") or "",
+            url=f"https://jobs.example.com/{i}", jd_raw=d["text"],
+            jd_struct={k: exp.get(k) for k in ("title", "company", "location", "skills", "must_haves", "nice_to_haves")},
+            created_at=t0 + timedelta(minutes=i),
+        ))
+    return jobs
+
+
+def _median_ms(fn: Callable[[], Any], repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    return round(statistics.median(runs) * 1000, 3)
+
+
+def measure(n: int, repeat: int) -> Dict[str, Any]:
+    data = JobPostingSerializer(make_jobs(n), many=True).data
+    stdlib_r, fast_r = JSONRenderer(), fast_json.ORJSONRenderer()
+    body = stdlib_r.render(data)
+    fast_body = fast_r.render(data)
+    assert json.loads(fast_body) == json.loads(body), "renderers disagree"
+
+    out: Dict[str, Any] = {"jobs": n, "orjson": fast_json.orjson is not None, "brotli": compression.brotli is not None}
+    out["render_ms"] = {"stdlib": _median_ms(lambda: stdlib_r.render(data), repeat),
+                        "orjson": _median_ms(lambda: fast_r.render(data), repeat)}
+    out["parse_ms"] = {"stdlib": _median_ms(lambda: JSONParser().parse(io.BytesIO(body)), repeat),
+                       "orjson": _median_ms(lambda: fast_json.ORJSONParser().parse(io.BytesIO(fast_body)), repeat)}
+
+    level = int(getattr(settings, "COMPRESS_GZIP_LEVEL", 6))
+    quality = int(getattr(settings, "COMPRESS_BROTLI_QUALITY", 4))
+    gz = gzip.compress(fast_body, compresslevel=level, mtime=0)
+    out["bytes"] = {"identity": len(fast_body), "gzip": len(gz)}
+    out["compress_ms"] = {"gzip": _median_ms(lambda: gzip.compress(fast_body, compresslevel=level, mtime=0), repeat)}
+    if compression.brotli is not None:
+        br = compression.brotli.compress(fast_body, quality=quality)
+        out["bytes"]["br"] = len(br)
+        out["compress_ms"]["br"] = _median_ms(lambda: compression.brotli.compress(fast_body, quality=quality), repeat)
+    return out
+
+
+def serializers(n: int, repeat: int) -> Dict[str, Any]:
+    """Per-row serializer cost on real rows, in a test database."""
+    from django.contrib.auth.models import User
+    from django.test.utils import setup_test_environment, setup_databases, teardown_databases
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        user = User.objects.create_user("bench-payload")
+        jobs = make_jobs(n)
+        companies = {j.company.id: j.company for j in jobs}
+        for c in companies.values():
+            c.user = user
+        Company.objects.bulk_create(companies.values())
+        for j in jobs:
+            j.user = user
+        JobPosting.objects.bulk_create(jobs)
+        qs = JobPosting.objects.select_related("company").filter(user=user).order_by("-created_at")
+
+        render = fast_json.ORJSONRenderer().render
+        same = render(JobPostingSerializer(qs, many=True).data) == render(JobPostingListSerializer(qs).data)
+        model_ms = _median_ms(lambda: JobPostingSerializer(qs.all(), many=True).data, repeat)
+        values_ms = _median_ms(lambda: JobPostingListSerializer(qs.all()).data, repeat)
+        # the fetch alone, to separate query/decode time from per-row Python work
+        lookups, _ = JobPostingListSerializer._plan({})
+        fetch_model_ms = _median_ms(lambda: list(qs.all()), repeat)
+        fetch_values_ms = _median_ms(lambda: list(qs.values_list(*lookups)), repeat)
+    finally:
+        teardown_databases(old_config, verbosity=0)
+    per_row = lambda ms: round(ms * 1000 / n, 2)
+    return {"identical": same, "model_ms": model_ms, "values_ms": values_ms,
+            "model_us_per_row": per_row(model_ms), "values_us_per_row": per_row(values_ms),
+            "model_python_us_per_row": per_row(model_ms - fetch_model_ms),
+            "values_python_us_per_row": per_row(values_ms - fetch_values_ms)}
+
+
+def report(r: Dict[str, Any]) -> None:
+    print(f"jobs: {r['jobs']}   orjson: {r['orjson']}   brotli: {r['brotli']}")
+    for k in ("render_ms", "parse_ms"):
+        v = r[k]
+        print(f"{k:>12}: stdlib {v['stdlib']:>9}   orjson {v['orjson']:>9}   x{v['stdlib'] / max(v['orjson'], 1e-9):.1f}")
+    ident = r["bytes"]["identity"]
+    for coding, size in r["bytes"].items():
+        ms = r["compress_ms"].get(coding, 0.0)
+        print(f"{coding:>12}: {size:>10} bytes  ({size / ident:6.1%})  {ms:>8} ms to compress")
+    ser = r.get("serializers")
+    if ser:
+        print(f"{'serializer':>12}: ModelSerializer {ser['model_ms']} ms ({ser['model_us_per_row']} us/row, "
+              f"{ser['model_python_us_per_row']} without the query)")
+        print(f"{'':>12}  values_list     {ser['values_ms']} ms ({ser['values_us_per_row']} us/row, "
+              f"{ser['values_python_us_per_row']} without the query)   identical output: {ser['identical']}")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--jobs", type=int, default=1000)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--json", type=Path, help="also write the numbers here")
+    ap.add_argument("--no-db", action="store_true", help="skip the serializer timing (needs a test database)")
+    args = ap.parse_args(argv)
+    r = measure(args.jobs, args.repeat)
+    if not args.no_db:
+        r["serializers"] = serializers(args.jobs, args.repeat)
+    report(r)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(r, indent=2) + "\n")
+    return 0 if r.get("serializers", {}).get("identical", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+# backend/bench/extract.py
+"""Speed + accuracy regression runner for the deterministic JD extractor.
+
+    cd backend
+    python -m bench.extract                    # compare with bench/baselines/extract.json
+    python -m bench.extract --update-baseline  # accept the current numbers
+
+Runs every document in bench/corpus/extract.jsonl through
+_deterministic_extract + _ensure_shape (no LLM), reports docs/sec, p50/p99
+latency, peak memory and field-level precision/recall, and exits non-zero
+when speed or accuracy regresses past the tolerances. Also checks the LLM
+prompt compaction: tokens saved, and how many expected field values still
+appear in the compacted prompt.
+
+Speed is gated on timings relative to a fixed regex/str reference workload
+timed in the same process (calibration), not on absolute numbers, so a
+baseline recorded on one machine holds on another. --no-speed gates on
+accuracy and compaction only; those are deterministic.
+"""
+import os, re, sys, json, time, hashlib, argparse, statistics, tracemalloc
+from pathlib import Path
+from typing import Dict, Any, List
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "applymate.settings")
+import django
+django.setup()
+
+from ai import provider
+
+HERE = Path(__file__).resolve().parent
+CORPUS = HERE / "corpus" / "extract.jsonl"
+BASELINE = HERE / "baselines" / "extract.json"
+
+LIST_FIELDS = ("skills", "must_haves", "nice_to_haves")
+SCALAR_FIELDS = ("title", "company", "location", "seniority")
+LARGE_DOC_CHARS = 15000
+PROMPT_BUDGET = int(os.environ.get("AI_INPUT_TOKEN_BUDGET", "1500"))
+
+
+def load_corpus(path: Path = CORPUS) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(ln) for ln in f if ln.strip()]
+
+def run_pipeline(text: str) -> Dict[str, Any]:
+    return provider._ensure_shape(provider._deterministic_extract(text))
+
+def _norm(s: Any) -> str:
+    return " ".join(str(s or "").lower().split()).rstrip(".")
+
+def score_fields(docs: List[Dict[str, Any]], outputs: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    counts = {k: [0, 0, 0] for k in (*SCALAR_FIELDS, *LIST_FIELDS)}   # tp, fp, fn
+    for doc, out in zip(docs, outputs):
+        exp = doc["expected"]
+        for k in SCALAR_FIELDS:
+            e, g = _norm(exp.get(k)), _norm(out.get(k))
+            c = counts[k]
+            if e and g == e:
+                c[0] += 1
+            else:
+                c[1] += bool(g)
+                c[2] += bool(e)
+        for k in LIST_FIELDS:
+            e = {_norm(x) for x in exp.get(k) or []}
+            g = {_norm(x) for x in out.get(k) or []}
+            c = counts[k]
+            c[0] += len(e & g)
+            c[1] += len(g - e)
+            c[2] += len(e - g)
+    scores = {}
+    for k, (tp, fp, fn) in counts.items():
+        scores[k] = {
+            "precision": round(tp / (tp + fp), 4) if tp + fp else 1.0,
+            "recall": round(tp / (tp + fn), 4) if tp + fn else 1.0,
+        }
+    return scores
+
+def _percentile(values: List[float], pct: float) -> float:
+    vals = sorted(values)
+    idx = min(len(vals) - 1, max(0, int(round(pct / 100 * (len(vals) - 1)))))
+    return vals[idx]
+
+def large_document(docs: List[Dict[str, Any]], chars: int = LARGE_DOC_CHARS) -> str:
+    parts, size = [], 0
+    while size < chars:
+        for d in docs:
+            parts.append(d["text"])
+            size += len(d["text"]) + 2
+    return "\n\n".join(parts)[:chars]
+
+def _digest(outputs: List[Dict[str, Any]]) -> str:
+    # skills that differ only by case ('SQL'/'Sql') tie in the extractor's sort,
+    # so their relative order follows set iteration; canonicalize before hashing
+    canon = [{**o, "skills": sorted(s.lower() for s in o["skills"])} for o in outputs]
+    return hashlib.sha256(json.dumps(canon, sort_keys=True).encode()).hexdigest()
+
+def compaction(docs: List[Dict[str, Any]], budget: int = PROMPT_BUDGET) -> Dict[str, Any]:
+    """Token savings of _compact_for_llm and the share of expected values
+    (present in the original text) that survive it."""
+    before = after = kept = present = 0
+    for doc in [*docs, {"text": large_document(docs), "expected": {}}]:
+        text = doc["text"]
+        short = provider._compact_for_llm(text, budget)
+        before += provider.count_tokens(text)
+        after += provider.count_tokens(short)
+        src, dst = _norm(text), _norm(short)
+        exp = doc["expected"]
+        values = [exp.get(k) for k in ("title", "company", "location")]
+        values += [x for k in LIST_FIELDS for x in exp.get(k) or []]
+        for v in values:
+            v = _norm(v)
+            if v and v in src:
+                present += 1
+                kept += v in dst
+    return {
+        "prompt_tokens": before,
+        "compacted_tokens": after,
+        "token_reduction": round(1 - after / before, 4) if before else 0.0,
+        "value_retention": round(kept / present, 4) if present else 1.0,
+    }
+
+_CALIBRATION_WORD = re.compile(r"[\w-]+")
+
+def calibrate(text: str) -> float:
+    """Seconds for one pass of a fixed workload of the same kind as the
+    extractor's (tokenizing, case folding, dict churn, line splitting). The
+    code here must never change, or old baselines stop being comparable."""
+    s = time.perf_counter()
+    counts: Dict[str, int] = {}
+    for w in _CALIBRATION_WORD.findall(text.lower()):
+        counts[w] = counts.get(w, 0) + 1
+    " ".join(sorted(counts, key=counts.__getitem__))
+    [" ".join(ln.split()) for ln in text.splitlines() if ln.strip()]
+    return time.perf_counter() - s
+
+def measure(docs: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    texts = [d["text"] for d in docs]
+    big = large_document(docs)
+    outputs = [run_pipeline(t) for t in texts]   # warm-up + accuracy pass
+
+    # each timed pass is paired with a calibration pass right next to it, so
+    # the ratio tracks what the machine is doing at that moment
+    latencies, corpus_units = [], []
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        calib = calibrate(big)
+        s_pass = time.perf_counter()
+        for t in texts:
+            s = time.perf_counter()
+            run_pipeline(t)
+            latencies.append(time.perf_counter() - s)
+        corpus_units.append((time.perf_counter() - s_pass) / calib)
+    total = time.perf_counter() - t0
+
+    big_runs, big_units = [], []
+    for _ in range(max(5, repeat // 2)):
+        calib = calibrate(big)
+        s = time.perf_counter()
+        run_pipeline(big)
+        big_runs.append(time.perf_counter() - s)
+        big_units.append(big_runs[-1] / calib)
+
+    tracemalloc.start()
+    for t in (*texts, big):
+        run_pipeline(t)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    digest = _digest(outputs + [run_pipeline(big)])
+    return {
+        "docs": len(texts),
+        "docs_per_sec": round(len(latencies) / total, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 4),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 4),
+        "large_doc_ms": round(statistics.median(big_runs) * 1000, 3),
+        # machine-independent: in calibration passes (see calibrate())
+        "docs_per_unit": round(len(texts) / statistics.median(corpus_units), 3),
+        "large_doc_units": round(statistics.median(big_units), 3),
+        "peak_kib": round(peak / 1024, 1),
+        "accuracy": score_fields(docs, outputs),
+        "compaction": compaction(docs),
+        "output_sha256": digest,
+    }
+
+def compare(result: Dict[str, Any], base: Dict[str, Any], speed_tol: float, acc_tol: float,
+            speed: bool = True) -> List[str]:
+    problems = []
+    if speed and "docs_per_unit" not in base:
+        print("note: baseline has no calibrated timings; speed not checked (run --update-baseline)")
+    elif speed:
+        if result["docs_per_unit"] < base["docs_per_unit"] * (1 - speed_tol):
+            problems.append(f"docs per calibration unit {result['docs_per_unit']} < baseline "
+                            f"{base['docs_per_unit']} (-{speed_tol:.0%})")
+        if result["large_doc_units"] > base["large_doc_units"] * (1 + speed_tol):
+            problems.append(f"15k-char doc {result['large_doc_units']} calibration units > baseline "
+                            f"{base['large_doc_units']} (+{speed_tol:.0%})")
+    if result["peak_kib"] > base["peak_kib"] * (1 + speed_tol):
+        problems.append(f"peak memory {result['peak_kib']}KiB > baseline {base['peak_kib']}KiB (+{speed_tol:.0%})")
+    for field, cur in result["accuracy"].items():
+        old = base["accuracy"].get(field, {})
+        for metric in ("precision", "recall"):
+            if cur[metric] < old.get(metric, 0.0) - acc_tol:
+                problems.append(f"{field} {metric} {cur[metric]} < baseline {old[metric]}")
+    cur, old = result["compaction"], base.get("compaction") or {}
+    if cur["value_retention"] < old.get("value_retention", 0.0) - acc_tol:
+        problems.append(f"compaction value_retention {cur['value_retention']} < baseline {old['value_retention']}")
+    return problems
+
+def report(result: Dict[str, Any], base: Dict[str, Any] = None) -> None:
+    b = base or {}
+    print(f"docs: {result['docs']}")
+    for k in ("docs_per_sec", "p50_ms", "p99_ms", "large_doc_ms", "docs_per_unit", "large_doc_units", "peak_kib"):
+        print(f"{k:>15}: {result[k]:>12}   (baseline {b.get(k, '-')})")
+    print(f"{'field':>14}  precision  recall")
+    for field, s in result["accuracy"].items():
+        print(f"{field:>14}  {s['precision']:>9}  {s['recall']:>6}")
+    bc = b.get("compaction") or {}
+    for k, v in result["compaction"].items():
+        print(f"{k:>16}: {v:>10}   (baseline {bc.get(k, '-')})")
+    if b and b.get("output_sha256") != result["output_sha256"]:
+        print("note: extractor output differs from baseline")
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--speed-tolerance", type=float, default=0.3)
+    ap.add_argument("--accuracy-tolerance", type=float, default=0.0)
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--no-speed", action="store_true", help="gate on accuracy and compaction only")
+    args = ap.parse_args(argv)
+
+    result = measure(load_corpus(), args.repeat)
+    base = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    report(result, base)
+
+    if args.update_baseline or base is None:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    problems = compare(result, base, args.speed_tolerance, args.accuracy_tolerance + 1e-9, speed=not args.no_speed)
+    for p in problems:
+        print("REGRESSION:", p)
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# backend/bench/fake_jobboard.py
+"""Local stand-in for the job pages and ATS APIs jobs/extract/ fetches.
+
+    cd backend
+    python -m bench.fake_jobboard --port 8097 --latency 0.2
+    ATS_GREENHOUSE_API=http://127.0.0.1:8097 python manage.py runserver
+
+GET /jobs/<n>                       HTML page; even n embeds a schema.org
+                                    JobPosting (JSON-LD), odd n is plain HTML
+GET /v1/boards/<board>/jobs/<id>    Greenhouse job JSON (point ATS_GREENHOUSE_API here)
+
+Postings cycle through bench/corpus/extract.jsonl. Recorded ATS responses in
+bench/fixtures/ats/*.json ({"url", "path", "body"}) are served at their API
+path, so ATS_*_API can point here for Greenhouse, Lever, Ashby and Workday.
+Any API path under a board/tenant named "broken" answers 500, "garbled" a
+non-JSON 200.
+"""
+import re, json, time, html, argparse, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+CORPUS = Path(__file__).resolve().parent / "corpus" / "extract.jsonl"
+_DOCS = [json.loads(ln) for ln in CORPUS.read_text(encoding="utf-8").splitlines() if ln.strip()]
+ATS_FIXTURES = Path(__file__).resolve().parent / "fixtures" / "ats"
+
+
+def load_fixtures() -> dict:
+    """name -> recorded response ({"url", "path", "body"})."""
+    return {p.stem: json.loads(p.read_text(encoding="utf-8")) for p in sorted(ATS_FIXTURES.glob("*.json"))}
+
+_RECORDED = {f["path"]: f["body"] for f in load_fixtures().values()}
+_API_PATH = re.compile(r"^/(?:v1/boards|v0/postings|posting-api/job-board|wday/cxs)/([\w-]+)")
+
+
+def _doc(n: int):
+    return _DOCS[n % len(_DOCS)]
+
+def _body_html(text: str) -> str:
+    return "".join(f"<p>{html.escape(ln)}</p>" for ln in text.splitlines() if ln.strip())
+
+def job_page(n: int) -> str:
+    d = _doc(n)
+    exp = d["expected"]
+    head = ""
+    if n % 2 == 0:
+        ld = {"@context": "https://schema.org", "@type": "JobPosting",
+              "title": exp.get("title") or "Software Engineer",
+              "hiringOrganization": {"@type": "Organization", "name": exp.get("company") or "Example Co"},
+              "jobLocation": {"@type": "Place", "address": {"addressLocality": exp.get("location") or "Remote"}},
+              "description": _body_html(d["text"])}
+        head = f'<script type="application/ld+json">{json.dumps(ld)}</script>'
+    nav = "<nav>" + " ".join(f"<a href='/jobs/{i}'>Job {i}</a>" for i in range(40)) + "</nav>"
+    return (f"<html><head><title>Job {n}</title>{head}<style>p{{margin:0}}</style></head>"
+            f"<body>{nav}<main>{_body_html(d['text'])}</main><footer>© Example</footer></body></html>")
+
+def greenhouse_job(board: str, job_id: int) -> dict:
+    d = _doc(job_id)
+    exp = d["expected"]
+    return {"id": job_id, "title": exp.get("title") or "Software Engineer",
+            "company_name": exp.get("company") or board.title(),
+            "location": {"name": exp.get("location") or "Remote"},
+            "content": html.escape(_body_html(d["text"]))}
+
+
+class FakeJobBoard(BaseHTTPRequestHandler):
+    latency = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, ctype: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        path = self.path.split("?", 1)[0]
+        if path in _RECORDED:
+            return self._send(200, json.dumps(_RECORDED[path]).encode(), "application/json")
+        m = _API_PATH.match(path)
+        if m and m.group(1) == "broken":
+            return self._send(500, b'{"error": "internal"}', "application/json")
+        if m and m.group(1) == "garbled":
+            return self._send(200, b"<html>maintenance</html>", "application/json")
+        m = re.fullmatch(r"/jobs/(\d+)/?", self.path)
+        if m:
+            return self._send(200, job_page(int(m.group(1))).encode(), "text/html; charset=utf-8")
+        m = re.fullmatch(r"/v1/boards/([\w-]+)/jobs/(\d+)/?", self.path)
+        if m:
+            body = json.dumps(greenhouse_job(m.group(1), int(m.group(2)))).encode()
+            return self._send(200, body, "application/json")
+        self._send(404, b"not found", "text/plain")
+
+
+def serve(port: int = 8097, latency: float = 0.0) -> ThreadingHTTPServer:
+    """Start the server on a background thread and return it (call .shutdown() to stop)."""
+    handler = type("Handler", (FakeJobBoard,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--port", type=int, default=8097)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds before each response")
+    args = ap.parse_args(argv)
+    handler = type("Handler", (FakeJobBoard,), {"latency": args.latency})
+    print(f"fake job board on http://127.0.0.1:{args.port}")
+    ThreadingHTTPServer(("127.0.0.1", args.port), handler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# backend/bench/fake_openai.py
+"""Minimal OpenAI-compatible server for exercising the LLM paths offline.
+
+    cd backend
+    python -m bench.fake_openai --port 8099 --token-delay 0.05
+    AI_API_KEY=fake AI_BASE_URL=http://127.0.0.1:8099/v1 python manage.py runserver
+
+POST /v1/chat/completions answers tool-call requests with an empty set_jd
+call and everything else with canned markdown, streamed as SSE chunks when
+the request sets "stream": true. --fail-rate makes a share of requests 500.
+"""
+import json, time, random, argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any
+
+CANNED_MD = (
+    "• Built and shipped features end to end with Python and React\n"
+    "• Designed REST APIs and Postgres schemas used by thousands of users\n"
+    "• Cut page load time 40% by profiling and caching hot queries\n"
+    "• Reviewed code and mentored two junior engineers"
+)
+
+
+class FakeOpenAI(BaseHTTPRequestHandler):
+    token_delay = 0.0
+    latency = 0.0
+    fail_rate = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):   # keep load tests quiet
+        pass
+
+    def _json(self, status: int, body: Dict[str, Any]) -> None:
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        try:
+            self.wfile.write(raw)
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # client hit its deadline and hung up
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        req = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._json(404, {"error": {"message": "not found"}})
+        time.sleep(self.latency)
+        if random.random() < self.fail_rate:
+            return self._json(500, {"error": {"message": "injected failure"}})
+
+        model = req.get("model", "fake")
+        usage = {"prompt_tokens": sum(len(str(m.get("content", ""))) for m in req.get("messages", [])) // 4,
+                 "completion_tokens": len(CANNED_MD) // 4}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        base = {"id": "chatcmpl-fake", "created": int(time.time()), "model": model}
+
+        if req.get("tools"):
+            call = {"id": "call_fake", "type": "function",
+                    "function": {"name": "set_jd", "arguments": "{}"}}
+            msg = {"role": "assistant", "content": None, "tool_calls": [call]}
+            return self._json(200, {**base, "object": "chat.completion", "usage": usage,
+                                    "choices": [{"index": 0, "message": msg, "finish_reason": "tool_calls"}]})
+
+        if not req.get("stream"):
+            msg = {"role": "assistant", "content": CANNED_MD}
+            return self._json(200, {**base, "object": "chat.completion", "usage": usage,
+                                    "choices": [{"index": 0, "message": msg, "finish_reason": "stop"}]})
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for word in CANNED_MD.split(" "):
+            chunk = {**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.token_delay)
+        end = {**base, "object": "chat.completion.chunk",
+               "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        self.wfile.write(f"data: {json.dumps(end)}\n\n".encode())
+        if (req.get("stream_options") or {}).get("include_usage"):
+            tail = {**base, "object": "chat.completion.chunk", "choices": [], "usage": usage}
+            self.wfile.write(f"data: {json.dumps(tail)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+def serve(port: int = 8099, token_delay: float = 0.0, latency: float = 0.0, fail_rate: float = 0.0) -> ThreadingHTTPServer:
+    """Start the server on a background thread and return it (call .shutdown() to stop)."""
+    import threading
+    handler = type("Handler", (FakeOpenAI,), {"token_delay": token_delay, "latency": latency, "fail_rate": fail_rate})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--port", type=int, default=8099)
+    ap.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed chunks")
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds before the first byte")
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    args = ap.parse_args(argv)
+    handler = type("Handler", (FakeOpenAI,), {"token_delay": args.token_delay, "latency": args.latency,
+                                               "fail_rate": args.fail_rate})
+    print(f"fake OpenAI on http://127.0.0.1:{args.port}/v1")
+    ThreadingHTTPServer(("127.0.0.1", args.port), handler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
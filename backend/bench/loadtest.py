@@ -0,0 +1,395 @@
+# backend/bench/loadtest.py
+"""HTTP load test for the API with local stand-ins for OpenAI and job boards.
+
+    cd backend
+    python -m bench.loadtest all --stages 1,4,16 --duration 30       # seed, start fakes + server, run
+    python -m bench.loadtest all --compare bench/results/before.json # fail on regressions
+
+    python -m bench.loadtest seed --users 4 --jobs 2000 --apps 2000  # seed only
+    python -m bench.loadtest run --base http://127.0.0.1:8000 ...    # against a running server
+
+Virtual users log in as the seeded accounts and loop over journeys that
+mirror the frontend pages (Dashboard, JobDetail, Applications, AddJob).
+Each concurrency stage reports RPS, error rate and per-endpoint p50/p95/p99.
+The JSON report can be compared with an earlier one.
+"""
+import os, sys, json, time, random, argparse, subprocess, threading, statistics
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+import requests
+
+HERE = Path(__file__).resolve().parent
+BACKEND = HERE.parent
+RESULTS = HERE / "results"
+CORPUS = HERE / "corpus" / "extract.jsonl"
+USER_PREFIX = "loadtest-"
+PASSWORD = "loadtest-pass-123"
+
+
+# ---- seeding ---------------------------------------------------------------
+
+def seed(users: int, jobs: int, apps: int) -> None:
+    """(Re)create `users` accounts with `jobs` postings and `apps` applications each."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "applymate.settings")
+    import django
+    django.setup()
+    from django.contrib.auth.models import User
+    from django.db import transaction
+    from jobs.models import Company, JobPosting, Application
+    from docs_app.models import Resume
+    from django.core.management import call_command
+    from ai import provider
+
+    call_command("migrate", verbosity=0)
+    docs = [json.loads(ln) for ln in CORPUS.read_text(encoding="utf-8").splitlines() if ln.strip()]
+    structs = [provider._ensure_shape(provider._deterministic_extract(d["text"])) for d in docs]
+    stages = [s for s, _ in Application.STAGES]
+    rnd = random.Random(42)
+
+    User.objects.filter(username__startswith=USER_PREFIX).delete()
+    for u in range(users):
+        with transaction.atomic():
+            user = User.objects.create_user(f"{USER_PREFIX}{u}", password=PASSWORD)
+            companies = Company.objects.bulk_create(
+                [Company(user=user, name=f"Company {c}") for c in range(max(1, jobs // 10))])
+            postings = []
+            for i in range(jobs):
+                k = i % len(docs)
+                st = structs[k]
+                postings.append(JobPosting(
+                    user=user, company=companies[i % len(companies)], title=st["title"] or "Software Engineer",
+                    location=st["location"], seniority=st["seniority"], url=f"https://example.com/jobs/{i}",
+                    jd_raw=docs[k]["text"], jd_struct=st))
+            postings = JobPosting.objects.bulk_create(postings, batch_size=500)
+            Application.objects.bulk_create([
+                Application(job=postings[i % len(postings)], stage=rnd.choice(stages),
+                            next_action="Follow up", notes="seeded")
+                for i in range(apps)], batch_size=500)
+            skills = sorted({s for st in structs for s in st["skills"]})
+            Resume.objects.create(user=user, label="Load test resume", file="resumes/loadtest.pdf",
+                                  parsed_text="Software engineer. Skills: " + ", ".join(skills[::2]))
+        print(f"seeded {USER_PREFIX}{u}: {jobs} jobs, {apps} applications")
+
+
+# ---- virtual users -----------------------------------------------------------
+
+class Recorder:
+    def __init__(self):
+        self.samples: List[Tuple[str, float, bool]] = []   # label, seconds, ok
+        self._lock = threading.Lock()
+
+    def add(self, label: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.samples.append((label, seconds, ok))
+
+
+class VirtualUser:
+    def __init__(self, base: str, username: str, rec: Recorder, fakes: Dict[str, str], think: float):
+        self.api = base.rstrip("/") + "/api"
+        self.s = requests.Session()
+        self.rec = rec
+        self.fakes = fakes
+        self.think = think
+        self.rnd = random.Random(username)
+        self.texts = [json.loads(ln)["text"] for ln in CORPUS.read_text(encoding="utf-8").splitlines() if ln.strip()]
+        self.username = username
+        self.login()
+        self.job_ids: List[int] = []
+        self.app_ids: List[int] = []
+        self.resume_id = None
+
+    def login(self) -> None:
+        self.s.headers.pop("Authorization", None)
+        r = self.s.post(f"{self.api}/auth/token/", json={"username": self.username, "password": PASSWORD}, timeout=30)
+        r.raise_for_status()
+        self.s.headers["Authorization"] = f"Bearer {r.json()['access']}"
+
+    def call(self, label: str, method: str, path: str, **kw):
+        t0 = time.perf_counter()
+        try:
+            r = self.s.request(method, self.api + path, timeout=60, **kw)
+            if r.status_code == 401:   # access tokens expire after a few minutes
+                self.login()
+                t0 = time.perf_counter()
+                r = self.s.request(method, self.api + path, timeout=60, **kw)
+            ok = r.status_code < 400
+            body = r.json() if ok and r.content and "json" in r.headers.get("Content-Type", "") else None
+        except (requests.RequestException, ValueError):
+            r, ok, body = None, False, None
+        self.rec.add(label, time.perf_counter() - t0, ok)
+        return body
+
+    def stream(self, label: str, path: str, payload: Dict[str, Any]) -> None:
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            with self.s.post(self.api + path, json=payload, stream=True, timeout=60) as r:
+                first = None
+                for line in r.iter_lines():
+                    if first is None and line:
+                        first = time.perf_counter() - t0
+                    if line.startswith(b"event: done"):
+                        ok = r.status_code < 400
+                if first is not None:
+                    self.rec.add(label + " (first event)", first, r.status_code < 400)
+        except requests.RequestException:
+            pass
+        self.rec.add(label, time.perf_counter() - t0, ok)
+
+    # journeys mirror frontend/src/pages/*.jsx
+    def dashboard(self):
+        jobs = self.call("GET jobs/", "GET", "/jobs/") or []
+        apps = self.call("GET apps/", "GET", "/apps/") or []
+        self.job_ids = [j["id"] for j in jobs] or self.job_ids
+        self.app_ids = [a["id"] for a in apps] or self.app_ids
+
+    def job_detail(self):
+        if not self.job_ids:
+            return self.dashboard()
+        jid = self.rnd.choice(self.job_ids)
+        self.call("GET jobs/<id>/", "GET", f"/jobs/{jid}/")
+        resumes = self.call("GET resume/", "GET", "/resume/") or []
+        self.call("GET apps/?job_id", "GET", f"/apps/?job_id={jid}")
+        if resumes:
+            self.resume_id = resumes[0]["id"]
+            self.call("POST fit/score/", "POST", "/fit/score/", json={"job_id": jid, "resume_id": self.resume_id})
+        kind = self.rnd.choice(["bullets", "coverletter"])
+        payload = {"job_id": jid, "resume_id": self.resume_id, "type": kind}
+        if self.rnd.random() < 0.5:
+            self.stream("POST docs/generate/stream/", "/docs/generate/stream/", payload)
+        else:
+            self.call("POST docs/generate/", "POST", "/docs/generate/", json=payload)
+
+    def applications(self):
+        self.call("GET apps/", "GET", "/apps/")
+        self.call("GET jobs/", "GET", "/jobs/")
+        if self.app_ids:
+            stage = self.rnd.choice(["saved", "applied", "oa", "interview", "offer", "rejected"])
+            self.call("PATCH apps/<id>/", "PATCH", f"/apps/{self.rnd.choice(self.app_ids)}/", json={"stage": stage})
+
+    def add_job(self):
+        n = self.rnd.randrange(1000)
+        pick = self.rnd.random()
+        if pick < 0.5 or not self.fakes.get("board"):
+            label, payload = "POST jobs/extract/ (text)", {"jd_text": self.rnd.choice(self.texts)}
+        elif pick < 0.8:
+            label, payload = "POST jobs/extract/ (page)", {"url": f"{self.fakes['board']}/jobs/{n}"}
+        else:
+            label, payload = "POST jobs/extract/ (ats)", {"url": f"https://boards.greenhouse.io/loadtest/jobs/{n}"}
+        jd = self.call(label, "POST", "/jobs/extract/", json=payload) or {}
+        body = {"title": jd.get("title") or "Software Engineer", "company_name": jd.get("company") or "Load Test Co",
+                "location": jd.get("location", ""), "seniority": jd.get("seniority", ""),
+                "jd_raw": payload.get("jd_text") or payload.get("url"), "jd_struct": jd}
+        job = self.call("POST jobs/", "POST", "/jobs/", json=body)
+        if job:
+            self.job_ids.append(job["id"])
+
+    JOURNEYS = (("dashboard", 3), ("job_detail", 3), ("applications", 2), ("add_job", 1))
+
+    def loop(self, stop_at: float) -> None:
+        names = [n for n, _ in self.JOURNEYS]
+        weights = [w for _, w in self.JOURNEYS]
+        self.dashboard()
+        while time.monotonic() < stop_at:
+            getattr(self, self.rnd.choices(names, weights)[0])()
+            if self.think:
+                time.sleep(self.rnd.expovariate(1 / self.think))
+
+
+# ---- running + reporting -----------------------------------------------------
+
+def _pct(vals: List[float], p: float) -> float:
+    vals = sorted(vals)
+    return vals[min(len(vals) - 1, int(round(p / 100 * (len(vals) - 1))))]
+
+def summarize(rec: Recorder, elapsed: float, concurrency: int) -> Dict[str, Any]:
+    by: Dict[str, List[Tuple[float, bool]]] = {}
+    for label, secs, ok in rec.samples:
+        by.setdefault(label, []).append((secs, ok))
+    endpoints = {}
+    for label, rows in sorted(by.items()):
+        lat = [s * 1000 for s, _ in rows]
+        endpoints[label] = {
+            "count": len(rows), "errors": sum(1 for _, ok in rows if not ok),
+            "p50_ms": round(_pct(lat, 50), 1), "p95_ms": round(_pct(lat, 95), 1),
+            "p99_ms": round(_pct(lat, 99), 1), "mean_ms": round(statistics.fmean(lat), 1),
+        }
+    requests_done = sum(e["count"] for k, e in endpoints.items() if not k.endswith("(first event)"))
+    errors = sum(e["errors"] for k, e in endpoints.items() if not k.endswith("(first event)"))
+    return {"concurrency": concurrency, "seconds": round(elapsed, 1), "requests": requests_done,
+            "rps": round(requests_done / elapsed, 1) if elapsed else 0.0,
+            "error_rate": round(errors / requests_done, 4) if requests_done else 0.0,
+            "endpoints": endpoints}
+
+def run_stage(base: str, concurrency: int, duration: float, users: int, fakes: Dict[str, str], think: float) -> Dict[str, Any]:
+    rec = Recorder()
+    vus = [VirtualUser(base, f"{USER_PREFIX}{i % users}", rec, fakes, think) for i in range(concurrency)]
+    stop_at = time.monotonic() + duration
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=vu.loop, args=(stop_at,), daemon=True) for vu in vus]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize(rec, time.perf_counter() - t0, concurrency)
+
+def print_stage(st: Dict[str, Any], base: Dict[str, Any] = None) -> None:
+    old = (base or {}).get("endpoints", {})
+    print(f"\n== concurrency {st['concurrency']}: {st['rps']} req/s, {st['requests']} requests, "
+          f"errors {st['error_rate']:.2%}" + (f"  (baseline {base['rps']} req/s)" if base else ""))
+    print(f"{'endpoint':<42}{'count':>7}{'err':>5}{'p50':>9}{'p95':>9}{'p99':>9}{'Δp99':>9}")
+    for label, e in st["endpoints"].items():
+        delta = ""
+        if label in old and old[label]["p99_ms"]:
+            delta = f"{(e['p99_ms'] / old[label]['p99_ms'] - 1):+.0%}"
+        print(f"{label:<42}{e['count']:>7}{e['errors']:>5}{e['p50_ms']:>9}{e['p95_ms']:>9}{e['p99_ms']:>9}{delta:>9}")
+
+def compare(report: Dict[str, Any], base: Dict[str, Any], tol: float) -> List[str]:
+    problems = []
+    old_stages = {s["concurrency"]: s for s in base.get("stages", [])}
+    for st in report["stages"]:
+        old = old_stages.get(st["concurrency"])
+        if not old:
+            continue
+        if st["rps"] < old["rps"] * (1 - tol):
+            problems.append(f"c={st['concurrency']}: {st['rps']} req/s < baseline {old['rps']} (-{tol:.0%})")
+        if st["error_rate"] > old["error_rate"] + 0.01:
+            problems.append(f"c={st['concurrency']}: error rate {st['error_rate']:.2%} > baseline {old['error_rate']:.2%}")
+        for label, e in st["endpoints"].items():
+            o = old["endpoints"].get(label)
+            if o and e["count"] >= 20 and e["p99_ms"] > o["p99_ms"] * (1 + tol) and e["p99_ms"] - o["p99_ms"] > 5:
+                problems.append(f"c={st['concurrency']} {label}: p99 {e['p99_ms']}ms > baseline {o['p99_ms']}ms")
+    return problems
+
+def max_sustainable(stages: List[Dict[str, Any]], slo_ms: float) -> float:
+    # a full SSE generation is long by design; its first event counts instead
+    ok = [s["rps"] for s in stages
+          if s["error_rate"] < 0.01 and all(e["p99_ms"] <= slo_ms for k, e in s["endpoints"].items()
+                                            if k != "POST docs/generate/stream/")]
+    return max(ok, default=0.0)
+
+def run(args, fakes: Dict[str, str]) -> int:
+    stages = [int(c) for c in args.stages.split(",") if c.strip()]
+    report = {"meta": {"base": args.base, "started": time.strftime("%Y-%m-%dT%H:%M:%S"), "git": _git_rev(),
+                       "duration": args.duration, "think": args.think, "users": args.users,
+                       "llm_latency": args.llm_latency, "board_latency": args.board_latency},
+              "stages": []}
+    base = json.loads(Path(args.compare).read_text()) if args.compare else None
+    old_stages = {s["concurrency"]: s for s in (base or {}).get("stages", [])}
+    for c in stages:
+        st = run_stage(args.base, c, args.duration, args.users, fakes, args.think)
+        report["stages"].append(st)
+        print_stage(st, old_stages.get(c))
+    report["max_sustainable_rps"] = max_sustainable(report["stages"], args.slo_ms)
+    print(f"\nmax sustainable: {report['max_sustainable_rps']} req/s (p99 <= {args.slo_ms}ms, errors < 1%)")
+
+    out = Path(args.out) if args.out else RESULTS / f"loadtest-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"report written to {out}")
+    if base:
+        problems = compare(report, base, args.tolerance)
+        for p in problems:
+            print("REGRESSION:", p)
+        return 1 if problems else 0
+    return 0
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, capture_output=True,
+                              text=True, timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+
+# ---- orchestration -------------------------------------------------------------
+
+def _wait_for(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.3)
+    raise SystemExit(f"server did not come up at {url}")
+
+def start_server(port: int, env: Dict[str, str], workers: int) -> subprocess.Popen:
+    """gunicorn when installed (closer to production), else runserver."""
+    try:
+        import gunicorn  # noqa: F401
+        cmd = [sys.executable, "-m", "gunicorn", "applymate.wsgi", "-b", f"127.0.0.1:{port}",
+               "-w", str(workers), "--threads", "4", "--log-level", "warning"]
+    except ImportError:
+        cmd = [sys.executable, "manage.py", "runserver", "--noreload", f"127.0.0.1:{port}"]
+    return subprocess.Popen(cmd, cwd=BACKEND, env={**os.environ, **env})
+
+def run_all(args) -> int:
+    from bench import fake_openai, fake_jobboard
+    if not args.no_seed:
+        seed(args.users, args.jobs, args.apps)
+    llm = fake_openai.serve(args.llm_port, token_delay=args.llm_token_delay, latency=args.llm_latency)
+    board = fake_jobboard.serve(args.board_port, latency=args.board_latency)
+    fakes = {"llm": f"http://127.0.0.1:{args.llm_port}/v1", "board": f"http://127.0.0.1:{args.board_port}"}
+    env = {"AI_API_KEY": "loadtest", "AI_BASE_URL": fakes["llm"], "ATS_GREENHOUSE_API": fakes["board"],
+           "DEBUG": "0", "ALLOWED_HOSTS": "127.0.0.1,localhost", "AI_LOG_LEVEL": "WARNING"}
+    server = start_server(args.port, env, args.workers)
+    args.base = f"http://127.0.0.1:{args.port}"
+    try:
+        _wait_for(f"{args.base}/api/health/")
+        return run(args, fakes)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        llm.shutdown()
+        board.shutdown()
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    def seed_args(p):
+        p.add_argument("--users", type=int, default=4)
+        p.add_argument("--jobs", type=int, default=2000, help="postings per user")
+        p.add_argument("--apps", type=int, default=2000, help="applications per user")
+
+    def run_args(p):
+        p.add_argument("--stages", default="1,4,16", help="comma-separated concurrency levels")
+        p.add_argument("--duration", type=float, default=30, help="seconds per stage")
+        p.add_argument("--think", type=float, default=0.0, help="mean think time between journeys (s)")
+        p.add_argument("--slo-ms", type=float, default=1000, help="p99 bound for 'max sustainable RPS'")
+        p.add_argument("--out", help="report path (default bench/results/loadtest-<ts>.json)")
+        p.add_argument("--compare", help="earlier report to compare against")
+        p.add_argument("--tolerance", type=float, default=0.2)
+        p.add_argument("--llm-latency", type=float, default=0.3)
+        p.add_argument("--board-latency", type=float, default=0.1)
+
+    seed_args(sub.add_parser("seed", help="seed load-test users, jobs and applications"))
+    p = sub.add_parser("run", help="run against an already running server")
+    p.add_argument("--base", default="http://127.0.0.1:8000")
+    p.add_argument("--users", type=int, default=4, help="seeded accounts to spread VUs over")
+    p.add_argument("--board", default="", help="fake job board URL for page-extract journeys")
+    run_args(p)
+    p = sub.add_parser("all", help="seed, start fakes and a server, run, tear down")
+    seed_args(p)
+    run_args(p)
+    p.add_argument("--no-seed", action="store_true")
+    p.add_argument("--port", type=int, default=8096)
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--llm-port", type=int, default=8099)
+    p.add_argument("--llm-token-delay", type=float, default=0.02)
+    p.add_argument("--board-port", type=int, default=8097)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "seed":
+        seed(args.users, args.jobs, args.apps)
+        return 0
+    if args.cmd == "run":
+        return run(args, {"board": args.board})
+    return run_all(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+from django.contrib import admin, messages
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from django.db.models import F, Sum
+from .models import RequestProfile, LLMUsage, LLMUsageDaily
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ('id','method','path','status_code','duration_ms','trigger','user','created_at','download')
+    list_filter = ('trigger','method','status_code')
+    search_fields = ('path',)
+    exclude = ('data',)
+    readonly_fields = ('user','method','path','status_code','duration_ms','trigger','fmt','created_at','download')
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        extra = [path('<int:pk>/download/', self.admin_site.admin_view(self.download_view),
+                      name='core_requestprofile_download')]
+        return extra + super().get_urls()
+
+    @admin.display(description='Profile')
+    def download(self, obj):
+        if not obj.pk:
+            return '-'
+        return format_html('<a href="{}">download</a>', reverse('admin:core_requestprofile_download', args=[obj.pk]))
+
+    def download_view(self, request, pk):
+        prof = get_object_or_404(RequestProfile, pk=pk)
+        if not self.has_view_permission(request, prof):
+            return HttpResponse(status=403)
+        html = prof.fmt == 'html'
+        resp = HttpResponse(bytes(prof.data), content_type='text/html' if html else 'text/plain; charset=utf-8')
+        resp['Content-Disposition'] = f'attachment; filename="profile-{prof.pk}.{"html" if html else "txt"}"'
+        return resp
+
+
+@admin.register(LLMUsage)
+class LLMUsageAdmin(admin.ModelAdmin):
+    list_display = ('id','created_at','user_id','endpoint','operation','model','prompt_tokens',
+                    'completion_tokens','cached_tokens','latency_ms','ok','estimated')
+    list_filter = ('operation','model','ok','estimated')
+    search_fields = ('endpoint','=user_id')
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False   # append-only
+
+
+@admin.register(LLMUsageDaily)
+class LLMUsageDailyAdmin(admin.ModelAdmin):
+    list_display = ('day','user_id','endpoint','operation','model','calls','errors','cache_hits',
+                    'prompt_tokens','completion_tokens','avg_latency_ms','latency_ms_max')
+    list_filter = ('operation','model','endpoint')
+    search_fields = ('=user_id',)
+    date_hierarchy = 'day'
+    ordering = ('-day','-prompt_tokens')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False   # rebuilt by manage.py rollup_llm_usage
+
+    @admin.display(description='Avg latency (ms)')
+    def avg_latency_ms(self, obj):
+        return round(obj.latency_ms_total / obj.calls, 1) if obj.calls else 0
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        cl = getattr(response, 'context_data', {}).get('cl')
+        if cl is not None:
+            # totals for the current filter, as a banner above the table
+            t = cl.queryset.aggregate(calls=Sum('calls'), errors=Sum('errors'),
+                                      tokens=Sum(F('prompt_tokens') + F('completion_tokens')))
+            self.message_user(request, f"{t['calls'] or 0} calls, {t['tokens'] or 0} tokens, "
+                                       f"{t['errors'] or 0} errors", messages.INFO)
+        return response
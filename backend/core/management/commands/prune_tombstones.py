@@ -0,0 +1,20 @@
+# backend/core/management/commands/prune_tombstones.py
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = ("Delete tombstones older than TOMBSTONE_RETENTION_DAYS. Clients with an older "
+            "sync cursor get a full snapshot anyway, so these are no longer needed.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="override TOMBSTONE_RETENTION_DAYS")
+
+    def handle(self, *args, **opts):
+        days = opts["days"] if opts["days"] is not None else int(getattr(settings, "TOMBSTONE_RETENTION_DAYS", 30))
+        cutoff = timezone.now() - timedelta(days=days)
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(f"pruned {deleted} tombstone(s) older than {days} day(s)")
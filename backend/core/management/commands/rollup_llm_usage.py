@@ -0,0 +1,51 @@
+# backend/core/management/commands/rollup_llm_usage.py
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from core.models import LLMUsage, LLMUsageDaily
+from utils import llm_usage
+
+
+class Command(BaseCommand):
+    help = ("Sum the LLM usage ledger into LLMUsageDaily (one row per day, user, endpoint, "
+            "operation and model), then prune raw rows past LLM_USAGE_RETENTION_DAYS. "
+            "Days are rebuilt whole, so re-running is safe; run it hourly or nightly.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=2, help="rebuild this many days, ending today")
+        parser.add_argument("--no-prune", action="store_true", help="keep old ledger rows")
+
+    def handle(self, *args, **opts):
+        if opts["days"] < 1:
+            raise CommandError("--days must be positive")
+        llm_usage.flush()   # this process's own buffered rows, e.g. from a preceding command
+        today = timezone.localdate()
+        first = today - timedelta(days=opts["days"] - 1)
+        start = timezone.make_aware(datetime.combine(first, time.min))
+        rows = (LLMUsage.objects.filter(created_at__gte=start)
+                .annotate(day=TruncDate("created_at"))
+                .values("day", "user_id", "endpoint", "operation", "model")
+                .annotate(calls=Count("id"), errors=Count("id", filter=Q(ok=False)),
+                          cache_hits=Count("id", filter=Q(cached_tokens__gt=0)),
+                          prompt_tokens=Sum("prompt_tokens"), completion_tokens=Sum("completion_tokens"),
+                          cached_tokens=Sum("cached_tokens"), latency_ms_total=Sum("latency_ms"),
+                          latency_ms_max=Max("latency_ms"))
+                .order_by())
+        daily = [LLMUsageDaily(**r) for r in rows.iterator()]
+        with transaction.atomic():
+            LLMUsageDaily.objects.filter(day__gte=first).delete()
+            LLMUsageDaily.objects.bulk_create(daily, batch_size=500)
+        self.stdout.write(f"{len(daily)} daily row(s) for {first}..{today}")
+
+        if not opts["no_prune"]:
+            keep = int(getattr(settings, "LLM_USAGE_RETENTION_DAYS", 90))
+            cutoff = timezone.make_aware(datetime.combine(today - timedelta(days=keep), time.min))
+            # only days already rolled up may go
+            cutoff = min(cutoff, start)
+            deleted, _ = LLMUsage.objects.filter(created_at__lt=cutoff).delete()
+            if deleted:
+                self.stdout.write(f"pruned {deleted} ledger row(s) before {cutoff:%Y-%m-%d}")
@@ -0,0 +1,60 @@
+# Generated by Django 5.0.6 on 2026-10-19 12:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('endpoint', models.CharField(blank=True, max_length=100)),
+                ('operation', models.CharField(max_length=40)),
+                ('model', models.CharField(max_length=100)),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('completion_tokens', models.PositiveIntegerField(default=0)),
+                ('cached_tokens', models.PositiveIntegerField(default=0)),
+                ('estimated', models.BooleanField(default=False)),
+                ('latency_ms', models.FloatField()),
+                ('first_token_ms', models.FloatField(blank=True, null=True)),
+                ('ok', models.BooleanField(default=True)),
+                ('error', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'LLM call',
+                'indexes': [models.Index(fields=['user_id', 'created_at'], name='core_llmusa_user_id_12c0ac_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LLMUsageDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('endpoint', models.CharField(blank=True, max_length=100)),
+                ('operation', models.CharField(max_length=40)),
+                ('model', models.CharField(max_length=100)),
+                ('calls', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                ('cache_hits', models.PositiveIntegerField(default=0)),
+                ('prompt_tokens', models.PositiveBigIntegerField(default=0)),
+                ('completion_tokens', models.PositiveBigIntegerField(default=0)),
+                ('cached_tokens', models.PositiveBigIntegerField(default=0)),
+                ('latency_ms_total', models.FloatField(default=0)),
+                ('latency_ms_max', models.FloatField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'LLM usage (daily)',
+                'indexes': [models.Index(fields=['day', 'user_id'], name='core_llmusa_day_f99443_idx')],
+            },
+        ),
+    ]
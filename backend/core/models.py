@@ -0,0 +1,77 @@
+from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+class RequestProfile(models.Model):
+    """One profiled request (see utils.profiling.ProfilingMiddleware)."""
+    TRIGGERS = [("header", "Header"), ("query", "Query flag"), ("sample", "Sampled")]
+    FORMATS = [("html", "pyinstrument HTML"), ("pstats", "cProfile text")]
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="request_profiles")
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    status_code = models.PositiveSmallIntegerField(default=0)
+    duration_ms = models.FloatField()
+    trigger = models.CharField(max_length=10, choices=TRIGGERS)
+    fmt = models.CharField(max_length=10, choices=FORMATS)
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    def __str__(self): return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+class Tombstone(models.Model):
+    """A deleted row, reported by GET /api/changes/ until pruned.
+
+    user_id is a plain column, not a FK, so rows deleted along with their
+    user don't block that delete.
+    """
+    user_id = models.BigIntegerField()
+    kind = models.CharField(max_length=20)   # key in jobs.sync.SYNC_MODELS: "jobs", "applications", ...
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    class Meta:
+        indexes = [models.Index(fields=["user_id", "deleted_at"])]
+    def __str__(self): return f"{self.kind} #{self.object_id}"
+
+class LLMUsage(models.Model):
+    """One LLM call (utils/llm_usage.py). Append-only; written in batches by a
+    background thread and summed per day into LLMUsageDaily."""
+    user_id = models.BigIntegerField(null=True, blank=True)   # plain column like Tombstone; None for anonymous/commands
+    endpoint = models.CharField(max_length=100, blank=True)   # URL route, or "cmd:<command>"
+    operation = models.CharField(max_length=40)   # "extract", "doc:bullets", ...
+    model = models.CharField(max_length=100)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    cached_tokens = models.PositiveIntegerField(default=0)   # prompt tokens served from the provider's prompt cache
+    estimated = models.BooleanField(default=False)   # provider sent no usage; counted locally
+    latency_ms = models.FloatField()
+    first_token_ms = models.FloatField(null=True, blank=True)   # streamed calls only
+    ok = models.BooleanField(default=True)
+    error = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)   # call time, not flush time
+    class Meta:
+        verbose_name = "LLM call"
+        indexes = [models.Index(fields=["user_id", "created_at"])]
+    @property
+    def cache_hit(self): return self.cached_tokens > 0
+    def __str__(self): return f"{self.operation} {self.model} ({self.prompt_tokens}+{self.completion_tokens} tokens)"
+
+class LLMUsageDaily(models.Model):
+    """LLMUsage summed per day, user, endpoint, operation and model (manage.py rollup_llm_usage)."""
+    day = models.DateField()
+    user_id = models.BigIntegerField(null=True, blank=True)
+    endpoint = models.CharField(max_length=100, blank=True)
+    operation = models.CharField(max_length=40)
+    model = models.CharField(max_length=100)
+    calls = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    cache_hits = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveBigIntegerField(default=0)
+    completion_tokens = models.PositiveBigIntegerField(default=0)
+    cached_tokens = models.PositiveBigIntegerField(default=0)
+    latency_ms_total = models.FloatField(default=0)
+    latency_ms_max = models.FloatField(default=0)
+    class Meta:
+        verbose_name_plural = "LLM usage (daily)"
+        indexes = [models.Index(fields=["day", "user_id"])]
+    @property
+    def total_tokens(self): return self.prompt_tokens + self.completion_tokens
+    def __str__(self): return f"{self.day} user={self.user_id} {self.operation} {self.model}"
@@ -0,0 +1,66 @@
+# Store Resume.parsed_text and GeneratedDoc.content_md compressed
+# (utils/compressed_text.py); same column swap as jobs.0005_compress_jd_raw.
+
+from django.db import migrations, models
+import utils.compressed_text
+
+BATCH = 500
+
+
+def copy(model_name, src, dst):
+    def run(apps, schema_editor):
+        Model = apps.get_model("docs_app", model_name)
+        batch = []
+        for obj in Model.objects.only("pk", src).iterator(chunk_size=BATCH):
+            setattr(obj, dst, str(getattr(obj, src)))
+            batch.append(obj)
+            if len(batch) >= BATCH:
+                Model.objects.bulk_update(batch, [dst])
+                batch = []
+        if batch:
+            Model.objects.bulk_update(batch, [dst])
+    return run
+
+
+def swap(model_name, field_name, **field_kwargs):
+    tmp = f"{field_name}_z"
+    return [
+        # nullable first, so unapplying can re-add the column before copying back
+        migrations.AlterField(
+            model_name=model_name,
+            name=field_name,
+            field=models.TextField(null=True, **field_kwargs),
+        ),
+        migrations.AddField(
+            model_name=model_name,
+            name=tmp,
+            field=utils.compressed_text.CompressedTextField(null=True),
+        ),
+        migrations.RunPython(copy(model_name, field_name, tmp), copy(model_name, tmp, field_name)),
+        migrations.RemoveField(
+            model_name=model_name,
+            name=field_name,
+        ),
+        migrations.RenameField(
+            model_name=model_name,
+            old_name=tmp,
+            new_name=field_name,
+        ),
+        migrations.AlterField(
+            model_name=model_name,
+            name=field_name,
+            field=utils.compressed_text.CompressedTextField(**field_kwargs),
+        ),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docs_app', '0003_alter_generateddoc_user_alter_resume_user'),
+    ]
+
+    operations = [
+        *swap('resume', 'parsed_text', blank=True),
+        *swap('generateddoc', 'content_md'),
+    ]
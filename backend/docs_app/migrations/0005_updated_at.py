@@ -0,0 +1,23 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def updated_at(model_name):
+    return migrations.AddField(
+        model_name=model_name,
+        name='updated_at',
+        field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+        preserve_default=False,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docs_app', '0004_compress_text'),
+    ]
+
+    operations = [
+        updated_at('resume'),
+        updated_at('generateddoc'),
+    ]
@@ -1,12 +1,14 @@
 from django.db import models
 from django.contrib.auth.models import User
+from utils.compressed_text import CompressedTextField
 
 class Resume(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="resumes" )
     label = models.CharField(max_length=120, default="Base Resume")
     file = models.FileField(upload_to="resumes/")
-    parsed_text = models.TextField(blank=True)
+    parsed_text = CompressedTextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     def __str__(self): return self.label
 
 class GeneratedDoc(models.Model):
@@ -14,7 +16,8 @@ class GeneratedDoc(models.Model):
     KIND = [("bullets","Bullets"), ("coverletter","CoverLetter"), ("resume","Resume")]
     job = models.ForeignKey('jobs.JobPosting', on_delete=models.CASCADE, related_name="generated_docs")
     kind = models.CharField(max_length=20, choices=KIND)
-    content_md = models.TextField()
+    content_md = CompressedTextField()
     file = models.FileField(upload_to="generated/", blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     def __str__(self): return f"{self.kind} for {self.job}"
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 class JobsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'jobs'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (sync tombstones)
+        from utils import cost_throttle
+        cost_throttle.warn_if_unshared()
@@ -0,0 +1,255 @@
+# backend/jobs/bulk.py
+from typing import Any, Dict, Iterable, List, Optional, Set
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from ai import incremental
+from . import sync
+from .models import Company, JobPosting, Application
+from .serializers import JobPostingSerializer, ApplicationSerializer
+
+# Batch writes for /api/jobs/bulk/ and /api/apps/bulk/:
+#   POST   [{...}, ...]            create
+#   PATCH  [{"id": 1, ...}, ...]   partial update
+#   DELETE {"ids": [1, 2]}         delete (a bare list of ids works too)
+# Every item is validated first with no per-item queries: FKs are read as
+# plain ints and ownership of all referenced rows is checked with one query
+# per model. Then the whole batch is written in one transaction with
+# bulk_create/bulk_update. It is all or nothing: if any item fails, nothing
+# is written and the 400 carries {"errors": [...]}, one entry per item ({}
+# for the good ones), like DRF's many=True errors. On success, "results"
+# holds the rows in request order, serialized as the single-item endpoints
+# do.
+#
+# bulk_update doesn't fire post_save or set auto_now, so updated_at (which
+# also keys the fit_score cache) is set here; deletes go through the ORM so the
+# usual signals fire, with their tombstones batched.
+
+NOT_FOUND = "Not found."
+
+
+class BulkError(Exception):
+    def __init__(self, errors: Any):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _max_items() -> int:
+    return int(getattr(settings, "BULK_MAX_ITEMS", 500))
+
+
+def _items(data, need_id: bool = False) -> List[Dict[str, Any]]:
+    if not isinstance(data, list) or not data:
+        raise BulkError({"detail": "Expected a non-empty list of objects."})
+    if len(data) > _max_items():
+        raise BulkError({"detail": f"At most {_max_items()} items per request."})
+    if not all(isinstance(it, dict) for it in data):
+        raise BulkError({"detail": "Expected a non-empty list of objects."})
+    if need_id:
+        try:
+            ids = [int(it["id"]) for it in data]
+        except (KeyError, TypeError, ValueError):
+            raise BulkError({"detail": "Every item needs an integer id."})
+        if len(set(ids)) != len(ids):
+            raise BulkError({"detail": "Duplicate ids in the batch."})
+        data = [{**it, "id": i} for it, i in zip(data, ids)]
+    return data
+
+
+def _ids(data) -> List[int]:
+    if isinstance(data, dict):
+        data = data.get("ids")
+    if not isinstance(data, list) or not data:
+        raise BulkError({"detail": "Expected {\"ids\": [...]}."})
+    if len(data) > _max_items():
+        raise BulkError({"detail": f"At most {_max_items()} items per request."})
+    try:
+        return list(dict.fromkeys(int(i) for i in data))
+    except (TypeError, ValueError):
+        raise BulkError({"detail": "ids must be integers."})
+
+
+def _validate(sers: Iterable[Optional[serializers.Serializer]], errors: List[Dict[str, Any]]) -> None:
+    for i, ser in enumerate(sers):
+        if ser is not None and not ser.is_valid():
+            errors[i] = dict(ser.errors)
+
+
+def _raise_if(errors: List[Dict[str, Any]]) -> None:
+    if any(errors):
+        raise BulkError({"errors": errors})
+
+
+def _owned(model, user_field: str, user, ids: Set[int]) -> Set[int]:
+    if not ids:
+        return set()
+    return set(model.objects.filter(**{user_field: user, "id__in": ids}).values_list("id", flat=True))
+
+
+def _apply(instances: List[Any], changes: List[Dict[str, Any]], model, now) -> None:
+    """setattr the validated changes, then one bulk_update per distinct set
+    of changed fields, so fields an item didn't send aren't rewritten."""
+    groups: Dict[tuple, List[Any]] = {}
+    for obj, vd in zip(instances, changes):
+        for field, value in vd.items():
+            setattr(obj, field, value)
+        obj.updated_at = now
+        groups.setdefault(tuple(sorted(vd)), []).append(obj)
+    for fields, objs in groups.items():
+        model.objects.bulk_update(objs, [*fields, "updated_at"])
+
+
+def _delete(model, user_field: str, user, data) -> Dict[str, Any]:
+    ids = _ids(data)
+    with transaction.atomic():
+        qs = model.objects.filter(**{user_field: user, "id__in": ids})
+        found = set(qs.values_list("id", flat=True))
+        _raise_if([{} if i in found else {"id": [NOT_FOUND]} for i in ids])
+        with sync.batched_tombstones(user.id):
+            qs.delete()
+    return {"deleted": ids}
+
+
+# ---- applications ----
+
+class _ApplicationWrite(ApplicationSerializer):
+    job = serializers.IntegerField()   # a plain id: ownership is checked for the whole batch
+
+    class Meta(ApplicationSerializer.Meta):
+        pass
+
+
+def _check_jobs(user, sers, errors) -> None:
+    valid = [i for i, s in enumerate(sers) if s is not None and not errors[i] and "job" in s.validated_data]
+    owned = _owned(JobPosting, "user", user, {sers[i].validated_data["job"] for i in valid})
+    for i in valid:
+        if sers[i].validated_data["job"] not in owned:
+            errors[i] = {"job": [NOT_FOUND]}
+
+
+def _app_fields(vd: Dict[str, Any]) -> Dict[str, Any]:
+    vd = dict(vd)
+    if "job" in vd:
+        vd["job_id"] = vd.pop("job")
+    return vd
+
+
+def create_apps(user, data) -> Dict[str, Any]:
+    items = _items(data)
+    sers = [_ApplicationWrite(data=it) for it in items]
+    errors: List[Dict[str, Any]] = [{} for _ in items]
+    _validate(sers, errors)
+    _check_jobs(user, sers, errors)
+    _raise_if(errors)
+    with transaction.atomic():
+        apps = Application.objects.bulk_create([Application(**_app_fields(s.validated_data)) for s in sers])
+    return {"results": ApplicationSerializer(apps, many=True).data}
+
+
+def update_apps(user, data) -> Dict[str, Any]:
+    items = _items(data, need_id=True)
+    with transaction.atomic():
+        found = Application.objects.filter(job__user=user).select_for_update().in_bulk([it["id"] for it in items])
+        errors: List[Dict[str, Any]] = [{} if it["id"] in found else {"id": [NOT_FOUND]} for it in items]
+        sers = [_ApplicationWrite(found[it["id"]], data=it, partial=True) if it["id"] in found else None
+                for it in items]
+        _validate(sers, errors)
+        _check_jobs(user, sers, errors)
+        _raise_if(errors)
+        apps = [found[it["id"]] for it in items]
+        _apply(apps, [_app_fields(s.validated_data) for s in sers], Application, timezone.now())
+    return {"results": ApplicationSerializer(apps, many=True).data}
+
+
+def delete_apps(user, data) -> Dict[str, Any]:
+    return _delete(Application, "job__user", user, data)
+
+
+# ---- jobs ----
+
+class _JobPostingWrite(JobPostingSerializer):
+    company_id = serializers.IntegerField(write_only=True, required=False)   # checked per batch, like job above
+
+    class Meta(JobPostingSerializer.Meta):
+        pass
+
+
+def _resolve_companies(user, sers, errors, require: bool) -> None:
+    """Turn company_id / company_name into company for each valid item:
+    ids must be the user's, names are created if missing. One query for
+    the ids, one or two for the names."""
+    ids, names = set(), set()
+    for s, e in zip(sers, errors):
+        if s is None or e:
+            continue
+        vd = s.validated_data
+        if vd.get("company_id") is not None:
+            ids.add(vd["company_id"])
+        elif vd.get("company_name"):
+            names.add(vd["company_name"])
+    companies = Company.objects.filter(user=user, id__in=ids).in_bulk() if ids else {}
+    by_name: Dict[str, Company] = {}
+    if names:
+        by_name = {c.name: c for c in Company.objects.filter(user=user, name__in=names)}
+        missing = names - by_name.keys()
+        if missing:
+            Company.objects.bulk_create([Company(user=user, name=n) for n in missing], ignore_conflicts=True)
+            by_name = {c.name: c for c in Company.objects.filter(user=user, name__in=names)}
+
+    for i, s in enumerate(sers):
+        if s is None or errors[i]:
+            continue
+        vd = s.validated_data
+        cid, name = vd.pop("company_id", None), vd.pop("company_name", None)
+        if cid is not None:
+            if cid not in companies:
+                errors[i] = {"company_id": [NOT_FOUND]}
+                continue
+            vd["company"] = companies[cid]
+        elif name:
+            vd["company"] = by_name[name]
+        elif require:
+            errors[i] = {"non_field_errors": ["company_id or company_name is required"]}
+
+
+def create_jobs(user, data) -> Dict[str, Any]:
+    items = _items(data)
+    sers = [_JobPostingWrite(data=it) for it in items]
+    errors: List[Dict[str, Any]] = [{} for _ in items]
+    _validate(sers, errors)
+    with transaction.atomic():
+        _resolve_companies(user, sers, errors, require=True)
+        _raise_if(errors)
+        jobs = JobPosting.objects.bulk_create([JobPosting(user=user, **s.validated_data) for s in sers])
+    return {"results": JobPostingSerializer(jobs, many=True).data}
+
+
+def _reextract(job: JobPosting, vd: Dict[str, Any]) -> None:
+    """Like PATCH jobs/<id>/, refresh jd_struct for an edited jd_raw, but
+    heuristics only: a batch shouldn't wait on one LLM call per item."""
+    if "jd_raw" in vd and "jd_struct" not in vd and vd["jd_raw"] != job.jd_raw:
+        vd["jd_struct"], vd["jd_sections"] = incremental.reextract(
+            job.jd_raw, vd["jd_raw"], job.jd_struct, job.jd_sections, llm_gate=lambda: False)
+
+
+def update_jobs(user, data) -> Dict[str, Any]:
+    items = _items(data, need_id=True)
+    with transaction.atomic():
+        found = (JobPosting.objects.select_related("company").filter(user=user)
+                 .select_for_update(of=("self",)).in_bulk([it["id"] for it in items]))
+        errors: List[Dict[str, Any]] = [{} if it["id"] in found else {"id": [NOT_FOUND]} for it in items]
+        sers = [_JobPostingWrite(found[it["id"]], data=it, partial=True) if it["id"] in found else None
+                for it in items]
+        _validate(sers, errors)
+        _resolve_companies(user, sers, errors, require=False)
+        _raise_if(errors)
+        jobs = [found[it["id"]] for it in items]
+        for job, s in zip(jobs, sers):
+            _reextract(job, s.validated_data)
+        _apply(jobs, [s.validated_data for s in sers], JobPosting, timezone.now())
+    return {"results": JobPostingSerializer(jobs, many=True).data}
+
+
+def delete_jobs(user, data) -> Dict[str, Any]:
+    return _delete(JobPosting, "user", user, data)
@@ -0,0 +1,47 @@
+# backend/jobs/fit_cache.py
+from typing import Any, Dict, Optional
+from django.conf import settings
+from django.core.cache import cache
+from docs_app.models import Resume
+from .models import JobPosting
+
+# fit_score results are memoized under (job id, job updated_at, resume id,
+# resume updated_at). Every write path sets updated_at (auto_now on save();
+# bulk writes and reextract_jobs set it by hand), so an edit makes the old
+# entries unreachable and they simply expire. The stamps are read from the
+# database on each lookup, not kept in the cache, so an edit made in one
+# worker is seen by all of them even with the per-process default cache.
+
+PREFIX = "fit"
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "FIT_CACHE_TTL", 86400))
+
+
+def _stamp(updated_at) -> int:
+    return int(updated_at.timestamp() * 1_000_000)
+
+
+def _key(job_id, job_stamp: int, resume_id, resume_stamp: int) -> str:
+    return f"{PREFIX}:{job_id}.{job_stamp}:{resume_id}.{resume_stamp}"
+
+
+def get(job_id, resume_id) -> Optional[Dict[str, Any]]:
+    if _ttl() <= 0:
+        return None
+    try:   # "5" and 5 must share an entry; anything else is left to the view
+        job_id, resume_id = int(job_id), int(resume_id)
+    except (TypeError, ValueError):
+        return None
+    job_at = JobPosting.objects.filter(pk=job_id).values_list("updated_at", flat=True).first()
+    resume_at = Resume.objects.filter(pk=resume_id).values_list("updated_at", flat=True).first()
+    if job_at is None or resume_at is None:
+        return None
+    return cache.get(_key(job_id, _stamp(job_at), resume_id, _stamp(resume_at)))
+
+
+def put(job: JobPosting, resume: Resume, result: Dict[str, Any]) -> None:
+    ttl = _ttl()
+    if ttl > 0:
+        cache.set(_key(job.pk, _stamp(job.updated_at), resume.pk, _stamp(resume.updated_at)), result, ttl)
@@ -0,0 +1,133 @@
+# backend/jobs/management/commands/reextract_jobs.py
+import os, json, time, contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from jobs.models import JobPosting
+from ai import provider as ai_provider
+from ai import incremental as ai_incremental
+from utils import llm_usage
+
+DEFAULT_CHECKPOINT = settings.BASE_DIR / "reextract_jobs.checkpoint.json"
+
+
+def _diff(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    lines = []
+    for k in ai_provider.DEFAULT_JD:
+        a, b = (old or {}).get(k), new.get(k)
+        if a == b:
+            continue
+        if isinstance(b, list):
+            a = a if isinstance(a, list) else []
+            lines += [f"    {k}: +{x!r}" for x in b if x not in a]
+            lines += [f"    {k}: -{x!r}" for x in a if x not in b]
+        else:
+            lines.append(f"    {k}: {a!r} -> {b!r}")
+    return lines
+
+
+class Command(BaseCommand):
+    help = ("Re-run JD extraction over stored jobs and write jd_struct back in bulk. "
+            "Resumable: progress is checkpointed after every chunk.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=200, help="rows per read/bulk_update batch")
+        parser.add_argument("--workers", type=int, default=4, help="concurrent extractions")
+        parser.add_argument("--rate", type=float, default=0, help="max extractions per second (0 = unlimited)")
+        parser.add_argument("--dry-run", action="store_true", help="print per-job diffs, write nothing")
+        parser.add_argument("--heuristic-only", action="store_true", help="skip the LLM chain")
+        parser.add_argument("--user", help="only this username's jobs")
+        parser.add_argument("--checkpoint", default=str(DEFAULT_CHECKPOINT))
+        parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+
+    def handle(self, *args, **opts):
+        with llm_usage.scope(endpoint="cmd:reextract_jobs"):
+            self._handle(**opts)
+
+    def _handle(self, **opts):
+        if opts["chunk_size"] < 1 or opts["workers"] < 1:
+            raise CommandError("--chunk-size and --workers must be positive")
+        if opts["heuristic_only"]:
+            settings.AI_PROVIDER = "heuristic"
+            ai_provider.chain.reset_chain()
+
+        ckpt_path = opts["checkpoint"]
+        state = {"last_pk": 0, "processed": 0, "changed": 0}
+        if not opts["restart"] and not opts["dry_run"] and os.path.exists(ckpt_path):
+            with open(ckpt_path, encoding="utf-8") as f:
+                state.update(json.load(f))
+            self.stdout.write(f"resuming after pk {state['last_pk']} ({state['processed']} done)")
+
+        qs = JobPosting.objects.filter(pk__gt=state["last_pk"]).order_by("pk").only("id", "jd_raw", "jd_struct", "jd_sections")
+        if opts["user"]:
+            qs = qs.filter(user__username=opts["user"])
+        total = qs.count()
+        self.stdout.write(f"{total} job(s) to process")
+
+        self._interval = 1.0 / opts["rate"] if opts["rate"] > 0 else 0.0
+        self._next_at = time.monotonic()
+        started = time.monotonic()
+        chunk: List[JobPosting] = []
+        with ThreadPoolExecutor(max_workers=opts["workers"]) as pool:
+            # rows are streamed; updates only touch jd_struct/jd_sections, never the pk ordering
+            for job in qs.iterator(chunk_size=opts["chunk_size"]):
+                chunk.append(job)
+                if len(chunk) >= opts["chunk_size"]:
+                    self._run_chunk(pool, chunk, state, opts)
+                    chunk = []
+            if chunk:
+                self._run_chunk(pool, chunk, state, opts)
+
+        elapsed = time.monotonic() - started
+        verb = "would change" if opts["dry_run"] else "updated"
+        self.stdout.write(self.style.SUCCESS(
+            f"done: {state['processed']} processed, {state['changed']} {verb} in {elapsed:.1f}s"))
+        if not opts["dry_run"] and os.path.exists(ckpt_path):
+            os.remove(ckpt_path)   # finished cleanly; next run starts from the top
+
+    def _submit(self, pool, text: str):
+        if self._interval:
+            now = time.monotonic()
+            if self._next_at > now:
+                time.sleep(self._next_at - now)
+            self._next_at = max(now, self._next_at) + self._interval
+        # copy the context so the LLM usage scope reaches the worker threads
+        return pool.submit(contextvars.copy_context().run, ai_provider.extract_jd, text or "")
+
+    def _run_chunk(self, pool, chunk: List[JobPosting], state: Dict[str, Any], opts) -> None:
+        futures = [self._submit(pool, job.jd_raw) for job in chunk]
+        changed = []
+        for job, fut in zip(chunk, futures):
+            try:
+                new = ai_provider._ensure_shape(fut.result())
+            except Exception as e:
+                self.stderr.write(f"job {job.pk}: extraction failed ({e.__class__.__name__}: {e}); kept as is")
+                continue
+            if new == job.jd_struct:
+                continue
+            if opts["dry_run"]:
+                self.stdout.write(f"job {job.pk}:")
+                self.stdout.write("\n".join(_diff(job.jd_struct, new)))
+            job.jd_struct = new
+            job.jd_sections = ai_incremental.index(job.jd_raw, new)   # later edits re-extract from here
+            changed.append(job)
+
+        if changed and not opts["dry_run"]:
+            now = timezone.now()
+            for job in changed:   # bulk_update skips auto_now; updated_at also retires cached fit scores
+                job.updated_at = now
+            JobPosting.objects.bulk_update(changed, ["jd_struct", "jd_sections", "updated_at"])
+        state["processed"] += len(chunk)
+        state["changed"] += len(changed)
+        state["last_pk"] = chunk[-1].pk
+        if not opts["dry_run"]:
+            self._save_checkpoint(opts["checkpoint"], state)
+        self.stdout.write(f"  ...{state['processed']} processed, last pk {state['last_pk']}")
+
+    def _save_checkpoint(self, path: str, state: Dict[str, Any]) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({**state, "saved_at": timezone.now().isoformat()}, f)
+        os.replace(tmp, path)   # atomic, so an interrupt never leaves half a file
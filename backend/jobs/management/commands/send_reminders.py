@@ -0,0 +1,46 @@
+# backend/jobs/management/commands/send_reminders.py
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections
+from jobs import reminders
+
+
+class Command(BaseCommand):
+    help = ("Email each user one digest of their due and overdue application next steps. "
+            "Incremental: a reminder is sent once per due date. Run from cron, or with --loop as a worker.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="print the digests, send and mark nothing")
+        parser.add_argument("--date", help="treat this YYYY-MM-DD as today")
+        parser.add_argument("--loop", type=int, default=0, metavar="SECONDS",
+                            help="keep running, one pass every SECONDS (0 = a single pass)")
+
+    def handle(self, *args, **opts):
+        try:
+            today = date.fromisoformat(opts["date"]) if opts["date"] else None
+        except ValueError:
+            raise CommandError("--date must be YYYY-MM-DD")
+        if today and opts["loop"] > 0:
+            raise CommandError("--date can't be combined with --loop: every pass would use the same day")
+        log = self.stdout.write if opts["dry_run"] or opts["verbosity"] > 1 else None
+        while True:
+            started = time.monotonic()
+            # like a request: drop connections past CONN_MAX_AGE or broken since the last pass
+            close_old_connections()
+            try:
+                stats = reminders.run(today=today, dry_run=opts["dry_run"], log=log)
+            except DatabaseError as e:
+                if opts["loop"] <= 0:
+                    raise
+                # a worker outlives database hiccups; rows left unmarked are picked up next pass
+                self.stderr.write(f"pass failed ({e.__class__.__name__}: {e}); retrying in {opts['loop']}s")
+                close_old_connections()
+                time.sleep(opts["loop"])
+                continue
+            verb = "would send" if opts["dry_run"] else "sent"
+            self.stdout.write(self.style.SUCCESS(
+                f"{stats['users']} user(s), {stats['items']} due item(s): {verb} {stats['sent']} digest(s), {stats['no_email']} without an email address, {stats['failed']} failed (retried next pass), in {time.monotonic() - started:.1f}s"))
+            if opts["loop"] <= 0:
+                return
+            time.sleep(opts["loop"])
@@ -0,0 +1,60 @@
+# Store JobPosting.jd_raw compressed (utils/compressed_text.py).
+# The text moves through a new binary column in batches, then that column
+# takes the old one's name; a plain AlterField would cast text to bytea in
+# the database, which mangles backslashes on Postgres.
+
+from django.db import migrations, models
+import utils.compressed_text
+
+BATCH = 500
+
+
+def copy(src, dst):
+    def run(apps, schema_editor):
+        JobPosting = apps.get_model("jobs", "JobPosting")
+        batch = []
+        for job in JobPosting.objects.only("pk", src).iterator(chunk_size=BATCH):
+            setattr(job, dst, str(getattr(job, src)))
+            batch.append(job)
+            if len(batch) >= BATCH:
+                JobPosting.objects.bulk_update(batch, [dst])
+                batch = []
+        if batch:
+            JobPosting.objects.bulk_update(batch, [dst])
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_company_uniq_company_user_name'),
+    ]
+
+    operations = [
+        # nullable first, so unapplying can re-add the column before copying back
+        migrations.AlterField(
+            model_name='jobposting',
+            name='jd_raw',
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='jd_raw_z',
+            field=utils.compressed_text.CompressedTextField(null=True),
+        ),
+        migrations.RunPython(copy("jd_raw", "jd_raw_z"), copy("jd_raw_z", "jd_raw")),
+        migrations.RemoveField(
+            model_name='jobposting',
+            name='jd_raw',
+        ),
+        migrations.RenameField(
+            model_name='jobposting',
+            old_name='jd_raw_z',
+            new_name='jd_raw',
+        ),
+        migrations.AlterField(
+            model_name='jobposting',
+            name='jd_raw',
+            field=utils.compressed_text.CompressedTextField(),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-19 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='reminded_for',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(condition=models.Q(('next_action_due__isnull', False)), fields=['next_action_due', 'reminded_for'], name='app_due_reminded_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-19 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_reminders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobposting',
+            name='jd_sections',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -1,10 +1,12 @@
 from django.db import models
 from django.contrib.auth.models import User
+from utils.compressed_text import CompressedTextField
 
 class Company(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="companies" )
     name = models.CharField(max_length=200)
     website = models.URLField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     def __str__(self): return self.name
 
     class Meta:
@@ -19,9 +21,11 @@ class JobPosting(models.Model):
     location = models.CharField(max_length=200, blank=True)
     seniority = models.CharField(max_length=50, blank=True)
     url = models.URLField(blank=True)
-    jd_raw = models.TextField()
+    jd_raw = CompressedTextField()
     jd_struct = models.JSONField(default=dict)
+    jd_sections = models.JSONField(default=dict, blank=True)   # per-section fingerprints of jd_raw (ai/incremental.py)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     def __str__(self): return f"{self.title} @ {self.company.name}"
 
 class Application(models.Model):
@@ -35,4 +39,13 @@ class Application(models.Model):
     next_action = models.CharField(max_length=200, blank=True)
     next_action_due = models.DateField(blank=True, null=True)
     notes = models.TextField(blank=True)
+    reminded_for = models.DateField(blank=True, null=True)   # next_action_due a reminder went out for (jobs/reminders.py)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     def __str__(self): return f"{self.job} - {self.stage}"
+
+    class Meta:
+        indexes = [
+            # reminder scans: due-date range, rows without a due date left out
+            models.Index(fields=["next_action_due", "reminded_for"], name="app_due_reminded_idx",
+                         condition=models.Q(next_action_due__isnull=False)),
+        ]
@@ -0,0 +1,240 @@
+# backend/jobs/portability.py
+import base64
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.utils import encoders
+from docs_app.models import Resume, GeneratedDoc
+from utils import fast_json
+from .models import Company, JobPosting, Application
+
+# Export/import of everything a user owns as NDJSON, one object per line:
+#   {"type": "meta", "format": "applymate-export", "version": 1, "exported_at": ...}
+#   {"type": "companies", "id": 3, "name": ..., "website": ...}
+#   {"type": "jobs", "id": 7, "company": 3, ...}
+#   ...
+# Types come parents first (companies, resumes, jobs, applications, docs),
+# so an importer sees every referenced id before it's used. Export reads
+# each table with values().iterator(chunk_size), and files (resume uploads,
+# generated DOCX) are inlined as base64 per row, so nothing is held beyond
+# one chunk. Import reads the request body line by line, buffers up to
+# IMPORT_BATCH_SIZE rows of one kind, bulk_creates them and maps old ids to
+# new ones for the children. The id maps are the only state that grows
+# with the dataset. Companies are matched by name to the user's existing
+# ones, since names are unique per user. Rows whose parent is missing are
+# skipped and counted. The whole import is one transaction.
+
+FORMAT, VERSION = "applymate-export", 1
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+class _Kind:
+    def __init__(self, key: str, model, owner: str, fields: List[str], fks: Optional[Dict[str, str]] = None,
+                 file_field: Optional[str] = None):
+        self.key = key
+        self.model = model
+        self.owner = owner   # lookup to the owning user's id
+        self.fields = fields   # plain columns, exported as-is
+        self.fks = fks or {}   # column -> kind it points at
+        self.file_field = file_field
+
+
+KINDS = [
+    _Kind("companies", Company, "user_id", ["name", "website"]),
+    _Kind("resumes", Resume, "user_id", ["label", "parsed_text", "created_at"], file_field="file"),
+    _Kind("jobs", JobPosting, "user_id", ["title", "location", "seniority", "url", "jd_raw", "jd_struct", "created_at"],
+          fks={"company": "companies"}),
+    _Kind("applications", Application, "job__user_id",
+          ["stage", "applied_at", "next_action", "next_action_due", "notes"], fks={"job": "jobs"}),
+    _Kind("docs", GeneratedDoc, "user_id", ["kind", "content_md", "created_at"], fks={"job": "jobs"},
+          file_field="file"),
+]
+BY_KEY = {k.key: k for k in KINDS}
+
+_encoder = encoders.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _line(obj: Dict[str, Any]) -> bytes:
+    if fast_json.orjson is not None:
+        return fast_json.dumps(obj) + b"\n"
+    return _encoder.encode(obj).encode("utf-8") + b"\n"
+
+
+def _loads(line: bytes) -> Any:
+    if fast_json.orjson is not None:
+        return fast_json.orjson.loads(line)
+    return json.loads(line)
+
+
+def _chunk_size() -> int:
+    return int(getattr(settings, "EXPORT_CHUNK_SIZE", 500))
+
+
+def _batch_size() -> int:
+    return int(getattr(settings, "IMPORT_BATCH_SIZE", 500))
+
+
+def _file_payload(name: str) -> Optional[Dict[str, str]]:
+    if not name:
+        return None
+    try:
+        with default_storage.open(name, "rb") as fh:
+            data = fh.read()
+    except (OSError, ValueError):
+        return None   # the row outlived its file; export the rest of it
+    return {"name": os.path.basename(name), "data": base64.b64encode(data).decode("ascii")}
+
+
+def export_lines(user, files: bool = True) -> Iterator[bytes]:
+    yield _line({"type": "meta", "format": FORMAT, "version": VERSION, "exported_at": timezone.now()})
+    for kind in KINDS:
+        columns = ["id", *kind.fields, *(f"{fk}_id" for fk in kind.fks)]
+        if kind.file_field and files:
+            columns.append(kind.file_field)
+        unpack = {f: kind.model._meta.get_field(f).unpack for f in kind.fields
+                  if hasattr(kind.model._meta.get_field(f), "unpack")}
+        qs = kind.model.objects.filter(**{kind.owner: user.id}).order_by("id").values(*columns)
+        for row in qs.iterator(chunk_size=_chunk_size()):
+            out = {"type": kind.key, "id": row["id"]}
+            for f in kind.fields:
+                value = row[f]
+                out[f] = unpack[f](value) if f in unpack and value is not None else value
+            for fk in kind.fks:
+                out[fk] = row[f"{fk}_id"]
+            if kind.file_field and files:
+                out[kind.file_field] = _file_payload(row[kind.file_field])
+            yield _line(out)
+
+
+def _read_lines(stream) -> Iterator[Dict[str, Any]]:
+    for n, raw in enumerate(stream or (), start=1):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            obj = _loads(raw)
+        except ValueError:
+            raise ImportFormatError(f"line {n}: not JSON")
+        if not isinstance(obj, dict) or not isinstance(obj.get("type"), str):
+            raise ImportFormatError(f"line {n}: expected an object with a \"type\"")
+        yield obj
+
+
+class _Importer:
+    def __init__(self, user):
+        self.user = user
+        self.ids: Dict[str, Dict[int, int]] = {k.key: {} for k in KINDS}
+        self.imported = {k.key: 0 for k in KINDS}
+        self.skipped = {k.key: 0 for k in KINDS}
+        self.saved_files: List[str] = []   # removed again if the import fails
+
+    def _build(self, kind: _Kind, row: Dict[str, Any]):
+        values = {}
+        for fk, target in kind.fks.items():
+            new_id = self.ids[target].get(row.get(fk))
+            if new_id is None:
+                return None
+            values[f"{fk}_id"] = new_id
+        for f in kind.fields:
+            if f in row:
+                try:
+                    values[f] = kind.model._meta.get_field(f).to_python(row[f])
+                except ValidationError as exc:
+                    raise ImportFormatError(f"{kind.key} {row.get('id')}: {f}: {' '.join(exc.messages)}")
+        if kind.owner == "user_id":
+            values["user_id"] = self.user.id
+        payload = row.get(kind.file_field) if kind.file_field else None
+        if payload:
+            try:
+                data = base64.b64decode(payload["data"], validate=True)
+                name = os.path.basename(payload["name"])
+            except (KeyError, TypeError, ValueError):
+                raise ImportFormatError(f"{kind.key} {row.get('id')}: bad file payload")
+            # saved here rather than by FileField.pre_save inside bulk_create,
+            # so each stored name is on record before anything else can fail
+            field = kind.model._meta.get_field(kind.file_field)
+            values[kind.file_field] = field.storage.save(field.generate_filename(None, name), ContentFile(data))
+            self.saved_files.append(values[kind.file_field])
+        return kind.model(**values)
+
+    def _companies(self, rows: List[Dict[str, Any]]) -> None:
+        existing = dict(Company.objects.filter(user=self.user, name__in={r.get("name") for r in rows})
+                        .values_list("name", "id"))
+        new: Dict[str, Company] = {}
+        for r in rows:
+            name = r.get("name")
+            if not name:
+                self.skipped["companies"] += 1
+            elif name not in existing and name not in new:
+                new[name] = self._build(BY_KEY["companies"], r)
+        Company.objects.bulk_create(new.values())
+        self.imported["companies"] += len(new)
+        for r in rows:
+            name = r.get("name")
+            if name:
+                self.ids["companies"][r.get("id")] = existing[name] if name in existing else new[name].pk
+
+    def flush(self, kind: _Kind, rows: List[Dict[str, Any]]) -> None:
+        if kind.key == "companies":
+            return self._companies(rows)
+        objs, olds, created = [], [], []
+        for r in rows:
+            obj = self._build(kind, r)
+            if obj is None:
+                self.skipped[kind.key] += 1
+                continue
+            objs.append(obj)
+            olds.append(r.get("id"))
+            created.append(getattr(obj, "created_at", None))
+        kind.model.objects.bulk_create(objs)
+        # auto_now_add replaced created_at on insert; put the exported values back
+        restore = [o for o, c in zip(objs, created) if c is not None]
+        for o, c in zip(objs, created):
+            if c is not None:
+                o.created_at = c
+        if restore:
+            kind.model.objects.bulk_update(restore, ["created_at"])
+        for old, obj in zip(olds, objs):
+            self.ids[kind.key][old] = obj.pk
+        self.imported[kind.key] += len(objs)
+
+    def run(self, lines: Iterable[Dict[str, Any]]) -> None:
+        lines = iter(lines)
+        meta = next(lines, None)
+        if not meta or meta.get("type") != "meta" or meta.get("format") != FORMAT:
+            raise ImportFormatError("not an applymate export (first line must be the meta record)")
+        if meta.get("version") != VERSION:
+            raise ImportFormatError(f"unsupported export version {meta.get('version')!r}")
+        current, rows = None, []
+        for obj in lines:
+            kind = BY_KEY.get(obj["type"])
+            if kind is None:
+                raise ImportFormatError(f"unknown type {obj['type']!r}")
+            if rows and (kind is not current or len(rows) >= _batch_size()):
+                self.flush(current, rows)
+                rows = []
+            current = kind
+            rows.append(obj)
+        if rows:
+            self.flush(current, rows)
+
+
+def import_lines(user, stream) -> Dict[str, Any]:
+    importer = _Importer(user)
+    try:
+        with transaction.atomic():
+            importer.run(_read_lines(stream))
+    except Exception:
+        for name in importer.saved_files:   # written to storage, but their rows were rolled back
+            default_storage.delete(name)
+        raise
+    return {"imported": importer.imported, "skipped": importer.skipped}
@@ -0,0 +1,123 @@
+# backend/jobs/reminders.py
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Application
+
+logger = logging.getLogger(__name__)
+
+# Deadline reminders for Application.next_action / next_action_due, sent as
+# one digest email per user. An application is due when its date falls in
+# [today - REMINDER_LOOKBACK_DAYS, today + REMINDER_LEAD_DAYS] and
+# reminded_for (the due date a reminder already went out for) isn't that
+# date. Moving the due date therefore re-arms the reminder. The range scan
+# uses app_due_reminded_idx, so a run reads only rows near today, however
+# many old ones exist.
+#
+# Runs go user by user in batches of REMINDER_BATCH_SIZE users: one query
+# for the next user ids, one for their due rows, one send_messages() on a
+# single mail connection, then one bulk_update to mark those rows. Nothing
+# stays open while writing, and an interrupted run just resumes with
+# whatever is still unmarked. If send_messages() fails (SMTP or socket
+# error), the batch's rows with an address stay unmarked for the next run
+# and the run goes on with the next batch; a digest that did go out before
+# the error may then be sent twice. Mail goes through Django's EMAIL_BACKEND
+# (console by default; file/smtp/locmem via settings).
+
+SKIP_STAGES = ("rejected",)
+
+
+def _setting(name: str, default: int) -> int:
+    return int(getattr(settings, name, default))
+
+
+def due_queryset(today: Optional[date] = None):
+    today = today or timezone.localdate()
+    lo = today - timedelta(days=_setting("REMINDER_LOOKBACK_DAYS", 14))
+    hi = today + timedelta(days=_setting("REMINDER_LEAD_DAYS", 1))
+    return (Application.objects
+            .filter(next_action_due__range=(lo, hi))
+            .filter(Q(reminded_for__isnull=True) | ~Q(reminded_for=F("next_action_due")))
+            .exclude(stage__in=SKIP_STAGES))
+
+
+def _user_batches(qs, size: int) -> Iterator[List[int]]:
+    last = 0
+    while True:
+        ids = list(qs.filter(job__user_id__gt=last).order_by("job__user_id")
+                   .values_list("job__user_id", flat=True).distinct()[:size])
+        if not ids:
+            return
+        yield ids
+        last = ids[-1]
+
+
+def _when(due: date, today: date) -> str:
+    days = (due - today).days
+    if days < 0:
+        return f"overdue by {-days} day{'s' if days < -1 else ''}"
+    return {0: "due today", 1: "due tomorrow"}.get(days, f"due in {days} days")
+
+
+def render_digest(username: str, items: List[Dict[str, Any]], today: date) -> Tuple[str, str]:
+    n = len(items)
+    subject = f"ApplyMate: {n} follow-up{'s' if n != 1 else ''} {'are' if n != 1 else 'is'} due"
+    lines = [f"Hi {username},", "", "These applications have a next step coming up or overdue:", ""]
+    for it in items:
+        action = it["next_action"] or "Next step"
+        where = f"{it['title']} @ {it['company']}" if it["company"] else it["title"]
+        lines.append(f"- {action}: {where} ({_when(it['due'], today)}, {it['due']:%b %d})")
+    return subject, "\n".join(lines) + "\n"
+
+
+def run(today: Optional[date] = None, dry_run: bool = False, log=None) -> Dict[str, int]:
+    today = today or timezone.localdate()
+    qs = due_queryset(today)
+    stats = {"users": 0, "sent": 0, "items": 0, "no_email": 0, "failed": 0}
+    columns = ("id", "next_action", "next_action_due", "job__title", "job__company__name",
+               "job__user_id", "job__user__username", "job__user__email")
+    connection = None if dry_run else get_connection()
+    for user_ids in _user_batches(qs, _setting("REMINDER_BATCH_SIZE", 200)):
+        digests: Dict[int, Dict[str, Any]] = {}
+        rows = (qs.filter(job__user_id__in=user_ids).order_by("job__user_id", "next_action_due", "id")
+                .values_list(*columns))
+        for app_id, action, due, title, company, uid, username, email in rows:
+            d = digests.setdefault(uid, {"username": username, "email": email, "items": []})
+            d["items"].append({"id": app_id, "next_action": action, "due": due, "title": title, "company": company})
+
+        messages, marks, sent_marks = [], [], []
+        for d in digests.values():
+            stats["users"] += 1
+            stats["items"] += len(d["items"])
+            apps = [Application(id=it["id"], reminded_for=it["due"]) for it in d["items"]]
+            if not d["email"]:
+                stats["no_email"] += 1
+                marks += apps   # marked even without an address, or they'd be re-read every run
+                continue
+            sent_marks += apps
+            subject, body = render_digest(d["username"], d["items"], today)
+            if log:
+                log(f"{d['email']}: {subject}" + (f"\n{body}" if dry_run else ""))
+            messages.append(EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [d["email"]]))
+        if dry_run:
+            stats["sent"] += len(messages)
+            continue
+        if messages:
+            try:
+                stats["sent"] += connection.send_messages(messages) or 0
+                marks += sent_marks
+            except Exception as e:
+                stats["failed"] += len(messages)
+                logger.warning("reminder batch of %d digest(s) failed, left for the next run: %s: %s",
+                               len(messages), e.__class__.__name__, e)
+                try:   # the next batch reconnects
+                    connection.close()
+                except Exception:
+                    pass
+        # bulk_update, not save(): no signals, and updated_at stays as it was (reminded_for isn't synced)
+        Application.objects.bulk_update(marks, ["reminded_for"])
+    return stats
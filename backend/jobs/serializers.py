@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Company, JobPosting, Application
 from docs_app.models import Resume, GeneratedDoc
+from utils.values_serializer import ValuesListSerializer
 
 class CompanySerializer(serializers.ModelSerializer):
     class Meta:
@@ -43,3 +44,20 @@ class GeneratedDocSerializer(serializers.ModelSerializer):
     class Meta:
         model = GeneratedDoc
         fields = ['id','job','kind','content_md','file','created_at']
+
+
+# Read-only list variants: same output as `X(qs, many=True).data`, from values_list()
+class JobPostingListSerializer(ValuesListSerializer):
+    serializer_class = JobPostingSerializer
+
+class ApplicationListSerializer(ValuesListSerializer):
+    serializer_class = ApplicationSerializer
+
+class ResumeListSerializer(ValuesListSerializer):
+    serializer_class = ResumeSerializer
+
+class CompanyListSerializer(ValuesListSerializer):
+    serializer_class = CompanySerializer
+
+class GeneratedDocListSerializer(ValuesListSerializer):
+    serializer_class = GeneratedDocSerializer
@@ -0,0 +1,15 @@
+# backend/jobs/signals.py
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from docs_app.models import Resume, GeneratedDoc
+from . import sync
+from .models import Company, JobPosting, Application
+
+
+@receiver(post_delete, sender=Company)
+@receiver(post_delete, sender=JobPosting)
+@receiver(post_delete, sender=Application)
+@receiver(post_delete, sender=Resume)
+@receiver(post_delete, sender=GeneratedDoc)
+def record_tombstone(sender, instance, **kwargs):
+    sync.record_tombstone(sender, instance)
@@ -0,0 +1,119 @@
+# backend/jobs/sync.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.utils import timezone
+from docs_app.models import Resume, GeneratedDoc
+from .models import Company, JobPosting, Application
+from .serializers import (CompanyListSerializer, JobPostingListSerializer, ApplicationListSerializer,
+                          ResumeListSerializer, GeneratedDocListSerializer)
+
+# Delta sync for GET /api/changes/?since=<cursor>. Every synced model has an
+# auto_now `updated_at`; deletes leave a core.Tombstone (jobs/signals.py).
+# The cursor is the server time at the start of the previous call, in
+# microseconds. Rows are matched from SYNC_OVERLAP_SECONDS before it, so a
+# write whose transaction committed just after that call isn't missed; the
+# overlap means a few rows can arrive twice, and clients upsert by id.
+# A missing cursor, or one older than TOMBSTONE_RETENTION_DAYS, gets a
+# full snapshot with reset=true.
+
+# key -> (model, list serializer, owner lookup)
+SYNC_MODELS = {
+    "companies": (Company, CompanyListSerializer, "user_id"),
+    "jobs": (JobPosting, JobPostingListSerializer, "user_id"),
+    "applications": (Application, ApplicationListSerializer, "job__user_id"),
+    "resumes": (Resume, ResumeListSerializer, "user_id"),
+    "docs": (GeneratedDoc, GeneratedDocListSerializer, "user_id"),
+}
+
+
+# (owner user id or None, pending Tombstone rows) while batched_tombstones() is active
+_batch: ContextVar[Optional[Tuple[Optional[int], List[Any]]]] = ContextVar("tombstone_batch", default=None)
+
+
+class BadCursor(ValueError):
+    pass
+
+
+def encode_cursor(when: datetime) -> str:
+    return str(int(when.timestamp() * 1_000_000))
+
+
+def decode_cursor(cursor: str) -> datetime:
+    try:
+        return datetime.fromtimestamp(int(cursor) / 1_000_000, tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise BadCursor(cursor)
+
+
+def kind_of(model) -> Optional[str]:
+    for kind, (m, _, _) in SYNC_MODELS.items():
+        if m is model:
+            return kind
+    return None
+
+
+def owner_id(instance) -> Optional[int]:
+    if isinstance(instance, Application):
+        try:
+            return instance.job.user_id
+        except JobPosting.DoesNotExist:
+            return None
+    return getattr(instance, "user_id", None)
+
+
+@contextmanager
+def batched_tombstones(user_id: Optional[int] = None):
+    """Collect the tombstones of deletes inside the block and insert them with
+    one bulk_create on the way out. Pass user_id when everything deleted in
+    the block (cascades included) belongs to that user, so the owner isn't
+    looked up per row."""
+    from core.models import Tombstone
+    rows: List[Any] = []
+    token = _batch.set((user_id, rows))
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+    Tombstone.objects.bulk_create(rows)
+
+
+def record_tombstone(model, instance) -> None:
+    from core.models import Tombstone
+    batch = _batch.get()
+    user_id = batch[0] if batch is not None and batch[0] is not None else owner_id(instance)
+    if user_id is None:
+        return
+    row = Tombstone(user_id=user_id, kind=kind_of(model), object_id=instance.pk)
+    if batch is not None:
+        batch[1].append(row)
+    else:
+        row.save()
+
+
+def changes(user, since: Optional[str], full: bool = False) -> Dict[str, Any]:
+    from core.models import Tombstone
+    now = timezone.now()
+    retention = timedelta(days=int(getattr(settings, "TOMBSTONE_RETENTION_DAYS", 30)))
+    lower = None
+    if since:
+        lower = decode_cursor(since) - timedelta(seconds=float(getattr(settings, "SYNC_OVERLAP_SECONDS", 5)))
+        if lower < now - retention:
+            lower = None
+    out: Dict[str, Any] = {"cursor": encode_cursor(now), "reset": lower is None}
+    for kind, (model, list_serializer, owner) in SYNC_MODELS.items():
+        qs = model.objects.filter(**{owner: user.id})
+        if lower is not None:
+            qs = qs.filter(updated_at__gte=lower)
+        out[kind] = list_serializer(qs.order_by("id"), full=full).data
+
+    deleted: Dict[str, list] = {kind: [] for kind in SYNC_MODELS}
+    if lower is not None:
+        rows = Tombstone.objects.filter(user_id=user.id, deleted_at__gte=lower).values_list("kind", "object_id")
+        for kind, object_id in rows:
+            if kind in deleted:
+                deleted[kind].append(object_id)
+    out["deleted"] = deleted
+    return out
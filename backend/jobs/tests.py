@@ -0,0 +1,452 @@
+# backend/jobs/tests.py
+import io, os, shutil, smtplib, tempfile
+from datetime import date
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.mail.backends import locmem
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models.sql.compiler import SQLInsertCompiler
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from ai import chain
+from ai import provider as ai_provider
+from docs_app.models import GeneratedDoc, Resume
+from utils import compressed_text
+from . import portability, reminders, sync
+from .models import Application, Company, JobPosting
+
+JD = """Backend Engineer at acme.io
+We build payment APIs.
+Requirements:
+- 3+ years Python experience required
+- Must know PostgreSQL and Redis well enough to tune
+Preferred:
+- Kubernetes experience is a plus for this role
+"""
+
+
+@override_settings(AI_PROVIDER="heuristic")
+class IncrementalReextractTests(TestCase):
+    def setUp(self):
+        chain.reset_chain()
+        self.addCleanup(chain.reset_chain)
+        self.user = User.objects.create_user("u", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        company = Company.objects.create(user=self.user, name="Acme")
+        self.job = JobPosting.objects.create(user=self.user, company=company, title="Backend Engineer",
+                                             jd_raw=JD, jd_struct={})
+
+    def patch(self, jd_raw):
+        r = self.client.patch(f"/api/jobs/{self.job.pk}/", {"jd_raw": jd_raw}, format="json")
+        self.assertEqual(r.status_code, 200)
+        return r.json()["jd_struct"]
+
+    def test_patch_without_prior_index_scans_unchanged_sections(self):
+        new = JD.replace("Kubernetes experience", "Terraform experience")
+        data = self.patch(new)
+        self.assertIn("3+ years Python experience required", data["must_haves"])
+        self.assertIn("Must know PostgreSQL and Redis well enough to tune", data["must_haves"])
+        self.assertEqual(data["nice_to_haves"], ["Terraform experience is a plus for this role"])
+        self.job.refresh_from_db()
+        self.assertEqual(len(self.job.jd_sections["sections"]), 3)
+
+    def test_removed_section_drops_its_items(self):
+        self.patch(JD.replace("Kubernetes experience", "Terraform experience"))
+        data = self.patch(JD.split("Preferred:")[0])
+        self.assertEqual(data["nice_to_haves"], [])
+        self.assertIn("3+ years Python experience required", data["must_haves"])
+
+
+@override_settings(AI_PROVIDER="heuristic", FIT_CACHE_TTL=60)
+class FitCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("u", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        company = Company.objects.create(user=self.user, name="Acme")
+        self.job = JobPosting.objects.create(user=self.user, company=company, title="Backend Engineer", jd_raw=JD,
+                                             jd_struct={"must_haves": ["python"], "skills": ["python"]})
+        self.resume = Resume.objects.create(user=self.user, file="resumes/r.pdf", parsed_text="Python, Django")
+
+    def score(self):
+        r = self.client.post("/api/fit/score/", {"job_id": self.job.pk, "resume_id": self.resume.pk}, format="json")
+        self.assertEqual(r.status_code, 200)
+        return r.json()
+
+    def test_repeat_is_served_from_cache(self):
+        with mock.patch.object(ai_provider, "suggest_resume_patches", wraps=ai_provider.suggest_resume_patches) as advice:
+            self.assertEqual(self.score(), self.score())
+        self.assertEqual(advice.call_count, 1)
+
+    def test_edit_elsewhere_retires_the_entry(self):
+        self.assertEqual(self.score()["gaps"], [])
+        # as another worker would: a DB write with no signal reaching this process
+        JobPosting.objects.filter(pk=self.job.pk).update(
+            jd_struct={"must_haves": ["python", "kafka"]}, updated_at=timezone.now())
+        self.assertEqual(self.score()["gaps"], ["kafka"])
+        Resume.objects.filter(pk=self.resume.pk).update(parsed_text="Python, Kafka", updated_at=timezone.now())
+        self.assertEqual(self.score()["gaps"], [])
+
+
+@override_settings(REMINDER_BATCH_SIZE=2)   # the test runner already uses the locmem mail backend
+class ReminderTests(TestCase):
+    today = date(2026, 3, 10)
+
+    def setUp(self):
+        self.apps = []
+        for name, email, dues in (("ann", "ann@example.com", [9, 11]), ("bob", "bob@example.com", [10]),
+                                  ("cy", "", [10]), ("di", "di@example.com", [10])):
+            user = User.objects.create_user(name, email=email, password="pw")
+            company = Company.objects.create(user=user, name="Acme")
+            job = JobPosting.objects.create(user=user, company=company, title="Engineer", jd_raw="x")
+            for day in dues:
+                self.apps.append(Application.objects.create(job=job, next_action="Follow up",
+                                                            next_action_due=date(2026, 3, day)))
+
+    def test_one_digest_per_user_and_each_due_date_once(self):
+        stats = reminders.run(today=self.today)
+        self.assertEqual(stats, {"users": 4, "sent": 3, "items": 5, "no_email": 1, "failed": 0})
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["ann@example.com", "bob@example.com", "di@example.com"])
+        ann = next(m for m in mail.outbox if m.to == ["ann@example.com"])
+        self.assertIn("overdue by 1 day", ann.body)
+        self.assertIn("due tomorrow", ann.body)
+        self.assertFalse(reminders.due_queryset(self.today).exists())
+        self.assertEqual(reminders.run(today=self.today)["sent"], 0)
+
+    def test_failed_batch_stays_unmarked_and_is_retried(self):
+        send = locmem.EmailBackend.send_messages
+        calls = []
+
+        def flaky(backend, messages):
+            calls.append(len(messages))
+            if len(calls) == 1:
+                raise smtplib.SMTPServerDisconnected("connection lost")
+            return send(backend, messages)
+
+        with mock.patch.object(locmem.EmailBackend, "send_messages", flaky):
+            stats = reminders.run(today=self.today)
+        self.assertEqual(stats["failed"], 2)   # ann and bob share the first batch
+        self.assertEqual([m.to for m in mail.outbox], [["di@example.com"]])
+        left = set(reminders.due_queryset(self.today).values_list("job__user__username", flat=True))
+        self.assertEqual(left, {"ann", "bob"})
+        self.assertEqual(reminders.run(today=self.today)["sent"], 2)
+
+    def test_date_and_loop_are_rejected_together(self):
+        with self.assertRaises(CommandError):
+            call_command("send_reminders", "--date", "2026-03-10", "--loop", "60")
+
+
+class PortabilityTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        media = override_settings(MEDIA_ROOT=self.media)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.owner = User.objects.create_user("owner", password="pw")
+        self.other = User.objects.create_user("other", password="pw")
+        company = Company.objects.create(user=self.owner, name="Acme")
+        job = JobPosting.objects.create(user=self.owner, company=company, title="Engineer", jd_raw=JD,
+                                        jd_struct={"skills": ["Python"]})
+        Application.objects.create(job=job, stage="applied", notes="café ☕", next_action_due=date(2026, 3, 1))
+        resume = Resume(user=self.owner, label="Base", parsed_text="Python\u2028Django")
+        resume.file.save("cv.pdf", ContentFile(b"%PDF-1.4 resume bytes"), save=True)
+        GeneratedDoc.objects.create(user=self.owner, job=job, kind="coverletter", content_md="# Dear Acme")
+
+    def export(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        r = client.get("/api/export/")
+        self.assertEqual(r.status_code, 200)
+        return b"".join(r.streaming_content)
+
+    def stored_files(self):
+        return sorted(f for _, _, files in os.walk(self.media) for f in files)
+
+    def test_round_trip_into_another_account(self):
+        body = self.export(self.owner)
+        client = APIClient()
+        client.force_authenticate(self.other)
+        r = client.post("/api/import/", body, content_type="application/x-ndjson")
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual(r.json()["imported"], {"companies": 1, "resumes": 1, "jobs": 1, "applications": 1, "docs": 1})
+        app = Application.objects.get(job__user=self.other)
+        self.assertEqual((app.stage, app.notes, app.job.company.name), ("applied", "café ☕", "Acme"))
+        self.assertEqual(app.job.jd_struct, {"skills": ["Python"]})
+        resume = Resume.objects.get(user=self.other)
+        self.assertEqual(resume.parsed_text, "Python\u2028Django")
+        with resume.file.open("rb") as fh:
+            self.assertEqual(fh.read(), b"%PDF-1.4 resume bytes")
+        self.assertEqual(Resume.objects.get(user=self.other).created_at, Resume.objects.get(user=self.owner).created_at)
+        # and what was imported exports the same way, ids and stored file names aside
+        def strip(body):
+            rows = [portability._loads(ln) for ln in body.splitlines()]
+            return [{k: (v["data"] if k == "file" and v else v) for k, v in row.items()
+                     if k not in ("id", "exported_at", "job", "company")} for row in rows]
+        self.assertEqual(strip(self.export(self.other)), strip(body))
+
+    def test_failed_import_removes_the_files_it_wrote(self):
+        body = self.export(self.owner)
+        before = self.stored_files()
+        insert = SQLInsertCompiler.execute_sql
+
+        def fail_resumes(compiler, *args, **kwargs):
+            if compiler.query.model is Resume:
+                compiler.as_sql()   # FileField.pre_save runs here, as in a real insert
+                raise IntegrityError("boom")
+            return insert(compiler, *args, **kwargs)
+
+        with mock.patch.object(SQLInsertCompiler, "execute_sql", fail_resumes):
+            with self.assertRaises(IntegrityError):
+                portability.import_lines(self.other, io.BytesIO(body))
+        self.assertEqual(self.stored_files(), before)
+        self.assertFalse(Company.objects.filter(user=self.other).exists())
+
+    def test_bad_file_is_rejected(self):
+        client = APIClient()
+        client.force_authenticate(self.other)
+        lines = [ln for ln in self.export(self.owner).splitlines() if b'"type":"resumes"' in ln or b'"type":"meta"' in ln]
+        lines[-1] = lines[-1].replace(b'"data":"', b'"data":"!!')
+        r = client.post("/api/import/", b"\n".join(lines), content_type="application/x-ndjson")
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("bad file payload", r.json()["detail"])
+
+
+class CompressedTextFieldTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("u", password="pw")
+        self.company = Company.objects.create(user=self.user, name="Acme")
+
+    def stored(self, job):
+        with connection.cursor() as cur:
+            cur.execute(f"SELECT jd_raw FROM {JobPosting._meta.db_table} WHERE id = %s", [job.pk])
+            return bytes(cur.fetchone()[0])
+
+    def make(self, text):
+        return JobPosting.objects.create(user=self.user, company=self.company, title="Engineer", jd_raw=text)
+
+    def test_round_trip(self):
+        long_text = JD * 20 + "naïve café — C:\\path\\to\\x \u2028 end"
+        job = self.make(long_text)
+        self.assertTrue(self.stored(job).startswith(compressed_text.ZLIB))
+        self.assertLess(len(self.stored(job)), len(long_text.encode("utf-8")))
+        self.assertEqual(JobPosting.objects.get(pk=job.pk).jd_raw, long_text)
+
+        short = self.make("Go, \\d+ and ünïcode")
+        self.assertEqual(self.stored(short), compressed_text.RAW + "Go, \\d+ and ünïcode".encode("utf-8"))
+        self.assertEqual(JobPosting.objects.get(pk=short.pk).jd_raw, "Go, \\d+ and ünïcode")
+
+    def test_values_list_returns_packed(self):
+        job = self.make(JD)
+        value = JobPosting.objects.filter(pk=job.pk).values_list("jd_raw", flat=True).get()
+        self.assertIsInstance(value, compressed_text.Packed)
+        self.assertEqual(str(value), JD)
+        self.assertEqual(JobPosting._meta.get_field("jd_raw").unpack(value), JD)
+
+    def test_untouched_save_keeps_the_stored_bytes(self):
+        job = self.make(JD * 20)
+        before = self.stored(job)
+        loaded = JobPosting.objects.get(pk=job.pk)
+        loaded.title = "Staff Engineer"
+        with mock.patch.object(compressed_text, "compress") as compress:
+            loaded.save()
+        compress.assert_not_called()
+        self.assertEqual(self.stored(job), before)
+
+    def test_reads_legacy_plain_text(self):
+        job = self.make("x")
+        with connection.cursor() as cur:
+            cur.execute(f"UPDATE {JobPosting._meta.db_table} SET jd_raw = %s WHERE id = %s",
+                        [connection.Database.Binary("legacy café".encode("utf-8")), job.pk])
+        self.assertEqual(JobPosting.objects.get(pk=job.pk).jd_raw, "legacy café")
+
+
+class CompressJdRawMigrationTests(TransactionTestCase):
+    before = [("jobs", "0004_company_uniq_company_user_name")]
+    after = [("jobs", "0005_compress_jd_raw")]
+    text = "Requirements:\n- C:\\tools and \\n escapes\n- ünïcode\n" * 30
+
+    def setUp(self):
+        self.executor = MigrationExecutor(connection)
+        self.addCleanup(self.restore)
+        self.migrate(self.before)
+
+    def restore(self):
+        self.migrate(self.executor.loader.graph.leaf_nodes())
+
+    def migrate(self, targets):
+        self.executor.loader.build_graph()
+        self.executor.migrate(targets)
+        return self.executor.loader.project_state(targets).apps
+
+    def test_forward_and_back(self):
+        apps = self.executor.loader.project_state(self.before).apps
+        user = apps.get_model("auth", "User").objects.create(username="m")
+        company = apps.get_model("jobs", "Company").objects.create(user_id=user.pk, name="Acme")
+        job = apps.get_model("jobs", "JobPosting").objects.create(
+            user_id=user.pk, company_id=company.pk, title="Engineer", jd_raw=self.text)
+
+        apps = self.migrate(self.after)
+        value = apps.get_model("jobs", "JobPosting").objects.get(pk=job.pk).jd_raw
+        self.assertEqual(str(value), self.text)
+
+        apps = self.migrate(self.before)
+        self.assertEqual(apps.get_model("jobs", "JobPosting").objects.get(pk=job.pk).jd_raw, self.text)
+
+
+class SyncTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("u", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.company = Company.objects.create(user=self.user, name="Acme")
+        self.job = JobPosting.objects.create(user=self.user, company=self.company, title="Engineer", jd_raw=JD)
+        self.app = Application.objects.create(job=self.job)
+        other = User.objects.create_user("o", password="pw")
+        Company.objects.create(user=other, name="Elsewhere")
+        self.age(Company, JobPosting, Application, hours=1)
+
+    def age(self, *models, **delta):
+        for model in models:
+            model.objects.update(updated_at=timezone.now() - timezone.timedelta(**delta))
+
+    def get(self, since=None):
+        r = self.client.get("/api/changes/", {"since": since} if since else {})
+        self.assertEqual(r.status_code, 200)
+        return r.json()
+
+    def ids(self, rows):
+        return [row["id"] for row in rows]
+
+    def test_first_call_is_a_full_snapshot(self):
+        data = self.get()
+        self.assertTrue(data["reset"])
+        self.assertEqual(self.ids(data["companies"]), [self.company.pk])
+        self.assertEqual(self.ids(data["jobs"]), [self.job.pk])
+        self.assertEqual(self.ids(data["applications"]), [self.app.pk])
+        self.assertEqual(data["deleted"]["jobs"], [])
+
+    @override_settings(SYNC_OVERLAP_SECONDS=0)
+    def test_delta_after_cursor_with_tombstones(self):
+        cursor = self.get()["cursor"]
+        added = Company.objects.create(user=self.user, name="Globex")
+        job_id, app_id = self.job.pk, self.app.pk
+        self.job.delete()   # cascades to the application
+
+        data = self.get(cursor)
+        self.assertFalse(data["reset"])
+        self.assertEqual(self.ids(data["companies"]), [added.pk])
+        self.assertEqual(data["jobs"], [])
+        self.assertEqual(data["deleted"]["jobs"], [job_id])
+        self.assertEqual(data["deleted"]["applications"], [app_id])
+
+        self.assertEqual(self.get(data["cursor"])["deleted"]["jobs"], [])
+
+    @override_settings(SYNC_OVERLAP_SECONDS=5)
+    def test_rows_just_before_the_cursor_are_resent(self):
+        cursor = self.get()["cursor"]
+        JobPosting.objects.update(updated_at=sync.decode_cursor(cursor) - timezone.timedelta(seconds=2))
+        self.assertEqual(self.ids(self.get(cursor)["jobs"]), [self.job.pk])
+
+    @override_settings(TOMBSTONE_RETENTION_DAYS=30)
+    def test_old_cursor_gets_a_reset(self):
+        cursor = sync.encode_cursor(timezone.now() - timezone.timedelta(days=31))
+        data = self.get(cursor)
+        self.assertTrue(data["reset"])
+        self.assertEqual(self.ids(data["companies"]), [self.company.pk])
+
+    def test_bad_cursor(self):
+        r = self.client.get("/api/changes/", {"since": "yesterday"})
+        self.assertEqual(r.status_code, 400)
+
+
+class BulkTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("u", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.company = Company.objects.create(user=self.user, name="Acme")
+        self.job = JobPosting.objects.create(user=self.user, company=self.company, title="Engineer", jd_raw=JD)
+        self.app = Application.objects.create(job=self.job)
+        other = User.objects.create_user("o", password="pw")
+        self.foreign_company = Company.objects.create(user=other, name="Elsewhere")
+        self.foreign_job = JobPosting.objects.create(user=other, company=self.foreign_company, title="X", jd_raw="x")
+        self.foreign_app = Application.objects.create(job=self.foreign_job)
+
+    def send(self, method, path, body):
+        return getattr(self.client, method)(path, body, format="json")
+
+    def test_create_update_delete(self):
+        r = self.send("post", "/api/jobs/bulk/", [
+            {"company_id": self.company.pk, "title": "SRE", "jd_raw": "Kubernetes"},
+            {"company_name": "Globex", "title": "Data Engineer", "jd_raw": "Spark"},
+        ])
+        self.assertEqual(r.status_code, 201)
+        created = r.json()["results"]
+        self.assertEqual([j["title"] for j in created], ["SRE", "Data Engineer"])
+        self.assertEqual(created[1]["company"]["name"], "Globex")
+
+        r = self.send("post", "/api/apps/bulk/", [{"job": j["id"], "stage": "applied"} for j in created])
+        self.assertEqual(r.status_code, 201)
+        app_ids = [a["id"] for a in r.json()["results"]]
+
+        r = self.send("patch", "/api/apps/bulk/", [{"id": app_ids[0], "stage": "offer"},
+                                                   {"id": app_ids[1], "notes": "called"}])
+        self.assertEqual(r.status_code, 200)
+        first, second = Application.objects.get(pk=app_ids[0]), Application.objects.get(pk=app_ids[1])
+        self.assertEqual((first.stage, first.notes), ("offer", ""))
+        self.assertEqual((second.stage, second.notes), ("applied", "called"))
+
+        r = self.send("delete", "/api/jobs/bulk/", {"ids": [j["id"] for j in created]})
+        self.assertEqual(r.status_code, 200)
+        self.assertFalse(JobPosting.objects.filter(pk__in=[j["id"] for j in created]).exists())
+        self.assertFalse(Application.objects.filter(pk__in=app_ids).exists())
+
+    def test_one_bad_item_writes_nothing(self):
+        r = self.send("post", "/api/apps/bulk/", [{"job": self.job.pk, "stage": "applied"},
+                                                  {"job": self.job.pk, "stage": "hired"}])
+        self.assertEqual(r.status_code, 400)
+        errors = r.json()["errors"]
+        self.assertEqual(errors[0], {})
+        self.assertIn("stage", errors[1])
+        self.assertEqual(Application.objects.filter(job=self.job).count(), 1)
+
+        r = self.send("patch", "/api/jobs/bulk/", [{"id": self.job.pk, "title": "Renamed"},
+                                                   {"id": self.job.pk + 1000, "title": "Ghost"}])
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.json()["errors"], [{}, {"id": ["Not found."]}])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.title, "Engineer")
+
+    def test_other_users_rows_are_not_found(self):
+        r = self.send("post", "/api/apps/bulk/", [{"job": self.foreign_job.pk}])
+        self.assertEqual(r.json()["errors"], [{"job": ["Not found."]}])
+        r = self.send("post", "/api/jobs/bulk/", [{"company_id": self.foreign_company.pk, "title": "T", "jd_raw": "x"}])
+        self.assertEqual(r.json()["errors"], [{"company_id": ["Not found."]}])
+        r = self.send("patch", "/api/apps/bulk/", [{"id": self.foreign_app.pk, "stage": "offer"}])
+        self.assertEqual(r.json()["errors"], [{"id": ["Not found."]}])
+        r = self.send("patch", "/api/apps/bulk/", [{"id": self.app.pk, "job": self.foreign_job.pk}])
+        self.assertEqual(r.json()["errors"], [{"job": ["Not found."]}])
+        r = self.send("delete", "/api/jobs/bulk/", {"ids": [self.job.pk, self.foreign_job.pk]})
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.json()["errors"], [{}, {"id": ["Not found."]}])
+
+        self.assertTrue(JobPosting.objects.filter(pk=self.job.pk).exists())
+        self.assertTrue(JobPosting.objects.filter(pk=self.foreign_job.pk).exists())
+        self.assertEqual(Application.objects.get(pk=self.app.pk).job_id, self.job.pk)
+        self.assertEqual(Application.objects.get(pk=self.foreign_app.pk).stage, "saved")
+
+    @override_settings(BULK_MAX_ITEMS=2)
+    def test_batch_size_limit(self):
+        r = self.send("post", "/api/apps/bulk/", [{"job": self.job.pk}] * 3)
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("At most 2", r.json()["detail"])
+        self.assertEqual(Application.objects.filter(job=self.job).count(), 1)
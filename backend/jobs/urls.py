@@ -7,13 +7,20 @@ urlpatterns = [
 
     path("jobs/", views.job_list_create),
     path("jobs/<int:pk>/", views.job_detail),
+    path("jobs/bulk/", views.job_bulk),
     path("jobs/extract/", views.extract_jd_view),  
 
     path("apps/", views.app_list_create),
     path("apps/<int:pk>/", views.app_detail),
+    path("apps/bulk/", views.app_bulk),
 
     path("fit/score/", views.fit_score),
     path("docs/generate/", views.generate_doc),
+    path("docs/generate/stream/", views.generate_doc_stream),
 
     path("resume/", views.resume_list_create),
+
+    path("changes/", views.changes),
+    path("export/", views.export_data),
+    path("import/", views.import_data),
 ]
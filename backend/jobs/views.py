@@ -1,18 +1,30 @@
 # backend/jobs/views.py
 import io
+import json
+import logging
 from datetime import datetime
 from django.utils import timezone
 from django.db.models import Q
+from django.http import StreamingHttpResponse
 from rest_framework.decorators import api_view, parser_classes, permission_classes, authentication_classes
-from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework import status
 from .models import JobPosting, Application
-from .serializers import JobPostingSerializer, ApplicationSerializer, ResumeSerializer
+from . import bulk, fit_cache, portability, sync
+from .serializers import (JobPostingSerializer, ApplicationSerializer, ResumeSerializer,
+                          JobPostingListSerializer, ApplicationListSerializer, ResumeListSerializer)
 from docs_app.models import Resume, GeneratedDoc
 from utils.resume_parse import extract_text_from_file
 from utils.docx_export import markdown_to_docx
+from utils.jsonld import find_job_posting
+from utils.ats import fetch_posting
+from utils.timing import span
+from utils.fast_json import ORJSONParser
+from utils.cost_throttle import CostBudget, stage_cost, text_cost
+from utils import llm_usage
 from ai import provider as ai_provider
+from ai import incremental as ai_incremental
 from django.conf import settings
 import requests
 from bs4 import BeautifulSoup
@@ -20,6 +32,7 @@ from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from rest_framework.permissions import AllowAny
 NOT_FOUND_MSG = {'detail': 'Not found'}
+logger = logging.getLogger(__name__)
 
 
 @api_view(['GET'])
@@ -40,7 +53,15 @@ def job_detail(request, pk: int):
     elif request.method == 'PATCH':
         ser = JobPostingSerializer(job, data=request.data, partial=True)
         if ser.is_valid():
-            ser.save()
+            vd = ser.validated_data
+            extra = {}
+            # an edited JD without a jd_struct to go with it: re-extract the sections that changed
+            if 'jd_raw' in vd and 'jd_struct' not in vd and vd['jd_raw'] != job.jd_raw:
+                with span("reextract"):
+                    extra['jd_struct'], extra['jd_sections'] = ai_incremental.reextract(
+                        job.jd_raw, vd['jd_raw'], job.jd_struct, job.jd_sections,
+                        llm_gate=lambda: not llm_usage.over_quota())
+            ser.save(**extra)
             return Response(ser.data)
         return Response(ser.errors, status=400)
     else:
@@ -48,19 +69,50 @@ def job_detail(request, pk: int):
         return Response(status=204)
 
 
-def _fetch_text_from_url(url: str) -> str:
+def _fetch_soup(url: str):
     try:
         # ⬇️ user-agent helps with some sites
         headers = {'User-Agent': 'Mozilla/5.0 (ApplyMateAI)'}
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, 'html.parser')
+        with span("fetch"):
+            resp = requests.get(url, headers=headers, timeout=10)
+            resp.raise_for_status()
+        with span("parse"):
+            return BeautifulSoup(resp.text, 'html.parser')
+    except Exception:
+        return None
+
+
+def _soup_to_text(soup) -> str:
+    with span("soup_text"):
         for tag in soup(['script', 'style', 'noscript', 'nav', 'header', 'footer']):
             tag.decompose()
         text = ' '.join(soup.get_text(separator=' ').split())
-        return text[:15000]
-    except Exception:
-        return ""
+    return text[:15000]
+
+
+def _fetch_url(url: str):
+    """(posting, text) for a JD url. A structured posting when there is one,
+    from the ATS API or the page's schema.org JobPosting (no LLM needed);
+    else the page text ("" when the fetch failed)."""
+    # known ATS boards: ask their JSON API instead of scraping the page
+    with span("ats"):
+        posting = fetch_posting(url)
+    if posting:
+        return posting, ""
+    soup = _fetch_soup(url)
+    if soup is None:
+        return None, ""
+    with span("jsonld"):
+        posting = find_job_posting(soup)
+    if posting:
+        return posting, ""
+    return None, _soup_to_text(soup)
+
+
+def _over_budget(budget: CostBudget, total: int) -> Response:
+    logger.warning("extract refused for %s: %d cost units this window", budget.ident, total)
+    return Response({"detail": "Extraction budget exhausted, try again later."}, status=429,
+                    headers={"Retry-After": str(budget.retry_after()), **budget.headers(total)})
 
 
 @api_view(['POST'])
@@ -69,13 +121,37 @@ def _fetch_text_from_url(url: str) -> str:
 def extract_jd_view(request):
     jd_text = request.data.get("jd_text", "")
     url = request.data.get("url")
+    # unauthenticated and costly: charge the caller's cost budget (see utils/cost_throttle.py)
+    budget = CostBudget(request)
+    total = budget.charge(text_cost(jd_text) + (stage_cost("fetch") if url and not jd_text else 0))
+    if budget.over_hard_limit(total):
+        return _over_budget(budget, total)
     if url and not jd_text:
-        jd_text = _fetch_text_from_url(url)
+        posting, jd_text = _fetch_url(url)
+        if posting:
+            return Response(ai_provider.extract_jd_from_posting(posting), headers=budget.headers())
+        # fetched text goes on to the extractor like posted text: charge its size too
+        total = budget.charge(text_cost(jd_text) - text_cost(""))
+        if budget.over_hard_limit(total):
+            return _over_budget(budget, total)
     if not jd_text:
         return Response({"detail": "Provide jd_text or url"}, status=400)
+    # over budget: no LLM, the deterministic extractor answers
+    degraded = []
+
+    def llm_gate():
+        if budget.try_charge("llm") and not llm_usage.over_quota():
+            return True
+        degraded.append(True)
+        return False
+
     # ⬇️ call the AI helper via the module alias
-    jd_struct = ai_provider.extract_jd(jd_text)
-    return Response(jd_struct)
+    jd_struct = ai_provider.extract_jd(jd_text, llm_gate=llm_gate)
+    headers = budget.headers()
+    if degraded:
+        logger.info("extract degraded to deterministic for %s", budget.ident)
+        headers["X-Extract-Degraded"] = "1"
+    return Response(jd_struct, headers=headers)
 
 
 @api_view(['GET', 'PATCH', 'DELETE'])
@@ -104,6 +180,10 @@ def fit_score(request):
     resume_id = request.data.get('resume_id')
     if not job_id or not resume_id:
         return Response({'detail': 'job_id and resume_id required'}, status=400)
+    with span("cache"):
+        cached = fit_cache.get(job_id, resume_id)
+    if cached is not None:
+        return Response(cached)
     try:
         job = JobPosting.objects.get(pk=job_id)
         resume = Resume.objects.get(pk=resume_id)
@@ -112,28 +192,29 @@ def fit_score(request):
 
     jd = job.jd_struct or {}
     rtxt = (resume.parsed_text or "").lower()
-
-    must = {s.lower() for s in (jd.get('must_haves') or [])}
-    nice = {s.lower() for s in (jd.get('nice_to_haves') or [])}
-    other = {s.lower() for s in (jd.get('skills') or [])}
-    all_sk = must | nice | other
-
-    match = sorted({s for s in all_sk if s in rtxt})
-    miss_must = sorted(must - set(match))
-    miss_nice = sorted(nice - set(match))
-    miss_other = sorted((other - set(match)) - set(miss_must) - set(miss_nice))
-    gaps = miss_must + miss_nice + miss_other
-
-    # Weighted score: must-have=2, nice-to-have=1, others=1
-    total_pts = 2*len(must) + 1*len(nice) + 1*len(other - must - nice)
-    hit_pts = 2*len(set(match) & must) + 1*len(set(match) &
-                                               nice) + 1*len(set(match) & (other - must - nice))
-    score = int(round(100 * (hit_pts / max(1, total_pts))))
-    score = max(5, min(100, score))
+    with span("match"):
+        must = {s.lower() for s in (jd.get('must_haves') or [])}
+        nice = {s.lower() for s in (jd.get('nice_to_haves') or [])}
+        other = {s.lower() for s in (jd.get('skills') or [])}
+        all_sk = must | nice | other
+
+        match = sorted({s for s in all_sk if s in rtxt})
+        miss_must = sorted(must - set(match))
+        miss_nice = sorted(nice - set(match))
+        miss_other = sorted((other - set(match)) - set(miss_must) - set(miss_nice))
+        gaps = miss_must + miss_nice + miss_other
+
+        # Weighted score: must-have=2, nice-to-have=1, others=1
+        total_pts = 2*len(must) + 1*len(nice) + 1*len(other - must - nice)
+        hit_pts = 2*len(set(match) & must) + 1*len(set(match) &
+                                                   nice) + 1*len(set(match) & (other - must - nice))
+        score = int(round(100 * (hit_pts / max(1, total_pts))))
+        score = max(5, min(100, score))
 
     # Advice (LLM or heuristic)
     from ai import provider as ai_provider
-    advice = ai_provider.suggest_resume_patches(jd, resume.parsed_text or "")
+    with span("advice"):
+        advice = ai_provider.suggest_resume_patches(jd, resume.parsed_text or "")
 
     # Also produce a short human-readable checklist
     recommendations = []
@@ -144,28 +225,27 @@ def fit_score(request):
         recommendations.append(
             "Weave in preferred skills where relevant: " + ", ".join(miss_nice[:6]) + ".")
 
-    return Response({
+    result = {
         "score": score,
         "match": match,
         "gaps": gaps,
         "recommendations": recommendations,
         "advice": advice,   # <--- new: {keywords_to_add, bullets, summary}
-    })
+    }
+    fit_cache.put(job, resume, result)
+    return Response(result)
 
 
-@api_view(['POST'])
-def generate_doc(request):
-    kind = request.data.get('type', 'bullets')
+def _doc_inputs(request):
+    """Validate a docs/generate payload; returns (job, resume_text, error_response)."""
     job_id = request.data.get('job_id')
     resume_id = request.data.get('resume_id')
-    export = bool(request.data.get('export', False))
-
     if not job_id:
-        return Response({'detail': 'job_id is required'}, status=400)
+        return None, "", Response({'detail': 'job_id is required'}, status=400)
     try:
         job = JobPosting.objects.get(pk=job_id, user=request.user)
     except JobPosting.DoesNotExist:
-        return Response({'detail': 'Job not found'}, status=404)
+        return None, "", Response({'detail': 'Job not found'}, status=404)
 
     resume_text = ""
     if resume_id:
@@ -174,43 +254,111 @@ def generate_doc(request):
             resume_text = resume.parsed_text or ""
         except Resume.DoesNotExist:
             pass
+    return job, resume_text, None
 
-    # ⬇️ call via alias
+
+def _doc_title(kind: str, job) -> str:
     if kind == 'coverletter':
-        content_md = ai_provider.generate_cover_letter(
-            job.jd_struct or {}, resume_text)
-        title = f"Cover Letter - {job.title} at {job.company.name}"
-    else:
-        content_md = ai_provider.generate_bullets(
-            job.jd_struct or {}, resume_text)
-        title = f"Resume Bullets - {job.title} at {job.company.name}"
-
-    gen = GeneratedDoc.objects.create(
-        user=request.user, job=job, kind=kind, content_md=content_md)
-
-    file_url = None
-    if export:
-        doc = markdown_to_docx(content_md, title=title)
-        buf = io.BytesIO()
-        doc.save(buf)
-        buf.seek(0)
-        filename = f"{kind}-{job.id}-{int(timezone.now().timestamp())}.docx"
-        path = default_storage.save(
-            f"generated/{filename}", ContentFile(buf.read()))
-        gen.file.name = path
-        gen.save()
-        # Generate proper URL for frontend
-        if settings.DEBUG:
-            file_url = f"http://127.0.0.1:8000{settings.MEDIA_URL}{path}"
+        return f"Cover Letter - {job.title} at {job.company.name}"
+    return f"Resume Bullets - {job.title} at {job.company.name}"
+
+
+def _export_docx(request, gen, title: str):
+    """Render `gen` to .docx, attach it and return a URL the frontend can open."""
+    doc = markdown_to_docx(gen.content_md, title=title)
+    buf = io.BytesIO()
+    doc.save(buf)
+    buf.seek(0)
+    filename = f"{gen.kind}-{gen.job_id}-{int(timezone.now().timestamp())}.docx"
+    path = default_storage.save(
+        f"generated/{filename}", ContentFile(buf.read()))
+    gen.file.name = path
+    gen.save()
+    # Generate proper URL for frontend
+    if settings.DEBUG:
+        return f"http://127.0.0.1:8000{settings.MEDIA_URL}{path}"
+    # Production: use the request host
+    host = request.get_host()
+    protocol = 'https' if request.is_secure() else 'http'
+    return f"{protocol}://{host}{settings.MEDIA_URL}{path}"
+
+
+def _doc_payload(gen, file_url):
+    return {'id': gen.id, 'kind': gen.kind, 'content_md': gen.content_md,
+            'file': gen.file.url if gen.file else None, 'file_url': file_url}
+
+
+@api_view(['POST'])
+def generate_doc(request):
+    kind = request.data.get('type', 'bullets')
+    export = bool(request.data.get('export', False))
+    job, resume_text, error = _doc_inputs(request)
+    if error:
+        return error
+
+    # ⬇️ call via alias
+    with span("generate"):
+        if kind == 'coverletter':
+            content_md = ai_provider.generate_cover_letter(
+                job.jd_struct or {}, resume_text)
         else:
-            # Production: use the request host
-            host = request.get_host()
-            protocol = 'https' if request.is_secure() else 'http'
-            file_url = f"{protocol}://{host}{settings.MEDIA_URL}{path}"
+            content_md = ai_provider.generate_bullets(
+                job.jd_struct or {}, resume_text)
 
-    data = {'id': gen.id, 'kind': gen.kind, 'content_md': gen.content_md,
-            'file': gen.file.url if gen.file else None, 'file_url': file_url}
-    return Response(data)
+    with span("save"):
+        gen = GeneratedDoc.objects.create(
+            user=request.user, job=job, kind=kind, content_md=content_md)
+
+    with span("docx"):
+        file_url = _export_docx(request, gen, _doc_title(kind, job)) if export else None
+    return Response(_doc_payload(gen, file_url))
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@api_view(['POST'])
+def generate_doc_stream(request):
+    """LLM-backed docs/generate as server-sent events.
+
+    Emits `token` events ({"text": ...}) as the model writes, then a `done`
+    event with the same payload as docs/generate once the GeneratedDoc is
+    saved. Falls back to the templates when no LLM is configured.
+    """
+    kind = request.data.get('type', 'bullets')
+    kind = kind if kind in ('bullets', 'coverletter') else 'bullets'
+    export = bool(request.data.get('export', False))
+    job, resume_text, error = _doc_inputs(request)
+    if error:
+        return error
+    user = request.user
+
+    def events():
+        parts = []
+        try:
+            for chunk in ai_provider.stream_document(kind, job.jd_struct or {}, resume_text,
+                                                     llm_gate=lambda: not llm_usage.over_quota(user.id)):
+                parts.append(chunk)
+                yield _sse('token', {'text': chunk})
+        except Exception:
+            logger.exception("generate_doc_stream failed job=%s kind=%s", job.id, kind)
+            yield _sse('error', {'detail': 'Generation failed'})
+            return
+        gen = GeneratedDoc.objects.create(
+            user=user, job=job, kind=kind, content_md="".join(parts))
+        file_url = _export_docx(request, gen, _doc_title(kind, job)) if export else None
+        yield _sse('done', _doc_payload(gen, file_url))
+
+    resp = StreamingHttpResponse(llm_usage.bound(events(), user_id=user.id), content_type='text/event-stream')
+    resp['Cache-Control'] = 'no-cache'
+    resp['X-Accel-Buffering'] = 'no'   # don't let nginx buffer the stream
+    return resp
+
+
+def _full(request) -> bool:
+    """List endpoints leave out the big text columns unless ?full=1."""
+    return request.query_params.get('full') == '1'
 
 
 @api_view(['GET', 'POST'])
@@ -222,7 +370,7 @@ def job_list_create(request):
         if q:
             qs = qs.filter(Q(title__icontains=q) |
                            Q(company__name__icontains=q))
-        return Response(JobPostingSerializer(qs, many=True).data)
+        return Response(JobPostingListSerializer(qs, full=_full(request)).data)
     else:
         serializer = JobPostingSerializer(
             data=request.data, context={'request': request})
@@ -239,7 +387,7 @@ def app_list_create(request):
         qs = Application.objects.filter(job__user=request.user).order_by('-id')
         if job_id:
             qs = qs.filter(job_id=job_id)
-        return Response(ApplicationSerializer(qs, many=True).data)
+        return Response(ApplicationListSerializer(qs).data)
     else:
         # ensure the job belongs to the user
         job_id = request.data.get("job")
@@ -253,17 +401,69 @@ def app_list_create(request):
 
 
 @api_view(['GET', 'POST'])
-@parser_classes([MultiPartParser, FormParser, JSONParser])
+@parser_classes([MultiPartParser, FormParser, ORJSONParser])
 def resume_list_create(request):
     if request.method == 'GET':
         qs = Resume.objects.filter(user=request.user).order_by('-created_at')
-        return Response(ResumeSerializer(qs, many=True).data)
+        return Response(ResumeListSerializer(qs, full=_full(request)).data)
     else:
         label = request.data.get('label', 'Base Resume')
         f = request.FILES.get('file')
         if not f:
             return Response({'detail': 'file is required'}, status=400)
-        resume = Resume.objects.create(user=request.user, label=label, file=f)
-        resume.parsed_text = extract_text_from_file(resume.file.path)
-        resume.save()
+        with span("store"):
+            resume = Resume.objects.create(user=request.user, label=label, file=f)
+        with span("resume_parse"):
+            resume.parsed_text = extract_text_from_file(resume.file.path)
+        with span("save"):
+            resume.save()
         return Response(ResumeSerializer(resume).data, status=201)
+
+
+@api_view(['GET'])
+def changes(request):
+    """Rows created/changed/deleted since ?since=<cursor> (see jobs/sync.py)."""
+    try:
+        return Response(sync.changes(request.user, request.query_params.get('since'), full=_full(request)))
+    except sync.BadCursor:
+        return Response({'detail': 'invalid cursor'}, status=400)
+
+
+def _bulk(request, create, update, delete):
+    handler = {'POST': create, 'PATCH': update, 'DELETE': delete}[request.method]
+    try:
+        out = handler(request.user, request.data)
+    except bulk.BulkError as e:
+        return Response(e.errors, status=400)
+    return Response(out, status=201 if request.method == 'POST' else 200)
+
+
+@api_view(['POST', 'PATCH', 'DELETE'])
+def job_bulk(request):
+    """Create/update/delete many jobs in one transaction (see jobs/bulk.py)."""
+    return _bulk(request, bulk.create_jobs, bulk.update_jobs, bulk.delete_jobs)
+
+
+@api_view(['POST', 'PATCH', 'DELETE'])
+def app_bulk(request):
+    """Create/update/delete many applications in one transaction (see jobs/bulk.py)."""
+    return _bulk(request, bulk.create_apps, bulk.update_apps, bulk.delete_apps)
+
+
+@api_view(['GET'])
+def export_data(request):
+    """Everything the user owns as streamed NDJSON (see jobs/portability.py). ?files=0 leaves out file contents."""
+    files = request.query_params.get('files') != '0'
+    resp = StreamingHttpResponse(portability.export_lines(request.user, files=files),
+                                 content_type='application/x-ndjson')
+    resp['Content-Disposition'] = f'attachment; filename="applymate-{timezone.now():%Y%m%d}.ndjson"'
+    return resp
+
+
+@api_view(['POST'])
+def import_data(request):
+    """Load an export_data file into this account; the body is the NDJSON, read line by line."""
+    try:
+        return Response(portability.import_lines(request.user, request.stream), status=201)
+    except portability.ImportFormatError as e:
+        return Response({'detail': str(e)}, status=400)
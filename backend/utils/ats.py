@@ -0,0 +1,173 @@
+# backend/utils/ats.py
+import re
+from typing import Dict, Any, List, Optional
+import requests
+from django.conf import settings
+from .jsonld import html_to_lines
+
+# Applicant-tracking systems expose each posting as public JSON. Adapters turn
+# a posting URL into that API call and map the response into the same flat
+# "posting" dict utils.jsonld produces, so ai.provider.extract_jd_from_posting
+# can consume either.
+
+class ATSAdapter:
+    name = ""
+    url_re: re.Pattern = re.compile(r"(?!)")
+    default_api = ""
+
+    def api_base(self) -> str:
+        bases = getattr(settings, "ATS_API_BASES", {}) or {}
+        return str(bases.get(self.name) or self.default_api).rstrip("/")
+
+    def match(self, url: str) -> Optional[re.Match]:
+        return self.url_re.search(url or "")
+
+    def api_url(self, m: re.Match) -> str:
+        raise NotImplementedError
+
+    def to_posting(self, data: Dict[str, Any], m: re.Match) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class GreenhouseAdapter(ATSAdapter):
+    name = "greenhouse"
+    url_re = re.compile(
+        r"^https?://(?:job-)?boards(?:\.eu)?\.greenhouse\.io/(?!embed/)(?P<board>[\w-]+)/jobs/(?P<id>\d+)"
+        r"|^https?://(?:job-)?boards(?:\.eu)?\.greenhouse\.io/embed/job_app\?(?=.*\bfor=(?P<eboard>[\w-]+))(?=.*\btoken=(?P<eid>\d+))",
+        re.I,
+    )
+    default_api = "https://boards-api.greenhouse.io"
+
+    def api_url(self, m: re.Match) -> str:
+        board = m.group("board") or m.group("eboard")
+        job_id = m.group("id") or m.group("eid")
+        return f"{self.api_base()}/v1/boards/{board}/jobs/{job_id}"
+
+    def to_posting(self, data: Dict[str, Any], m: re.Match) -> Dict[str, Any]:
+        board = m.group("board") or m.group("eboard") or ""
+        location = str((data.get("location") or {}).get("name") or "").strip()
+        return {
+            "title": str(data.get("title") or "").strip(),
+            "company": str(data.get("company_name") or "").strip() or board.replace("-", " ").title(),
+            "location": location,
+            "remote": bool(re.fullmatch(r"\s*remote\b.*", location, re.I)),
+            "employment_type": "",
+            "skills": [],
+            "description": html_to_lines(data.get("content")),
+        }
+
+
+class LeverAdapter(ATSAdapter):
+    name = "lever"
+    url_re = re.compile(r"^https?://jobs\.(?P<eu>eu\.)?lever\.co/(?P<company>[\w.-]+)/(?P<id>[0-9a-f-]{36})", re.I)
+    default_api = "https://api.lever.co"
+
+    def api_url(self, m: re.Match) -> str:
+        base = self.api_base()
+        if m.group("eu") and base == self.default_api:
+            base = "https://api.eu.lever.co"
+        return f"{base}/v0/postings/{m.group('company')}/{m.group('id')}"
+
+    def to_posting(self, data: Dict[str, Any], m: re.Match) -> Dict[str, Any]:
+        cats = data.get("categories") or {}
+        parts = [str(data.get("descriptionPlain") or "").strip() or html_to_lines(data.get("description"))]
+        for block in data.get("lists") or []:
+            parts.append(str(block.get("text") or "").strip())
+            parts.append(html_to_lines(block.get("content")))
+        parts.append(str(data.get("additionalPlain") or "").strip())
+        return {
+            "title": str(data.get("text") or "").strip(),
+            "company": m.group("company").replace("-", " ").title(),
+            "location": str(cats.get("location") or "").strip(),
+            "remote": str(data.get("workplaceType") or "").lower() == "remote",
+            "employment_type": str(cats.get("commitment") or ""),
+            "skills": [],
+            "description": "\n".join([p for p in parts if p]),
+        }
+
+
+class AshbyAdapter(ATSAdapter):
+    name = "ashby"
+    url_re = re.compile(r"^https?://jobs\.ashbyhq\.com/(?P<board>[\w.%-]+)/(?P<id>[0-9a-f-]{36})", re.I)
+    default_api = "https://api.ashbyhq.com"
+
+    def api_url(self, m: re.Match) -> str:
+        # the public posting API lists the whole board; the posting is picked out below
+        return f"{self.api_base()}/posting-api/job-board/{m.group('board')}"
+
+    def to_posting(self, data: Dict[str, Any], m: re.Match) -> Dict[str, Any]:
+        job_id = m.group("id").lower()
+        job = next((j for j in data.get("jobs") or [] if str(j.get("id") or "").lower() == job_id), None)
+        if job is None:
+            raise LookupError(f"ashby posting {job_id} not on the board")
+        return {
+            "title": str(job.get("title") or "").strip(),
+            "company": m.group("board").replace("-", " ").title(),
+            "location": str(job.get("location") or "").strip(),
+            "remote": bool(job.get("isRemote")),
+            "employment_type": str(job.get("employmentType") or ""),
+            "skills": [],
+            "description": str(job.get("descriptionPlain") or "").strip() or html_to_lines(job.get("descriptionHtml")),
+        }
+
+
+class WorkdayAdapter(ATSAdapter):
+    name = "workday"
+    url_re = re.compile(
+        r"^https?://(?P<host>(?P<tenant>[\w-]+)\.wd\d+\.myworkdayjobs\.com)/(?:[a-z]{2}-[A-Z]{2}/)?"
+        r"(?P<site>[\w-]+)/job/(?P<path>[^?#]+)",
+        re.I,
+    )
+    default_api = ""   # each tenant's own host
+
+    def api_url(self, m: re.Match) -> str:
+        base = self.api_base() or f"https://{m.group('host')}"
+        return f"{base}/wday/cxs/{m.group('tenant')}/{m.group('site')}/job/{m.group('path').rstrip('/')}"
+
+    def to_posting(self, data: Dict[str, Any], m: re.Match) -> Dict[str, Any]:
+        info = data.get("jobPostingInfo") or {}
+        location = str(info.get("location") or "").strip()
+        remote = str(info.get("remoteType") or "")
+        return {
+            "title": str(info.get("title") or "").strip(),
+            "company": (str((data.get("hiringOrganization") or {}).get("name") or "").strip()
+                        or m.group("tenant").replace("-", " ").title()),
+            "location": location,
+            "remote": bool(re.search(r"\bremote\b", remote, re.I)) or bool(re.fullmatch(r"\s*remote\b.*", location, re.I)),
+            "employment_type": str(info.get("timeType") or ""),
+            "skills": [],
+            "description": html_to_lines(info.get("jobDescription")),
+        }
+
+
+_ADAPTERS: List[ATSAdapter] = []
+
+def register(adapter: ATSAdapter) -> ATSAdapter:
+    _ADAPTERS.append(adapter)
+    return adapter
+
+def find_adapter(url: str):
+    """Return (adapter, match) for the first registered adapter matching `url`."""
+    for adapter in _ADAPTERS:
+        m = adapter.match(url)
+        if m:
+            return adapter, m
+    return None, None
+
+def fetch_posting(url: str, timeout: float = 10) -> Optional[Dict[str, Any]]:
+    """Fetch a posting through its ATS API; None when no adapter applies or the call fails."""
+    adapter, m = find_adapter(url)
+    if adapter is None:
+        return None
+    try:
+        resp = requests.get(adapter.api_url(m), headers={"Accept": "application/json"}, timeout=timeout)
+        resp.raise_for_status()
+        posting = adapter.to_posting(resp.json(), m)
+    except Exception:
+        return None
+    return posting if posting["title"] and posting["description"] else None
+
+register(GreenhouseAdapter())
+register(LeverAdapter())
+register(AshbyAdapter())
+register(WorkdayAdapter())
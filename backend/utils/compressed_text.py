@@ -0,0 +1,126 @@
+# backend/utils/compressed_text.py
+import zlib
+from django.conf import settings
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+try:
+    import zstandard
+except Exception:
+    zstandard = None
+
+# A TextField stored compressed in a binary column (bytea / BLOB). Stored
+# values start with a one-byte header:
+#   \x00  utf-8, uncompressed (short values)
+#   \x01  zlib
+#   \x02  zstd
+# anything else is read as legacy plain utf-8. Rows load as Packed bytes and
+# are decompressed on first attribute access; a row saved without touching
+# the field writes its bytes back unchanged. values()/values_list() return
+# Packed too: str() it or use field.unpack().
+
+RAW, ZLIB, ZSTD = b"\x00", b"\x01", b"\x02"
+
+
+class Packed:
+    """Stored bytes of a CompressedTextField, not yet decompressed."""
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    @property
+    def text(self) -> str:
+        return decompress(self.data)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __len__(self) -> int:   # stored size, for stats
+        return len(self.data)
+
+    def __eq__(self, other):
+        return isinstance(other, Packed) and other.data == self.data
+
+    def __hash__(self):
+        return hash(self.data)
+
+
+def compress(text: str) -> bytes:
+    raw = text.encode("utf-8")
+    if len(raw) < int(getattr(settings, "COMPRESSED_TEXT_MIN_BYTES", 256)):
+        return RAW + raw
+    if zstandard is not None and getattr(settings, "COMPRESSED_TEXT_CODEC", "zlib") == "zstd":
+        return ZSTD + zstandard.ZstdCompressor(level=6).compress(raw)
+    return ZLIB + zlib.compress(raw, 6)
+
+
+def decompress(data: bytes) -> str:
+    head, body = data[:1], data[1:]
+    if head == RAW:
+        return body.decode("utf-8")
+    if head == ZLIB:
+        return zlib.decompress(body).decode("utf-8")
+    if head == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed text but the zstandard module isn't installed")
+        return zstandard.ZstdDecompressor().decompress(body).decode("utf-8")
+    return data.decode("utf-8")   # written before compression
+
+
+class _LazyText(DeferredAttribute):
+    # a data descriptor (has __set__), so reads come here even once the
+    # value sits in the instance __dict__
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if type(value) is Packed:
+            value = instance.__dict__[self.field.attname] = value.text
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class CompressedTextField(models.TextField):
+    descriptor_class = _LazyText
+
+    def get_internal_type(self):
+        return "BinaryField"
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return Packed(bytes(value))   # memoryview on postgres/sqlite
+
+    def to_python(self, value):
+        if isinstance(value, Packed):
+            return value.text
+        return super().to_python(value)
+
+    def unpack(self, value):
+        return value.text if isinstance(value, Packed) else value
+
+    def pre_save(self, model_instance, add):
+        # skip the descriptor, so an untouched value isn't decompressed and recompressed
+        if self.attname in model_instance.__dict__:
+            return model_instance.__dict__[self.attname]
+        return super().pre_save(model_instance, add)
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        if isinstance(value, Packed):
+            return value.data
+        return compress(str(value))
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is not None:
+            return connection.Database.Binary(value)
+        return value
+
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        return "" if value is None else str(value)
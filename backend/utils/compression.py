@@ -0,0 +1,90 @@
+# backend/utils/compression.py
+import gzip
+from typing import Dict, Optional
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from .timing import span
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+# Response compression with Accept-Encoding negotiation: brotli when the
+# client takes it and the module is installed, else gzip. Only buffered
+# JSON API responses of at least COMPRESS_MIN_BYTES are touched. HTML is
+# left alone: admin and login pages carry CSRF tokens next to reflected
+# input, and compressing them without padding opens them to BREACH.
+# Streaming responses (SSE, file downloads) pass through untouched so
+# tokens still flush as they arrive. Static files are precompressed by
+# whitenoise and already carry Content-Encoding.
+
+COMPRESSIBLE = ("application/json",)
+
+
+def _accepted(header: str) -> Dict[str, float]:
+    """Accept-Encoding -> {coding: q}."""
+    out = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        out[coding.strip().lower()] = q
+    return out
+
+
+def negotiate(header: str) -> Optional[str]:
+    accepted = _accepted(header)
+    star = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        q = accepted.get(coding, star)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "COMPRESS_ENABLED", True):
+            raise MiddlewareNotUsed()
+        self.min_bytes = int(getattr(settings, "COMPRESS_MIN_BYTES", 1024))
+        self.gzip_level = int(getattr(settings, "COMPRESS_GZIP_LEVEL", 6))
+        self.brotli_quality = int(getattr(settings, "COMPRESS_BROTLI_QUALITY", 4))
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if not response.get("Content-Type", "").startswith(COMPRESSIBLE):
+            return response
+        if len(response.content) < self.min_bytes:
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding is None:
+            return response
+
+        with span("compress"):
+            if coding == "br":
+                body = brotli.compress(response.content, quality=self.brotli_quality)
+            else:
+                body = gzip.compress(response.content, compresslevel=self.gzip_level, mtime=0)
+        if len(body) >= len(response.content):
+            return response
+        response.content = body
+        response["Content-Length"] = str(len(body))
+        response["Content-Encoding"] = coding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
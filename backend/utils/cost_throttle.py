@@ -0,0 +1,91 @@
+# backend/utils/cost_throttle.py
+import logging, math, time
+from typing import Dict, Optional
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+from .db_routing import request_user_id
+
+logger = logging.getLogger(__name__)
+
+# Cost-weighted budgets for jobs/extract/. Every call is charged in cost
+# units: a base unit, one per started 1k characters of input, more for an
+# outbound fetch and much more for an LLM call. Units are counted per caller
+# (user id when a valid JWT is sent, else client IP) in fixed windows in the
+# shared cache. A caller over budget is degraded, not refused: the LLM is
+# skipped and the deterministic extractor answers. Only a caller far past it
+# (EXTRACT_HARD_LIMIT times the budget) gets a 429. Anonymous callers are
+# keyed by DRF's get_ident, i.e. REMOTE_ADDR unless NUM_PROXIES says how many
+# X-Forwarded-For hops to trust.
+
+DEFAULT_COSTS = {"base": 1, "kchar": 1, "fetch": 5, "llm": 20}
+
+
+def _costs() -> Dict[str, int]:
+    return {**DEFAULT_COSTS, **getattr(settings, "EXTRACT_COSTS", {})}
+
+
+def stage_cost(kind: str) -> int:
+    return _costs()[kind]
+
+
+def text_cost(text: str) -> int:
+    c = _costs()
+    return c["base"] + c["kchar"] * math.ceil(len(text or "") / 1000)
+
+
+def warn_if_unshared() -> None:
+    """Called at startup: a per-process cache gives every worker its own budget."""
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend.endswith(("LocMemCache", "DummyCache")) and not settings.DEBUG:
+        logger.warning("jobs/extract/ cost budgets are kept in a per-process cache (%s); with several "
+                       "workers each one enforces its own budget. Set CACHE_URL to share them.", backend)
+
+
+class CostBudget:
+    """One caller's spend in the current window."""
+
+    def __init__(self, request, scope: str = "extract"):
+        self.window = int(getattr(settings, "EXTRACT_BUDGET_WINDOW", 3600))
+        user_id = request_user_id(request)
+        if user_id:
+            ident, self.limit = f"user:{user_id}", int(getattr(settings, "EXTRACT_BUDGET_USER", 1000))
+        else:
+            ident, self.limit = f"ip:{BaseThrottle().get_ident(request)}", int(getattr(settings, "EXTRACT_BUDGET_IP", 300))
+        self.ident = ident
+        self.hard_limit = self.limit * float(getattr(settings, "EXTRACT_HARD_LIMIT", 3))
+        self.key = f"cost:{scope}:{ident}:{int(time.time()) // self.window}"
+
+    def charge(self, units: int) -> int:
+        """Add units to the window; returns the window total."""
+        cache.add(self.key, 0, self.window)
+        try:
+            total = cache.incr(self.key, units)
+        except ValueError:   # expired between add and incr
+            cache.add(self.key, units, self.window)
+            total = units
+        return total
+
+    def refund(self, units: int) -> None:
+        try:
+            cache.decr(self.key, units)
+        except ValueError:
+            pass
+
+    def over_hard_limit(self, total: int) -> bool:
+        return total > self.hard_limit
+
+    def try_charge(self, kind: str) -> bool:
+        """Charge an optional stage (e.g. "llm") only if it fits the budget."""
+        units = stage_cost(kind)
+        if self.charge(units) > self.limit:
+            self.refund(units)
+            return False
+        return True
+
+    def retry_after(self) -> int:
+        return self.window - int(time.time()) % self.window
+
+    def headers(self, total: Optional[int] = None) -> Dict[str, str]:
+        total = cache.get(self.key, 0) if total is None else total
+        return {"X-Cost-Budget": str(self.limit), "X-Cost-Remaining": str(max(0, self.limit - total))}
@@ -0,0 +1,96 @@
+# backend/utils/db_routing.py
+import random, contextvars
+from typing import Optional
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# Primary/replica routing. ReplicaRoutingMiddleware opens a read scope for
+# safe requests (GET/HEAD/OPTIONS); inside it ReplicaRouter sends reads to a
+# random replica. Everything else reads the primary: unsafe requests, code
+# outside a request (commands, threads), open transactions, and reads after
+# this request already wrote. A user who wrote is pinned to the primary for
+# REPLICA_STICKY_SECONDS through the shared cache, so their next page shows
+# their own changes even when the replicas lag.
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PIN_PREFIX = "db:pin:"
+
+_scope: contextvars.ContextVar = contextvars.ContextVar("db_read_scope", default=None)
+
+
+class _ReadScope:
+    __slots__ = ("replica", "wrote")
+
+    def __init__(self, replica: Optional[str]):
+        self.replica, self.wrote = replica, False
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        scope = _scope.get()
+        if scope is None or scope.replica is None or scope.wrote:
+            return "default"
+        if connections["default"].in_atomic_block:
+            return "default"
+        return scope.replica
+
+    def db_for_write(self, model, **hints):
+        scope = _scope.get()
+        if scope is not None:
+            scope.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {"default", *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get the schema through replication
+        return db == "default"
+
+
+def request_user_id(request) -> Optional[str]:
+    """The caller's user id, from the session or the JWT claim (no DB query)."""
+    session = getattr(request, "session", None)
+    if session is not None and session.get(SESSION_KEY):
+        return str(session[SESSION_KEY])
+    header = request.META.get("HTTP_AUTHORIZATION", "")
+    if not header.startswith("Bearer "):
+        return None
+    try:
+        from rest_framework_simplejwt.settings import api_settings
+        from rest_framework_simplejwt.tokens import AccessToken
+        return str(AccessToken(header[7:])[api_settings.USER_ID_CLAIM])
+    except Exception:
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Must come after SessionMiddleware (reads the session user id)."""
+
+    def __init__(self, get_response):
+        self.replicas = list(getattr(settings, "DATABASE_REPLICAS", []))
+        if not self.replicas:
+            raise MiddlewareNotUsed()
+        self.sticky = float(getattr(settings, "REPLICA_STICKY_SECONDS", 10))
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writer = request_user_id(request)
+        replica = None
+        if request.method in SAFE_METHODS and not (writer and cache.get(PIN_PREFIX + writer)):
+            replica = random.choice(self.replicas)
+        scope = _ReadScope(replica)
+        token = _scope.set(scope)
+        try:
+            response = self.get_response(request)
+        finally:
+            _scope.reset(token)
+        if writer and self.sticky > 0 and (scope.wrote or request.method not in SAFE_METHODS):
+            cache.set(PIN_PREFIX + writer, 1, self.sticky)
+        return response
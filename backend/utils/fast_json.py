@@ -0,0 +1,53 @@
+# backend/utils/fast_json.py
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+# orjson-backed drop-ins for DRF's JSONRenderer/JSONParser. Output matches
+# DRF's compact UTF-8 JSON; datetimes, decimals, lazy strings etc. go through
+# DRF's own encoder so they serialize exactly as before, and U+2028/U+2029
+# are escaped the way DRF does (they end a line in JavaScript). One
+# difference remains: orjson writes NaN/Infinity as null, where DRF's strict
+# JSON raises ValueError. Without orjson installed both classes behave like
+# the stock ones.
+
+_drf_default = encoders.JSONEncoder().default
+
+
+def dumps(data, indent: bool = False) -> bytes:
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    out = orjson.dumps(data, default=_drf_default, option=option)
+    return out.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        try:
+            return dumps(data, indent=bool(indent))
+        except TypeError:   # e.g. ints past 64 bits; let the stdlib handle the odd case
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,128 @@
+# backend/utils/jsonld.py
+import json, html as html_lib
+from typing import Dict, Any, List, Optional
+from bs4 import BeautifulSoup
+
+# Pull schema.org JobPosting data (JSON-LD or microdata) out of a fetched page.
+# Returns a flat dict: title, company, location, remote, employment_type,
+# skills, description (plain text, one block per line).
+
+def _is_job_posting(node: Any) -> bool:
+    t = node.get("@type") if isinstance(node, dict) else None
+    types = t if isinstance(t, list) else [t]
+    return any(str(x or "").split("/")[-1] == "JobPosting" for x in types)
+
+def _iter_nodes(data: Any):
+    if isinstance(data, list):
+        for x in data:
+            yield from _iter_nodes(x)
+    elif isinstance(data, dict):
+        yield data
+        for x in data.get("@graph", []) or []:
+            yield from _iter_nodes(x)
+
+def _text(v: Any) -> str:
+    if isinstance(v, dict):
+        v = v.get("name") or v.get("@value") or ""
+    if isinstance(v, list):
+        return ", ".join([s for s in (_text(x) for x in v) if s])
+    return " ".join(str(v or "").split())
+
+def html_to_lines(fragment: str) -> str:
+    s = str(fragment or "")
+    if "<" not in s and "&lt;" in s:
+        s = html_lib.unescape(s)
+    soup = BeautifulSoup(s, "html.parser")
+    lines = [" ".join(ln.split()) for ln in soup.get_text(separator="\n").splitlines()]
+    return "\n".join([ln for ln in lines if ln])
+
+def _address(v: Any) -> str:
+    if isinstance(v, list):
+        return "; ".join([s for s in (_address(x) for x in v) if s])
+    if not isinstance(v, dict):
+        return _text(v)
+    addr = v.get("address", v)
+    if not isinstance(addr, dict):
+        return _text(addr)
+    parts = [_text(addr.get(k)) for k in ("addressLocality", "addressRegion", "addressCountry")]
+    return ", ".join([p for p in parts if p])
+
+def _as_list(v: Any) -> List[str]:
+    if isinstance(v, list):
+        return [s for s in (_text(x) for x in v) if s]
+    return [s.strip() for s in _text(v).split(",") if s.strip()]
+
+def _from_node(node: Dict[str, Any]) -> Dict[str, Any]:
+    remote = "TELECOMMUTE" in _text(node.get("jobLocationType")).upper()
+    return {
+        "title": _text(node.get("title")),
+        "company": _text(node.get("hiringOrganization")),
+        "location": _address(node.get("jobLocation")),
+        "remote": remote,
+        "employment_type": _text(node.get("employmentType")),
+        "skills": _as_list(node.get("skills")),
+        "description": html_to_lines(node.get("description")),
+    }
+
+def _from_json_ld(soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
+    for tag in soup.find_all("script", attrs={"type": "application/ld+json"}):
+        try:
+            data = json.loads(tag.string or tag.get_text() or "")
+        except (ValueError, TypeError):
+            continue
+        for node in _iter_nodes(data):
+            if _is_job_posting(node):
+                return _from_node(node)
+    return None
+
+def _itemprop(scope, name: str):
+    # first matching itemprop that belongs to this scope (not a nested one)
+    for el in scope.find_all(attrs={"itemprop": name}):
+        parent = el.find_parent(attrs={"itemscope": True})
+        if parent is scope:
+            return el
+    return None
+
+def _microdata_value(el) -> str:
+    if el is None:
+        return ""
+    if el.has_attr("itemscope"):
+        name = _itemprop(el, "name")
+        return _microdata_value(name) if name is not None else el.get_text(" ", strip=True)
+    for attr in ("content", "datetime", "href", "src"):
+        if el.has_attr(attr):
+            return str(el[attr]).strip()
+    return el.get_text(" ", strip=True)
+
+def _from_microdata(soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
+    scope = soup.find(attrs={"itemtype": lambda v: bool(v) and str(v).rstrip("/").endswith("schema.org/JobPosting")})
+    if scope is None:
+        return None
+    loc_el = _itemprop(scope, "jobLocation")
+    location = ""
+    if loc_el is not None:
+        addr = _itemprop(loc_el, "address") or loc_el
+        parts = [_microdata_value(_itemprop(addr, k)) for k in ("addressLocality", "addressRegion", "addressCountry")]
+        location = ", ".join([p for p in parts if p]) or loc_el.get_text(" ", strip=True)
+    desc_el = _itemprop(scope, "description")
+    return {
+        "title": _microdata_value(_itemprop(scope, "title")),
+        "company": _microdata_value(_itemprop(scope, "hiringOrganization")),
+        "location": location,
+        "remote": "TELECOMMUTE" in _microdata_value(_itemprop(scope, "jobLocationType")).upper(),
+        "employment_type": _microdata_value(_itemprop(scope, "employmentType")),
+        "skills": _as_list(_microdata_value(_itemprop(scope, "skills"))),
+        "description": html_to_lines(desc_el.decode_contents()) if desc_el is not None else "",
+    }
+
+def find_job_posting(page) -> Optional[Dict[str, Any]]:
+    """Return the first JobPosting found in `page` (HTML string or soup), or None.
+
+    A posting only counts when it has both a title and a description.
+    """
+    soup = page if isinstance(page, BeautifulSoup) else BeautifulSoup(page or "", "html.parser")
+    for finder in (_from_json_ld, _from_microdata):
+        posting = finder(soup)
+        if posting and posting["title"] and posting["description"]:
+            return posting
+    return None
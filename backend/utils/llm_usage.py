@@ -0,0 +1,212 @@
+# backend/utils/llm_usage.py
+import os, atexit, logging, threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, time as dt_time
+from typing import Any, Iterator, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+from .db_routing import request_user_id
+
+logger = logging.getLogger(__name__)
+
+# Ledger of LLM calls (core.LLMUsage). ai.provider calls record() after
+# every completion, successful or not, with the token counts from
+# resp.usage. The calling user and endpoint come from a per-request scope
+# that LLMUsageMiddleware sets (session/JWT user id, no DB query; the URL
+# route once resolved). Management commands open their own with scope().
+#
+# record() only appends to an in-process buffer. A daemon thread inserts
+# the buffer with one bulk_create every LLM_USAGE_FLUSH_SECONDS, or as soon
+# as LLM_USAGE_BATCH_SIZE rows are waiting, so a request never waits on the
+# ledger. What's left is flushed at exit. If the database is unreachable
+# the buffer is capped at 10 batches, and the oldest rows are dropped with
+# a warning.
+#
+# Per-user quotas: tokens_today() sums today's ledger rows for a user (one
+# indexed query, cached LLM_QUOTA_CACHE_SECONDS), and over_quota() compares
+# that with LLM_DAILY_TOKEN_QUOTA. Rows still in the buffer aren't counted
+# yet, so a quota can be overshot by a few seconds' worth of calls.
+
+
+class _Scope:
+    __slots__ = ("user_id", "endpoint")
+
+    def __init__(self, user_id: Optional[int] = None, endpoint: str = ""):
+        self.user_id = user_id
+        self.endpoint = endpoint
+
+
+_scope: ContextVar[Optional[_Scope]] = ContextVar("llm_usage_scope", default=None)
+
+
+def current() -> Optional[_Scope]:
+    return _scope.get()
+
+
+@contextmanager
+def scope(user_id: Optional[int] = None, endpoint: str = ""):
+    token = _scope.set(_Scope(user_id, endpoint))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def bound(iterator: Iterator[Any], user_id: Optional[int] = None) -> Iterator[Any]:
+    """Run a streaming response's generator under the request's scope (it is
+    consumed after the middleware has returned), optionally with the user
+    DRF authenticated."""
+    outer = _scope.get()
+    if user_id is not None:
+        outer = _Scope(user_id, outer.endpoint if outer else "")
+
+    def run():
+        token = _scope.set(outer)
+        try:
+            yield from iterator
+        finally:
+            _scope.reset(token)
+    return run()
+
+
+def _enabled() -> bool:
+    return getattr(settings, "LLM_USAGE_ENABLED", True)
+
+
+class _Writer:
+    def __init__(self):
+        self._rows = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, row) -> None:
+        batch = int(getattr(settings, "LLM_USAGE_BATCH_SIZE", 100))
+        with self._lock:
+            self._rows.append(row)
+            if len(self._rows) > 10 * batch:
+                dropped = len(self._rows) - 10 * batch
+                del self._rows[:dropped]
+                logger.warning("llm usage buffer full, dropped %d row(s)", dropped)
+            pending = len(self._rows)
+            self._ensure_thread()
+        if pending >= batch:
+            self._wake.set()
+
+    def _ensure_thread(self) -> None:
+        # started lazily, so a preforking server starts one per worker
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._loop, name="llm-usage-writer", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        interval = float(getattr(settings, "LLM_USAGE_FLUSH_SECONDS", 5))
+        while True:
+            self._wake.wait(interval)
+            self._wake.clear()
+            close_old_connections()
+            self.flush()
+
+    def flush(self) -> int:
+        from core.models import LLMUsage
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        try:
+            LLMUsage.objects.bulk_create(rows, batch_size=int(getattr(settings, "LLM_USAGE_BATCH_SIZE", 100)))
+        except Exception:
+            logger.exception("llm usage: could not write %d row(s)", len(rows))
+            return 0
+        return len(rows)
+
+
+_writer = _Writer()
+flush = _writer.flush
+atexit.register(lambda: _writer.flush())
+
+
+def record(operation: str, model: str, latency_ms: float, prompt_tokens: int = 0, completion_tokens: int = 0,
+           cached_tokens: int = 0, estimated: bool = False, first_token_ms: Optional[float] = None,
+           error: str = "") -> None:
+    if not _enabled():
+        return
+    from core.models import LLMUsage
+    s = _scope.get()
+    _writer.add(LLMUsage(
+        user_id=s.user_id if s else None, endpoint=(s.endpoint if s else "")[:100], operation=operation[:40],
+        model=(model or "")[:100], prompt_tokens=prompt_tokens or 0, completion_tokens=completion_tokens or 0,
+        cached_tokens=cached_tokens or 0, estimated=estimated, latency_ms=round(latency_ms, 1),
+        first_token_ms=None if first_token_ms is None else round(first_token_ms, 1),
+        ok=not error, error=error[:100], created_at=timezone.now(),
+    ))
+    if not getattr(settings, "LLM_USAGE_ASYNC", True):
+        _writer.flush()
+
+
+def usage_counts(usage) -> dict:
+    """prompt/completion/cached token counts from an OpenAI `usage` (object,
+    or a plain dict when the SDK doesn't model it, e.g. on stream chunks)."""
+    def get(obj, name):
+        return (obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)) or 0
+    details = get(usage, "prompt_tokens_details")
+    return {
+        "prompt_tokens": get(usage, "prompt_tokens"),
+        "completion_tokens": get(usage, "completion_tokens"),
+        "cached_tokens": get(details, "cached_tokens") if details else 0,
+    }
+
+
+def tokens_today(user_id) -> int:
+    from django.db.models import Sum
+    from core.models import LLMUsage
+    key = f"llm:tokens:{user_id}:{timezone.localdate():%Y%m%d}"
+    total = cache.get(key)
+    if total is None:
+        start = timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.min))
+        agg = LLMUsage.objects.filter(user_id=user_id, created_at__gte=start).aggregate(
+            p=Sum("prompt_tokens"), c=Sum("completion_tokens"))
+        total = (agg["p"] or 0) + (agg["c"] or 0)
+        cache.set(key, total, int(getattr(settings, "LLM_QUOTA_CACHE_SECONDS", 30)))
+    return total
+
+
+def over_quota(user_id=None) -> bool:
+    """True when the user (default: the current scope's) used up LLM_DAILY_TOKEN_QUOTA today."""
+    quota = int(getattr(settings, "LLM_DAILY_TOKEN_QUOTA", 0))
+    if quota <= 0:
+        return False
+    if user_id is None:
+        s = _scope.get()
+        user_id = s.user_id if s else None
+    if user_id is None:
+        return False   # anonymous callers are metered by utils/cost_throttle.py
+    return tokens_today(user_id) >= quota
+
+
+class LLMUsageMiddleware:
+    """Must come after SessionMiddleware (reads the session user id)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        uid = request_user_id(request)
+        token = _scope.set(_Scope(int(uid) if uid and uid.isdigit() else None, request.path))
+        try:
+            return self.get_response(request)
+        finally:
+            _scope.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        s = _scope.get()
+        match = getattr(request, "resolver_match", None)
+        if s is not None and match is not None and match.route:
+            s.endpoint = match.route
+        return None
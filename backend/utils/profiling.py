@@ -0,0 +1,114 @@
+# backend/utils/profiling.py
+import io, time, random, logging, cProfile, pstats
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+try:
+    from pyinstrument import Profiler
+except Exception:
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+# Profile single requests on demand. A staff user triggers it with the
+# `X-Profile: 1` header or a `_profile=1` query flag; PROFILE_SAMPLE_RATE
+# additionally profiles a random share of all requests. The result is saved
+# as a core.RequestProfile and downloaded from the admin. pyinstrument (a
+# sampling profiler, HTML call tree) is used when installed, otherwise
+# cProfile text output.
+
+HEADER = "HTTP_X_PROFILE"
+QUERY_FLAG = "_profile="
+
+
+def _trigger(request):
+    if request.META.get(HEADER):
+        return "header"
+    if QUERY_FLAG in request.META.get("QUERY_STRING", ""):
+        return "query" if request.GET.get("_profile") not in (None, "", "0") else None
+    return None
+
+
+def _staff_user(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user if user.is_staff else None
+    # API calls authenticate with JWT inside the DRF view; check it here too
+    try:
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        auth = JWTAuthentication().authenticate(request)
+    except Exception:
+        return None
+    return auth[0] if auth and auth[0].is_staff else None
+
+
+class ProfilingMiddleware:
+    """Must come after AuthenticationMiddleware so session staff users are seen."""
+
+    def __init__(self, get_response):
+        self.sample_rate = float(getattr(settings, "PROFILE_SAMPLE_RATE", 0) or 0)
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger = _trigger(request)
+        user = None
+        if trigger:
+            user = _staff_user(request)
+            if user is None:
+                trigger = None
+        if trigger is None and self.sample_rate and random.random() < self.sample_rate:
+            trigger = "sample"
+        if trigger is None:
+            return self.get_response(request)
+        return self._profiled(request, trigger, user)
+
+    def _profiled(self, request, trigger, user):
+        try:
+            if Profiler is not None:
+                prof = Profiler(interval=float(getattr(settings, "PROFILE_INTERVAL", 0.001)))
+                prof.start()
+            else:
+                prof = cProfile.Profile()
+                prof.enable()
+        except (RuntimeError, ValueError):   # another profiler already active
+            return self.get_response(request)
+
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            if Profiler is None:
+                prof.disable()
+            else:
+                prof.stop()
+        duration_ms = (time.perf_counter() - t0) * 1000
+
+        if Profiler is not None:
+            fmt, data = "html", prof.output_html().encode()
+        else:
+            buf = io.StringIO()
+            pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(80)
+            fmt, data = "pstats", buf.getvalue().encode()
+        try:
+            saved = self._save(request, response, trigger, user, duration_ms, fmt, data)
+            response["X-Profile-Id"] = str(saved.pk)
+        except Exception:
+            logger.exception("could not store request profile for %s", request.path)
+        return response
+
+    def _save(self, request, response, trigger, user, duration_ms, fmt, data):
+        from core.models import RequestProfile
+        if user is None:
+            u = getattr(request, "user", None)
+            user = u if u is not None and u.is_authenticated else None
+        saved = RequestProfile.objects.create(
+            user=user, method=request.method, path=request.get_full_path()[:500],
+            status_code=response.status_code, duration_ms=duration_ms,
+            trigger=trigger, fmt=fmt, data=data,
+        )
+        keep = int(getattr(settings, "PROFILE_KEEP", 200))
+        stale = RequestProfile.objects.order_by("-created_at").values_list("pk", flat=True)[keep:]
+        RequestProfile.objects.filter(pk__in=list(stale)).delete()
+        return saved
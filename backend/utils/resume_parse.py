@@ -1,5 +1,243 @@
+import time, logging, threading, multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# PDFs go down a ladder until one rung yields text:
+#   fast      pdfminer with no layout analysis (chars in stream order, a
+#             linear pass adds line breaks and spaces), capped in pages
+#             and time; pages run in parallel when a pool is configured
+#   layout    pdfminer's default full layout analysis, whole document
+#   pypdf     a different parser, for files pdfminer chokes on
+# The whole ladder shares one RESUME_PDF_TIMEOUT budget per document. With
+# RESUME_PDF_WORKERS > 0 all pdfminer work, page counting included, runs in
+# the pool and is waited on with that deadline, so a hostile file can't hold
+# the web worker; pages that miss it are dropped and the pool is retired.
+# With RESUME_PDF_WORKERS=0, the default, pdfminer runs in the request
+# thread, like the pypdf rung always does, and the deadline is only checked
+# between pages: one pathological page can still overrun it. The pool is
+# opt-in because every web worker would start its own, and each process in
+# it is a full interpreter with pdfminer loaded.
+#
+# The pool is shared by concurrent requests. A retired pool gets no new
+# work, and its processes are killed only once the last request using it
+# is done, so one slow file never breaks another request's pages.
+
+MIN_CHARS = 20   # less than this (non-space) counts as "no text"
+_pool: Optional["_Pool"] = None
+_pool_lock = threading.Lock()
+
+
+def _pages(fp, page_numbers: Optional[List[int]], max_pages: int):
+    from pdfminer.pdfpage import PDFPage
+    return PDFPage.get_pages(fp, pagenos=set(page_numbers) if page_numbers is not None else None,
+                             maxpages=max_pages)
+
+
+def _fast_pages_text(path: str, page_numbers: Optional[List[int]] = None, max_pages: int = 0,
+                     deadline: Optional[float] = None) -> str:
+    """pdfminer without layout analysis: characters in content-stream order,
+    with a newline on a baseline jump and a space on a horizontal gap."""
+    import io
+    from pdfminer.converter import PDFLayoutAnalyzer
+    from pdfminer.layout import LTChar, LTContainer
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+
+    out = io.StringIO()
+
+    def chars(items):
+        # text drawn by Form XObjects arrives nested in LTFigure
+        for item in items:
+            if isinstance(item, LTChar):
+                yield item
+            elif isinstance(item, LTContainer):
+                yield from chars(item)
+
+    class Device(PDFLayoutAnalyzer):
+        def receive_layout(self, ltpage):
+            prev = None
+            for item in chars(ltpage):
+                ch = item.get_text()
+                if prev is not None:
+                    if abs(item.y0 - prev.y0) > prev.height * 0.5:
+                        out.write("\n")
+                    elif item.x0 - prev.x1 > prev.width * 0.3 and ch != " " and prev.get_text() != " ":
+                        out.write(" ")
+                out.write(ch)
+                prev = item
+            out.write("\n\f")
+
+    rsrc = PDFResourceManager()
+    interpreter = PDFPageInterpreter(rsrc, Device(rsrc, laparams=None))
+    with open(path, "rb") as fp:
+        for n, page in enumerate(_pages(fp, page_numbers, max_pages)):
+            if deadline is not None and time.monotonic() > deadline:
+                logger.warning("resume pdf %s: fast path hit the deadline after %d page(s)", path, n)
+                break
+            interpreter.process_page(page)
+    return out.getvalue()
+
+
+def _layout_pages_text(path: str, max_pages: int, deadline: Optional[float] = None) -> str:
+    """pdfminer's full layout analysis (what high_level.extract_text does),
+    page by page so a deadline can be checked in between."""
+    import io
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+
+    out = io.StringIO()
+    rsrc = PDFResourceManager()
+    device = TextConverter(rsrc, out, laparams=LAParams())
+    interpreter = PDFPageInterpreter(rsrc, device)
+    with open(path, "rb") as fp:
+        for n, page in enumerate(_pages(fp, None, max_pages)):
+            if deadline is not None and time.monotonic() > deadline:
+                logger.warning("resume pdf %s: layout pass hit the deadline after %d page(s)", path, n)
+                break
+            interpreter.process_page(page)
+    device.close()
+    return out.getvalue()
+
+
+def _page_count(path: str, cap: int) -> int:
+    with open(path, "rb") as fp:
+        return sum(1 for _ in _pages(fp, None, cap))
+
+
+class _Pool:
+    def __init__(self, workers: int):
+        # spawn: forking a threaded web worker is unsafe
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.users = 0
+        self.retired = False
+
+    def kill(self) -> None:
+        for proc in list(getattr(self.executor, "_processes", {}).values()):   # no public kill API
+            proc.terminate()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+@contextmanager
+def _lease_pool(workers: int):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _Pool(workers)
+        pool = _pool
+        pool.users += 1
+    try:
+        yield pool
+    except BrokenProcessPool:
+        _retire_pool(pool)   # a worker died; don't hand the pool out again
+        raise
+    finally:
+        with _pool_lock:
+            pool.users -= 1
+            kill = pool.retired and pool.users == 0
+        if kill:
+            pool.kill()
+
+
+def _retire_pool(pool: _Pool) -> None:
+    """Stop handing out a pool with stuck tasks; the next request gets fresh
+    processes, and the old ones are killed when their last user is done."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+        pool.retired = True
+
+
+def _run_in_pool(pool: _Pool, deadline: float, fn, *args):
+    fut = pool.executor.submit(fn, *args)
+    done, _ = wait([fut], timeout=max(0.0, deadline - time.monotonic()))
+    if not done:
+        _retire_pool(pool)
+        raise TimeoutError(f"{fn.__name__} missed the deadline")
+    return fut.result()
+
+
+def _pdf_fast(path: str, max_pages: int, timeout: float, workers: int) -> str:
+    deadline = time.monotonic() + timeout
+    if workers <= 0:
+        return _fast_pages_text(path, max_pages=max_pages, deadline=deadline)
+
+    with _lease_pool(workers) as pool:
+        pages = list(range(_run_in_pool(pool, deadline, _page_count, path, max_pages)))
+        if not pages:
+            return ""
+        # contiguous slices, so each process parses the file once and order is kept
+        size = -(-len(pages) // workers)
+        slices = [pages[i:i + size] for i in range(0, len(pages), size)]
+        futures = [pool.executor.submit(_fast_pages_text, path, sl) for sl in slices]
+        done, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        for fut in done:
+            if fut.exception() is not None:
+                raise fut.exception()
+        if pending:
+            missed = sum(len(sl) for sl, fut in zip(slices, futures) if fut in pending)
+            logger.warning("resume pdf %s: %d page(s) missed the %.0fs deadline", path, missed, timeout)
+            _retire_pool(pool)
+        return "\n".join(fut.result() for fut in futures if fut in done)
+
+
+def _pdf_layout(path: str, max_pages: int, timeout: float, workers: int) -> str:
+    deadline = time.monotonic() + timeout
+    if workers <= 0:
+        return _layout_pages_text(path, max_pages, deadline)
+    with _lease_pool(workers) as pool:
+        return _run_in_pool(pool, deadline, _layout_pages_text, path, max_pages)
+
+
+def _pdf_pypdf(path: str, max_pages: int, timeout: float, workers: int) -> str:
+    from pypdf import PdfReader
+    reader = PdfReader(path, strict=False)
+    deadline = time.monotonic() + timeout
+    out = []
+    for page in reader.pages[:max_pages]:
+        if time.monotonic() > deadline:
+            break
+        out.append(page.extract_text() or "")
+    return "\n".join(out)
+
+
+PDF_LADDER = (("fast", _pdf_fast), ("layout", _pdf_layout), ("pypdf", _pdf_pypdf))
+
+
+def extract_pdf_text(path: str) -> str:
+    max_pages = int(getattr(settings, "RESUME_PDF_MAX_PAGES", 10))
+    timeout = float(getattr(settings, "RESUME_PDF_TIMEOUT", 8))
+    workers = int(getattr(settings, "RESUME_PDF_WORKERS", 0))
+    deadline = time.monotonic() + timeout
+    for name, rung in PDF_LADDER:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.warning("resume pdf %s: %.0fs budget spent before the %s rung", path, timeout, name)
+            break
+        t0 = time.perf_counter()
+        try:
+            text = rung(path, max_pages, remaining, workers)
+        except ImportError as e:
+            logger.info("resume pdf %s: %s rung unavailable (%s)", path, name, e)
+            continue
+        except Exception as e:
+            logger.warning("resume pdf %s: %s rung failed: %s: %s", path, name, e.__class__.__name__, e)
+            continue
+        chars = len("".join(text.split()))
+        if chars >= MIN_CHARS:
+            logger.info("resume pdf %s: %s rung, %d chars in %.0f ms", path, name, chars, (time.perf_counter() - t0) * 1000)
+            return text
+        logger.info("resume pdf %s: %s rung found no text", path, name)
+    logger.warning("resume pdf %s: no text extracted (scanned or broken?)", path)
+    return ""
+
+
 def extract_text_from_file(path: str) -> str:
     p = Path(path)
     text = ""
@@ -9,10 +247,10 @@ def extract_text_from_file(path: str) -> str:
             d = Document(str(p))
             text = "\n".join([para.text for para in d.paragraphs])
         elif p.suffix.lower() in ['.pdf']:
-            from pdfminer.high_level import extract_text
-            text = extract_text(str(p))
+            text = extract_pdf_text(str(p))
         else:
             text = ""
     except Exception:
+        logger.exception("resume parse failed for %s", path)
         text = ""
     return text or ""
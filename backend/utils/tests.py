@@ -0,0 +1,383 @@
+# backend/utils/tests.py
+import io, os, shutil, tempfile
+from datetime import date, timedelta
+from unittest import mock
+from bs4 import BeautifulSoup
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from bench import fake_jobboard
+from core.models import LLMUsage, LLMUsageDaily
+from docs_app.models import GeneratedDoc, Resume
+from jobs import serializers as job_serializers
+from jobs import views as job_views
+from jobs.models import Application, Company, JobPosting
+from . import ats, compression, cost_throttle, db_routing, fast_json, llm_usage, resume_parse
+from .values_serializer import ValuesListSerializer
+
+FIXTURES = fake_jobboard.load_fixtures()
+
+
+class ATSAdapterTests(SimpleTestCase):
+    """Adapters against recorded API responses served by bench/fake_jobboard.py."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = fake_jobboard.serve(0)
+        base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.settings = override_settings(ATS_API_BASES={k: base for k in ("greenhouse", "lever", "ashby", "workday")})
+        cls.settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        cls.server.shutdown()
+        super().tearDownClass()
+
+    def fetch(self, name):
+        posting = ats.fetch_posting(FIXTURES[name]["url"])
+        self.assertIsNotNone(posting)
+        return posting
+
+    def test_greenhouse(self):
+        p = self.fetch("greenhouse")
+        self.assertEqual(p["title"], "Backend Engineer, Payments")
+        self.assertEqual(p["company"], "Acme Robotics")
+        self.assertEqual(p["location"], "Remote - US")
+        self.assertTrue(p["remote"])
+        self.assertIn("3+ years of experience with Python and Django", p["description"].splitlines())
+
+    def test_lever(self):
+        p = self.fetch("lever")
+        self.assertEqual(p["title"], "Senior Platform Engineer")
+        self.assertEqual(p["company"], "Northwind")
+        self.assertEqual((p["location"], p["remote"], p["employment_type"]), ("Berlin", False, "Full-time"))
+        lines = p["description"].splitlines()
+        self.assertIn("What you bring", lines)
+        self.assertIn("Experience with Go or Rust in production", lines)
+
+    def test_ashby(self):
+        p = self.fetch("ashby")
+        self.assertEqual(p["title"], "Software Engineering Intern")
+        self.assertEqual(p["company"], "Lumen Labs")
+        self.assertEqual((p["location"], p["remote"], p["employment_type"]), ("Remote (US)", True, "Intern"))
+        self.assertIn("Currently pursuing a degree in Computer Science or similar", p["description"].splitlines())
+
+    def test_workday(self):
+        p = self.fetch("workday")
+        self.assertEqual(p["title"], "Data Engineer")
+        self.assertEqual(p["company"], "Globex Corporation")
+        self.assertEqual((p["location"], p["remote"], p["employment_type"]), ("Austin, TX", False, "Full time"))
+        self.assertIn("Experience with Spark and SQL on large datasets", p["description"].splitlines())
+
+    def test_api_errors_return_none(self):
+        for url in ("https://boards.greenhouse.io/broken/jobs/1",
+                    "https://jobs.lever.co/garbled/5f2c1a9e-7b3d-4e6f-9a10-2b3c4d5e6f70",
+                    "https://jobs.ashbyhq.com/broken/0b9d6c2e-1f4a-4c8b-8e21-7d3f5a6b9c10",
+                    "https://jobs.ashbyhq.com/lumen-labs/00000000-0000-4000-8000-000000000000",
+                    "https://broken.wd1.myworkdayjobs.com/External/job/Remote/Engineer_R-1"):
+            with self.subTest(url=url):
+                self.assertIsNone(ats.fetch_posting(url))
+
+    def test_unknown_url_has_no_adapter(self):
+        self.assertEqual(ats.find_adapter("https://example.com/careers/123"), (None, None))
+
+    def test_api_error_falls_through_to_the_page(self):
+        page = BeautifulSoup("<html><body><p>Backend Engineer</p><p>Python required</p></body></html>", "html.parser")
+        with mock.patch.object(job_views, "_fetch_soup", return_value=page) as fetch_soup:
+            posting, text = job_views._fetch_url("https://boards.greenhouse.io/broken/jobs/1")
+        fetch_soup.assert_called_once_with("https://boards.greenhouse.io/broken/jobs/1")
+        self.assertIsNone(posting)
+        self.assertEqual(text, "Backend Engineer Python required")
+
+    @override_settings(AI_PROVIDER="heuristic")
+    def test_extract_view_uses_the_adapter(self):
+        with mock.patch.object(job_views, "_fetch_soup") as fetch_soup:
+            r = APIClient().post("/api/jobs/extract/", {"url": FIXTURES["ashby"]["url"]}, format="json")
+        fetch_soup.assert_not_called()
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json()["title"], "Software Engineering Intern")
+        self.assertEqual(r.json()["company"], "Lumen Labs")
+        self.assertEqual(r.json()["location"], "Remote")
+        self.assertEqual(r.json()["seniority"], "Intern/Co-op")
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_matches_drf_output(self):
+        data = {"title": "Engineer\u2028Team\u2029", "notes": "caf\u00e9 \u2014 \"quoted\"", "n": [1, 2.5, None, True]}
+        self.assertEqual(fast_json.ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+@override_settings(AI_PROVIDER="heuristic", EXTRACT_BUDGET_IP=10, EXTRACT_HARD_LIMIT=2,
+                   EXTRACT_COSTS={"base": 1, "kchar": 1, "fetch": 5, "llm": 20})
+class CostBudgetTests(TestCase):
+    JD = "Backend Engineer\nRequirements:\n- Python required\n" + "x" * 1500   # 1 + 2 units
+
+    def setUp(self):
+        cache.clear()
+
+    def extract(self, **extra):
+        return APIClient().post("/api/jobs/extract/", {"jd_text": self.JD}, format="json", **extra)
+
+    def test_calls_are_charged_by_size(self):
+        r = self.extract()
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r["X-Cost-Budget"], "10")
+        self.assertEqual(r["X-Cost-Remaining"], "7")
+
+    def test_forwarded_for_does_not_reset_the_budget(self):
+        self.extract(HTTP_X_FORWARDED_FOR="203.0.113.1")
+        r = self.extract(HTTP_X_FORWARDED_FOR="203.0.113.2")
+        self.assertEqual(r["X-Cost-Remaining"], "4")
+
+    def test_hard_limit_returns_429(self):
+        for _ in range(6):   # 18 units: past the 10 unit budget, within 2x
+            self.assertEqual(self.extract().status_code, 200)
+        r = self.extract()
+        self.assertEqual(r.status_code, 429)
+        self.assertGreater(int(r["Retry-After"]), 0)
+        self.assertEqual(r["X-Cost-Remaining"], "0")
+
+    def test_optional_stage_is_refunded_when_it_does_not_fit(self):
+        budget = cost_throttle.CostBudget(RequestFactory().post("/api/jobs/extract/"))
+        self.assertEqual(budget.charge(5), 5)
+        self.assertFalse(budget.try_charge("llm"))
+        self.assertEqual(budget.charge(0), 5)
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def respond(self, content_type):
+        body = b'{"jd": "%s"}' % (b"python " * 400)
+        middleware = compression.CompressionMiddleware(lambda request: HttpResponse(body, content_type=content_type))
+        return middleware(RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip"))
+
+    def test_json_is_compressed(self):
+        r = self.respond("application/json")
+        self.assertEqual(r["Content-Encoding"], "gzip")
+        self.assertEqual(r["Vary"], "Accept-Encoding")
+
+    def test_html_is_left_alone(self):
+        self.assertFalse(self.respond("text/html; charset=utf-8").has_header("Content-Encoding"))
+
+
+class ResumePdfTests(SimpleTestCase):
+    def make_pdf(self, pages):
+        from reportlab.pdfgen import canvas
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        c = canvas.Canvas(path)
+        for n in range(pages):
+            c.drawString(72, 720, f"Page {n + 1}: Python, Django and PostgreSQL experience")
+            c.showPage()
+        c.save()
+        return path
+
+    def test_default_parses_in_the_request_thread(self):
+        with mock.patch.object(resume_parse, "_Pool") as pool:
+            text = resume_parse.extract_pdf_text(self.make_pdf(2))
+        pool.assert_not_called()
+        self.assertIn("Page 1: Python, Django and PostgreSQL experience", text)
+        self.assertIn("Page 2:", text)
+
+    @override_settings(RESUME_PDF_MAX_PAGES=2)
+    def test_page_cap(self):
+        text = resume_parse.extract_pdf_text(self.make_pdf(4))
+        self.assertIn("Page 2:", text)
+        self.assertNotIn("Page 3:", text)
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"], REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTests(SimpleTestCase):
+    # not TestCase: its per-test transaction would keep every read on the primary
+    databases = {"default"}
+
+    def setUp(self):
+        cache.clear()
+        self.router = db_routing.ReplicaRouter()
+        self.user, self.other = User(id=7, username="writer"), User(id=8, username="reader")
+
+    def call(self, method, user=None, write=False):
+        """Run a request through the middleware; returns where its reads went (before, after a write)."""
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(User))
+            if write:
+                self.router.db_for_write(User)
+                seen.append(self.router.db_for_read(User))
+            return HttpResponse("ok")
+
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"} if user else {}
+        request = getattr(RequestFactory(), method.lower())("/api/jobs/", **headers)
+        db_routing.ReplicaRoutingMiddleware(view)(request)
+        return seen
+
+    def test_safe_requests_read_a_replica(self):
+        self.assertEqual(self.call("GET"), ["replica1"])
+        self.assertEqual(self.call("GET", self.user), ["replica1"])
+        self.assertEqual(self.call("POST", self.user), ["default"])
+
+    def test_writer_is_pinned_to_the_primary(self):
+        self.call("POST", self.user)
+        self.assertEqual(self.call("GET", self.user), ["default"])
+        self.assertEqual(self.call("GET", self.other), ["replica1"])
+        cache.delete(db_routing.PIN_PREFIX + str(self.user.id))   # the sticky window ran out
+        self.assertEqual(self.call("GET", self.user), ["replica1"])
+
+    def test_write_inside_a_get_moves_later_reads_and_pins(self):
+        self.assertEqual(self.call("GET", self.user, write=True), ["replica1", "default"])
+        self.assertEqual(self.call("GET", self.user), ["default"])
+
+    def test_outside_a_request_and_in_transactions_reads_the_primary(self):
+        self.assertEqual(self.router.db_for_read(User), "default")
+        seen = []
+
+        def view(request):
+            with transaction.atomic():
+                seen.append(self.router.db_for_read(User))
+            return HttpResponse("ok")
+        db_routing.ReplicaRoutingMiddleware(view)(RequestFactory().get("/"))
+        self.assertEqual(seen, ["default"])
+
+
+class ValuesListSerializerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("u", password="pw")
+        acme = Company.objects.create(user=self.user, name="Acme", website="https://acme.example")
+        plain = Company.objects.create(user=self.user, name="Plain")
+        for company, title in ((acme, "Backend Engineer"), (plain, "Data Engineer ✓")):
+            job = JobPosting.objects.create(user=self.user, company=company, title=title, jd_raw="Python " * 100,
+                                            jd_struct={"skills": ["Python"], "n": 1.5}, url="https://x.example/1")
+            Application.objects.create(job=job, stage="oa", next_action_due=date(2026, 3, 1), notes="ok")
+            GeneratedDoc.objects.create(user=self.user, job=job, kind="bullets", content_md="- did things")
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        media = override_settings(MEDIA_ROOT=self.media)
+        media.enable()
+        self.addCleanup(media.disable)
+        resume = Resume(user=self.user, label="Base", parsed_text="Python")
+        resume.file.save("cv.pdf", ContentFile(b"%PDF"), save=True)
+
+    def pairs(self):
+        s = job_serializers
+        return [(s.JobPostingListSerializer, s.JobPostingSerializer, JobPosting.objects.select_related("company")),
+                (s.ApplicationListSerializer, s.ApplicationSerializer, Application.objects.all()),
+                (s.CompanyListSerializer, s.CompanySerializer, Company.objects.all()),
+                (s.ResumeListSerializer, s.ResumeSerializer, Resume.objects.all()),
+                (s.GeneratedDocListSerializer, s.GeneratedDocSerializer, GeneratedDoc.objects.all())]
+
+    def test_output_matches_the_model_serializer(self):
+        request = RequestFactory().get("/api/resume/")
+        for fast, slow, qs in self.pairs():
+            for context in ({}, {"request": request}):
+                with self.subTest(serializer=fast.__name__, request=bool(context)):
+                    expected = slow(qs.order_by("id"), many=True, context=context).data
+                    got = fast(qs.order_by("id"), context=context).data
+                    self.assertEqual(JSONRenderer().render(got), JSONRenderer().render(expected))
+
+    def test_lists_can_leave_out_compressed_text(self):
+        rows = job_serializers.JobPostingListSerializer(JobPosting.objects.order_by("id"), full=False).data
+        self.assertNotIn("jd_raw", rows[0])
+        self.assertEqual(rows[0]["jd_struct"], {"skills": ["Python"], "n": 1.5})
+
+    def test_fields_needing_an_instance_are_refused(self):
+
+        class WithMethod(job_serializers.CompanySerializer):
+            upper = serializers.SerializerMethodField()
+
+            class Meta(job_serializers.CompanySerializer.Meta):
+                fields = [*job_serializers.CompanySerializer.Meta.fields, "upper"]
+
+            def get_upper(self, obj):
+                return obj.name.upper()
+
+        class Fast(ValuesListSerializer):
+            serializer_class = WithMethod
+
+        with self.assertRaises(ImproperlyConfigured):
+            Fast(Company.objects.all()).data
+
+
+@override_settings(LLM_USAGE_ENABLED=True, LLM_USAGE_ASYNC=True, LLM_USAGE_BATCH_SIZE=100)
+class LLMUsageLedgerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        llm_usage.flush()
+        # the writer thread would flush on its own connection; the tests flush by hand
+        patcher = mock.patch.object(llm_usage._Writer, "_ensure_thread")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def usage(self, user_id, prompt, completion, days_ago=0, **kw):
+        return LLMUsage.objects.create(user_id=user_id, operation="extract", model="gpt-4o-mini",
+                                       prompt_tokens=prompt, completion_tokens=completion, latency_ms=100,
+                                       created_at=timezone.now() - timedelta(days=days_ago), **kw)
+
+    def test_record_is_buffered_until_flush(self):
+        with llm_usage.scope(user_id=5, endpoint="cmd:reextract_jobs"):
+            for _ in range(3):
+                llm_usage.record("extract", "gpt-4o-mini", 12.34, prompt_tokens=10, completion_tokens=2)
+        self.assertFalse(LLMUsage.objects.exists())
+        self.assertEqual(llm_usage.flush(), 3)
+        row = LLMUsage.objects.first()
+        self.assertEqual((row.user_id, row.endpoint, row.prompt_tokens, row.latency_ms),
+                         (5, "cmd:reextract_jobs", 10, 12.3))
+        self.assertEqual(llm_usage.flush(), 0)
+
+    @override_settings(LLM_USAGE_BATCH_SIZE=2)
+    def test_full_batch_wakes_the_writer_and_buffer_is_capped(self):
+        llm_usage._writer._wake.clear()
+        llm_usage.record("extract", "m", 1)
+        self.assertFalse(llm_usage._writer._wake.is_set())
+        llm_usage.record("extract", "m", 1)
+        self.assertTrue(llm_usage._writer._wake.is_set())
+        with self.assertLogs("utils.llm_usage", "WARNING"):
+            for _ in range(20):
+                llm_usage.record("extract", "m", 1)
+        self.assertEqual(llm_usage.flush(), 20)
+
+    @override_settings(LLM_USAGE_ENABLED=False)
+    def test_disabled(self):
+        llm_usage.record("extract", "m", 1)
+        self.assertEqual(llm_usage.flush(), 0)
+
+    @override_settings(LLM_USAGE_RETENTION_DAYS=90)
+    def test_rollup(self):
+        self.usage(1, 100, 20)
+        self.usage(1, 50, 10, cached_tokens=40, ok=False, error="timeout")
+        self.usage(2, 7, 3)
+        self.usage(1, 1, 1, days_ago=120)
+        for _ in range(2):   # days are rebuilt whole, so a re-run gives the same rows
+            call_command("rollup_llm_usage", stdout=io.StringIO())
+        daily = {d.user_id: d for d in LLMUsageDaily.objects.all()}
+        self.assertEqual(sorted(daily), [1, 2])
+        self.assertEqual((daily[1].calls, daily[1].errors, daily[1].cache_hits), (2, 1, 1))
+        self.assertEqual((daily[1].prompt_tokens, daily[1].completion_tokens, daily[1].cached_tokens), (150, 30, 40))
+        self.assertEqual(daily[1].latency_ms_max, 100)
+        self.assertEqual(daily[2].total_tokens, 10)
+        self.assertEqual(LLMUsage.objects.count(), 3)   # the 120-day-old row was pruned
+
+    @override_settings(LLM_DAILY_TOKEN_QUOTA=100)
+    def test_quota(self):
+        self.usage(1, 60, 50)
+        self.usage(2, 60, 30)
+        self.usage(2, 500, 0, days_ago=1)
+        self.assertTrue(llm_usage.over_quota(1))
+        self.assertFalse(llm_usage.over_quota(2))
+        with llm_usage.scope(user_id=1):
+            self.assertTrue(llm_usage.over_quota())
+        self.assertFalse(llm_usage.over_quota())   # anonymous
+        with override_settings(LLM_DAILY_TOKEN_QUOTA=0):
+            self.assertFalse(llm_usage.over_quota(1))
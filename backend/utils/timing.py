@@ -0,0 +1,159 @@
+# backend/utils/timing.py
+import time, threading, contextvars
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+
+# Per-request stage timings. Code marks stages with `with span("fetch"):`;
+# TimingMiddleware collects them into a Server-Timing header and per-process
+# Prometheus histograms served by metrics_view. With TIMING_ENABLED off the
+# middleware unloads itself and span() returns a shared no-op.
+
+_spans: contextvars.ContextVar = contextvars.ContextVar("timing_spans", default=None)
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "sink", "t0")
+
+    def __init__(self, name: str, sink: List[Tuple[str, float]]):
+        self.name, self.sink = name, sink
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.sink.append((self.name, time.perf_counter() - self.t0))
+        return False
+
+
+def span(name: str):
+    """Time a block as stage `name` of the current request (no-op outside one)."""
+    sink = _spans.get()
+    return _NOOP if sink is None else _Span(name, sink)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts: Dict[Tuple[str, ...], List[float]] = {}   # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], seconds: float) -> None:
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            row = self.counts.get(labels)
+            if row is None:
+                row = self.counts[labels] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                row[i] += 1
+            row[-2] += seconds
+            row[-1] += 1
+
+    def render(self, name: str, label_names: Tuple[str, ...], help_text: str) -> List[str]:
+        out = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        with self._lock:
+            rows = sorted((k, list(v)) for k, v in self.counts.items())
+        for labels, row in rows:
+            lbl = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(label_names, labels))
+            cum = 0
+            for le, n in zip(self.buckets, row):
+                cum += n
+                out.append(f'{name}_bucket{{{lbl},le="{le}"}} {cum}')
+            out.append(f'{name}_bucket{{{lbl},le="+Inf"}} {int(row[-1])}')
+            out.append(f"{name}_sum{{{lbl}}} {row[-2]:.6f}")
+            out.append(f"{name}_count{{{lbl}}} {int(row[-1])}")
+        return out
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+STAGE_SECONDS = Histogram()
+REQUEST_SECONDS = Histogram()
+
+
+def _view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.route or match.view_name or "unknown"
+
+
+class TimingMiddleware:
+    """Adds Server-Timing to every response and feeds the metrics histograms."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "TIMING_ENABLED", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sink: List[Tuple[str, float]] = []
+        token = _spans.set(sink)
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _spans.reset(token)
+        total = time.perf_counter() - t0
+
+        view = _view_name(request)
+        per_stage: Dict[str, float] = {}
+        for name, secs in sink:
+            per_stage[name] = per_stage.get(name, 0.0) + secs
+        for name, secs in per_stage.items():
+            STAGE_SECONDS.observe((view, name), secs)
+        REQUEST_SECONDS.observe((view, request.method, str(response.status_code)), total)
+
+        parts = [f"{name};dur={secs * 1000:.1f}" for name, secs in per_stage.items()]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        response["Server-Timing"] = ", ".join(parts)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns; time that as "render"
+        sink = _spans.get()
+        if sink is not None:
+            t0 = time.perf_counter()
+
+            def rendered(_response):
+                sink.append(("render", time.perf_counter() - t0))   # returning None keeps the response
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+def metrics_view(request):
+    """Prometheus text exposition of this process's histograms.
+
+    Closed by default: needs the METRICS_TOKEN bearer token, a staff
+    session, or DEBUG with no token configured. Otherwise a 403 when a token
+    is configured, or a 404 when none is.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    staff = getattr(getattr(request, "user", None), "is_staff", False)
+    if token:
+        if request.headers.get("Authorization", "") != f"Bearer {token}" and not staff:
+            return HttpResponseForbidden("forbidden")
+    elif not (settings.DEBUG or staff):
+        return HttpResponseNotFound("not found")
+    lines = STAGE_SECONDS.render("applymate_stage_seconds", ("view", "stage"),
+                                 "Time spent in one stage of a request.")
+    lines += REQUEST_SECONDS.render("applymate_request_seconds", ("view", "method", "status"),
+                                    "End-to-end request latency.")
+    return HttpResponse("\n".join(lines) + "\n", content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,144 @@
+# backend/utils/values_serializer.py
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, fields as drf_fields, relations, serializers
+from rest_framework.settings import api_settings
+
+# Read-only list serializers that skip per-object ModelSerializer work. The
+# readable fields of an existing ModelSerializer are compiled once into a
+# values_list() projection plus a per-column converter; each row is then one
+# tuple -> dict pass. Output matches the source serializer (same keys, order
+# and representations), so responses stay byte-identical. Fields that need an
+# instance (SerializerMethodField, source="*", properties) are refused at
+# compile time rather than silently differing.
+#
+#     class JobPostingListSerializer(ValuesListSerializer):
+#         serializer_class = JobPostingSerializer
+#
+#     Response(JobPostingListSerializer(qs).data)
+#
+# full=False leaves out compressed text columns (utils.compressed_text), so
+# list pages don't read or ship their bytes at all.
+
+# DRF fields whose representation of a DB value is the value itself
+_PASSTHROUGH = (drf_fields.CharField, drf_fields.IntegerField, drf_fields.BooleanField,
+                drf_fields.JSONField, drf_fields.ReadOnlyField, relations.PrimaryKeyRelatedField)
+
+# (key, column index or nested spec, converter or None)
+_Spec = List[Tuple[str, Any, Optional[Callable]]]
+
+
+def _datetime_converter(field, tz) -> Callable:
+    """DateTimeField.to_representation for the common case (ISO 8601, aware
+    value) with the timezone lookup hoisted out of the per-row path."""
+    slow = field.to_representation
+
+    def iso(value):
+        if tz is None or isinstance(value, str) or value.utcoffset() is None:
+            return slow(value)
+        out = value.astimezone(tz).isoformat()
+        return out[:-6] + "Z" if out.endswith("+00:00") else out
+    return iso
+
+
+def _converter(field, model_field, context, tz) -> Optional[Callable]:
+    unpack = getattr(model_field, "unpack", None)   # utils.compressed_text
+    if unpack is not None:
+        return unpack
+    if isinstance(field, drf_fields.FileField):
+        storage = model_field.storage
+        request = context.get("request")
+
+        def file_url(name):
+            if not name:
+                return None
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return file_url
+    if isinstance(field, drf_fields.DateTimeField) and not hasattr(field, "timezone"):
+        fmt = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        if fmt is not None and fmt.lower() == ISO_8601:
+            return _datetime_converter(field, tz)
+    if isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is not None:
+        return field.pk_field.to_representation
+    if isinstance(field, drf_fields.JSONField) and field.binary:
+        return field.to_representation
+    if isinstance(field, _PASSTHROUGH):
+        return None
+    return field.to_representation
+
+
+def _compile(serializer, model, prefix: str, lookups: List[str], context, tz, full: bool) -> _Spec:
+    spec: _Spec = []
+    for field in serializer._readable_fields:
+        source = field.source
+        if source == "*" or "." in source or isinstance(field, drf_fields.SerializerMethodField):
+            raise ImproperlyConfigured(f"{serializer.__class__.__name__}.{field.field_name}: needs an instance")
+        try:
+            model_field = model._meta.get_field(source)
+        except Exception:
+            raise ImproperlyConfigured(f"{serializer.__class__.__name__}.{field.field_name}: not a model field")
+        if not full and hasattr(model_field, "unpack"):
+            continue
+        if isinstance(field, serializers.BaseSerializer):
+            if getattr(field, "many", False):
+                raise ImproperlyConfigured(f"{serializer.__class__.__name__}.{field.field_name}: nested many=True")
+            # the related row is present when its pk is; DRF renders a missing one as None
+            pk_index = len(lookups)
+            lookups.append(f"{prefix}{source}")
+            nested = _compile(field, model_field.related_model, f"{prefix}{source}__", lookups, context, tz, full)
+            spec.append((field.field_name, (pk_index, nested), None))
+            continue
+        spec.append((field.field_name, len(lookups), _converter(field, model_field, context, tz)))
+        lookups.append(f"{prefix}{source}")
+    return spec
+
+
+def _build(spec: _Spec, row: tuple) -> Dict[str, Any]:
+    out = {}
+    for key, index, conv in spec:
+        if type(index) is tuple:
+            pk_index, nested = index
+            out[key] = None if row[pk_index] is None else _build(nested, row)
+            continue
+        value = row[index]
+        out[key] = value if conv is None or value is None else conv(value)
+    return out
+
+
+class ValuesListSerializer:
+    """`.data` of `serializer_class(queryset, many=True)`, built from values_list()."""
+
+    serializer_class = None
+    _compiled: Dict[Any, Tuple[List[str], _Spec]] = {}
+
+    def __init__(self, queryset, context: Optional[Dict[str, Any]] = None, full: bool = True):
+        self.queryset = queryset
+        self.context = context or {}
+        self.full = full
+
+    @classmethod
+    def _plan(cls, context, full: bool = True) -> Tuple[List[str], _Spec]:
+        # DRF renders datetimes in the *current* timezone, so plans are per zone;
+        # converters close over the request, so only context-free plans are cached
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        if context.get("request") is not None:
+            return cls._make_plan(context, tz, full)
+        plan = cls._compiled.get((cls, tz, full))
+        if plan is None:
+            plan = cls._compiled[(cls, tz, full)] = cls._make_plan(context, tz, full)
+        return plan
+
+    @classmethod
+    def _make_plan(cls, context, tz, full: bool) -> Tuple[List[str], _Spec]:
+        serializer = cls.serializer_class(context=context)
+        lookups: List[str] = []
+        spec = _compile(serializer, serializer.Meta.model, "", lookups, context, tz, full)
+        return lookups, spec
+
+    @property
+    def data(self) -> List[Dict[str, Any]]:
+        lookups, spec = self._plan(self.context, self.full)
+        return [_build(spec, row) for row in self.queryset.values_list(*lookups)]
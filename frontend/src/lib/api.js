@@ -3,7 +3,7 @@
 // - auto refresh on 401 token_not_valid for protected endpoints
 // - consistent JSON parsing + helpful errors
 
-import { getAccess, getRefresh, setTokens, clearToken } from "./auth";
+import { getAccess, getRefresh, setTokens, clearToken, SYNC } from "./auth";
 
 // Base like http://127.0.0.1:8000/api  (no trailing slash)
 const API  = (import.meta.env.VITE_API_BASE ?? "http://127.0.0.1:8000/api").replace(/\/+$/,"");
@@ -85,6 +85,7 @@ const j = (m) => (p, b, opt = {}) =>
 export const jget   = (p, opt)    => request(p, { ...opt });
 export const jpost  = j("POST");
 export const jpatch = j("PATCH");
+export const jdelete = j("DELETE");
 
 // -------------------- AUTH APIs (public; no Authorization header) --------------------
 export async function register({ username, email, password }) {
@@ -112,7 +113,7 @@ export async function login({ username, password }) {
 // -------------------- BUSINESS APIs --------------------
 // public
 export const health    = () => jget("/health/", { auth: false });
-export const extractJD = (payload) => jpost("/jobs/extract/", payload, { auth: false });
+export const extractJD = (payload) => jpost("/jobs/extract/", payload);
 
 // protected
 export const createJob = (payload) => jpost("/jobs/", payload);
@@ -123,9 +124,87 @@ export const listApps  = (job_id) => jget(`/apps/${job_id ? `?job_id=${job_id}`
 export const createApp = (payload) => jpost("/apps/", payload);
 export const updateApp = (id, payload) => jpatch(`/apps/${id}/`, payload);
 
+// Bulk writes (Applications multi-select): one request and one transaction
+// per batch, all or nothing. Resolve to { results: [...] } / { deleted: [ids] }.
+export const bulkUpdateApps = (items) => jpatch("/apps/bulk/", items);
+export const bulkDeleteApps = (ids) => jdelete("/apps/bulk/", { ids });
+
+// Delta sync: pass the cursor from the previous call (none for a full
+// snapshot). mergeChanges folds a response into { companies, jobs, ... }
+// keyed by id; on reset=true the kinds are replaced wholesale.
+export const getChanges = (since) => jget(`/changes/${since ? `?since=${encodeURIComponent(since)}` : ""}`);
+
+export function mergeChanges(state, delta) {
+  const out = { cursor: delta.cursor };
+  for (const [kind, rows] of Object.entries(delta)) {
+    if (!Array.isArray(rows)) continue;
+    const byId = new Map(delta.reset ? [] : (state?.[kind] || []).map((r) => [r.id, r]));
+    for (const id of delta.deleted?.[kind] || []) byId.delete(id);
+    for (const r of rows) byId.set(r.id, { ...byId.get(r.id), ...r });
+    out[kind] = [...byId.values()];
+  }
+  return out;
+}
+
+// The list pages read from a snapshot kept in localStorage and only fetch
+// what changed since its cursor. A cursor the server rejects (400) falls
+// back to a full snapshot. Logging out drops it (clearToken).
+export async function syncData() {
+  let state = null;
+  try { state = JSON.parse(localStorage.getItem(SYNC) || "null"); } catch { state = null; }
+  let delta;
+  try {
+    delta = await getChanges(state?.cursor);
+  } catch (e) {
+    if (!state?.cursor || !String(e.message).startsWith("HTTP 400")) throw e;
+    delta = await getChanges();
+  }
+  state = mergeChanges(state, delta);
+  try { localStorage.setItem(SYNC, JSON.stringify(state)); } catch { /* quota: keep the older snapshot and cursor */ }
+  return state;
+}
+
 export const scoreFit  = (payload) => jpost("/fit/score/", payload);
 export const genDoc    = (payload) => jpost("/docs/generate/", payload);
 
+// LLM generation over server-sent events: onToken(text) per chunk, resolves
+// with the saved doc (same shape as genDoc). POST + fetch rather than
+// EventSource so the Authorization header can be sent.
+export async function streamDoc(payload, onToken) {
+  const send = (tok) => fetch(buildUrl("/docs/generate/stream/"), {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      Accept: "text/event-stream",
+      ...(tok ? { Authorization: `Bearer ${tok}` } : {}),
+    },
+    body: JSON.stringify(payload),
+  });
+  let res = await send(getAccess());
+  if (res.status === 401) res = await send(await refreshAccess());
+  if (!res.ok) throw new Error(`HTTP ${res.status}: ${await res.text()}`);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buf = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buf += decoder.decode(value, { stream: true });
+    let cut;
+    while ((cut = buf.indexOf("\n\n")) >= 0) {
+      const block = buf.slice(0, cut);
+      buf = buf.slice(cut + 2);
+      const event = /^event: (.*)$/m.exec(block)?.[1];
+      const data = JSON.parse(/^data: (.*)$/m.exec(block)?.[1] || "{}");
+      if (event === "token") onToken?.(data.text);
+      else if (event === "done") return data;
+      else if (event === "error") throw new Error(data.detail || "Generation failed");
+    }
+  }
+  throw new Error("Stream ended early");
+}
+
 // Resumes: upload uses multipart (and token)
 export async function uploadResume(file, label = "Base Resume") {
   const form = new FormData();
@@ -144,3 +223,21 @@ export async function uploadResume(file, label = "Base Resume") {
 }
 
 export const listResumes = () => jget("/resume/");
+
+// Full backup as NDJSON (a Blob to hand to a download link), and restore of
+// such a file into the current account. Raw fetch: neither body is JSON.
+async function sendRaw(path, init) {
+  const send = (tok) => fetch(buildUrl(path), {
+    ...init,
+    headers: { ...(init.headers || {}), ...(tok ? { Authorization: `Bearer ${tok}` } : {}) },
+  });
+  let res = await send(getAccess());
+  if (res.status === 401) res = await send(await refreshAccess());
+  if (!res.ok) throw new Error(`HTTP ${res.status}: ${await res.text()}`);
+  return res;
+}
+
+export const exportData = async () => (await sendRaw("/export/", { method: "GET" })).blob();
+
+export const importData = async (file) =>
+  (await sendRaw("/import/", { method: "POST", headers: { "Content-Type": "application/x-ndjson" }, body: file })).json();
@@ -1,5 +1,5 @@
 import React, { useEffect, useState, useMemo } from 'react'
-import { listApps, listJobs, updateApp } from '../lib/api'
+import { syncData, updateApp, bulkUpdateApps, bulkDeleteApps } from '../lib/api'
 import { DragDropContext, Droppable, Draggable } from '@hello-pangea/dnd'
 
 const STAGES = ["saved","applied","oa","interview","offer","rejected"]
@@ -7,11 +7,12 @@ const STAGES = ["saved","applied","oa","interview","offer","rejected"]
 export default function Applications(){
   const [apps, setApps] = useState([])
   const [jobsById, setJobsById] = useState({})
+  const [selected, setSelected] = useState(new Set())
 
   useEffect(() => {
-    listApps().then(setApps)
-    listJobs().then(js => {
-      const map = {}; js.forEach(j => map[j.id] = j); setJobsById(map)
+    syncData().then(s => {
+      setApps([...s.applications].sort((a, b) => b.id - a.id))
+      const map = {}; s.jobs.forEach(j => map[j.id] = j); setJobsById(map)
     })
   }, [])
 
@@ -40,8 +41,52 @@ export default function Applications(){
     }
   }
 
+  const toggle = (id) => setSelected(prev => {
+    const next = new Set(prev); next.has(id) ? next.delete(id) : next.add(id); return next
+  })
+
+  // Multi-select actions go out as one bulk request (all or nothing)
+  const moveSelected = async (stage) => {
+    const ids = [...selected]
+    if (!stage || !ids.length) return
+    const before = apps
+    setApps(prev => prev.map(a => selected.has(a.id) ? {...a, stage} : a))
+    try {
+      await bulkUpdateApps(ids.map(id => ({ id, stage })))
+      setSelected(new Set())
+    } catch (e) {
+      setApps(before)
+      alert("Failed to move cards: " + e)
+    }
+  }
+
+  const deleteSelected = async () => {
+    const ids = [...selected]
+    if (!ids.length || !confirm(`Delete ${ids.length} application(s)?`)) return
+    const before = apps
+    setApps(prev => prev.filter(a => !selected.has(a.id)))
+    try {
+      await bulkDeleteApps(ids)
+      setSelected(new Set())
+    } catch (e) {
+      setApps(before)
+      alert("Failed to delete: " + e)
+    }
+  }
+
   return (
     <DragDropContext onDragEnd={onDragEnd}>
+      {selected.size > 0 && (
+        <div className="card mb-3 flex items-center gap-3">
+          <div className="text-sm">{selected.size} selected</div>
+          <select className="input max-w-[12rem]" value="" onChange={e => moveSelected(e.target.value)}>
+            <option value="">Move to…</option>
+            {STAGES.map(s => <option key={s} value={s}>{s}</option>)}
+          </select>
+          <button className="btn" onClick={deleteSelected}>Delete</button>
+          <button className="btn" onClick={() => setSelected(new Set())}>Clear</button>
+        </div>
+      )}
       <div className="grid md:grid-cols-6 gap-3">
         {STAGES.map(stage => (
           <Droppable droppableId={stage} key={stage}>
@@ -53,7 +98,10 @@ export default function Applications(){
                     {(prov) => (
                       <div ref={prov.innerRef} {...prov.draggableProps} {...prov.dragHandleProps}
                            className="p-2 mb-2 border rounded-lg bg-white">
-                        <div className="text-sm font-medium">{jobsById[a.job]?.title || '—'}</div>
+                        <label className="flex items-start gap-2">
+                          <input type="checkbox" className="mt-1" checked={selected.has(a.id)} onChange={() => toggle(a.id)} />
+                          <span className="text-sm font-medium">{jobsById[a.job]?.title || '—'}</span>
+                        </label>
                         <div className="text-xs text-gray-500">{jobsById[a.job]?.company?.name || ''}</div>
                         {a.notes && <div className="text-xs mt-1">{a.notes}</div>}
                       </div>
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react'
-import { listJobs, listApps } from '../lib/api'
+import { syncData } from '../lib/api'
 import { Link } from 'react-router-dom'
 import { BarChart, Bar, XAxis, YAxis, Tooltip, ResponsiveContainer } from 'recharts'
 
@@ -8,8 +8,10 @@ export default function Dashboard(){
   const [apps, setApps] = useState([])
 
   useEffect(() => {
-    listJobs().then(setJobs)
-    listApps().then(setApps)
+    syncData().then(s => {
+      setJobs([...s.jobs].sort((a, b) => new Date(b.created_at) - new Date(a.created_at)))
+      setApps(s.applications)
+    })
   }, [])
 
   const stageCounts = ['saved','applied','oa','interview','offer','rejected'].map(s => ({
@@ -4,7 +4,7 @@ import {
   getJob,
   listResumes,
   scoreFit,
-  genDoc,
+  streamDoc,
   listApps,
   createApp,
 } from "../lib/api";
@@ -50,12 +50,15 @@ export default function JobDetail() {
   };
 
   const generate = async (type) => {
-    const r = await genDoc({
-      job_id: Number(id),
-      resume_id: resumeId,
-      type,
-      export: true,
-    });
+    setDocs((d) => ({ ...d, [type]: { content_md: "" } }));
+    const r = await streamDoc(
+      { job_id: Number(id), resume_id: resumeId, type, export: true },
+      (text) =>
+        setDocs((d) => ({
+          ...d,
+          [type]: { content_md: (d[type]?.content_md || "") + text },
+        }))
+    );
     setDocs((d) => ({ ...d, [type]: r }));
   };
 